@@ -0,0 +1,122 @@
+"""
+Compare the compiled blocklist matcher with the previous urlparse + parent-domain-variants lookup.
+
+Uses the blocklists-*.txt files in the project directory by default. To benchmark against the
+four lists shipped in the Docker image, download them first:
+
+    uv run python -m benchmarks.blocklist_matcher --download /tmp/blocklists
+    uv run python -m benchmarks.blocklist_matcher --lists /tmp/blocklists/*.txt
+"""
+
+import argparse
+import random
+import time
+import urllib.request
+from pathlib import Path
+from typing import Callable
+from urllib.parse import urlparse
+
+from getgather.browser.domain_matcher import DomainMatcher
+from getgather.browser.resource_policy import allowed_domains
+from getgather.config import PROJECT_DIR
+
+# Same lists as the Dockerfile
+DOCKER_BLOCKLISTS = {
+    "analytics": "https://raw.githubusercontent.com/hectorm/hmirror/master/data/mozilla-shavar-analytics/list.txt",
+    "ads": "https://raw.githubusercontent.com/hectorm/hmirror/master/data/mozilla-shavar-advertising/list.txt",
+    "privacy": "https://raw.githubusercontent.com/hectorm/hmirror/master/data/easyprivacy/list.txt",
+    "adguard": "https://raw.githubusercontent.com/hectorm/hmirror/master/data/adguard-simplified/list.txt",
+}
+
+FIRST_PARTY_HOSTS = [
+    "www.amazon.com",
+    "m.media-amazon.com",
+    "images-na.ssl-images-amazon.com",
+    "completion.amazon.com",
+    "www.wayfair.com",
+    "assets.wfcdn.com",
+    "www.nordstrom.com",
+    "n.nordstrommedia.com",
+    "cdn.shopify.com",
+    "www.tokopedia.com",
+    "fonts.gstatic.com",
+    "ajax.googleapis.com",
+]
+SUBDOMAIN_PREFIXES = ["", "www.", "stats.", "pixel.", "ad.", "cdn.", "s1.", "eu-west."]
+
+
+def legacy_should_be_blocked(url: str, domains: frozenset[str]) -> bool:
+    """The lookup used before the compiled matcher."""
+    domain = urlparse(url).netloc.lower()
+    if not domain:
+        return False
+    parts = domain.split(".")
+    for i in range(len(parts) - 1):
+        if ".".join(parts[i:]) in domains:
+            return True
+    return False
+
+
+def load_domains(paths: list[Path]) -> frozenset[str]:
+    domains: set[str] = set()
+    for path in paths:
+        domains.update(line.strip() for line in path.read_text().splitlines() if line.strip())
+    return frozenset(domains - allowed_domains())
+
+
+def url_stream(domains: frozenset[str], count: int, seed: int = 42) -> list[str]:
+    """A page-load-like stream: a few hosts repeat a lot, about a third are trackers."""
+    rng = random.Random(seed)
+    trackers = [
+        rng.choice(SUBDOMAIN_PREFIXES) + domain
+        for domain in rng.sample(sorted(domains), min(400, len(domains)))
+    ]
+    hosts = FIRST_PARTY_HOSTS * 3 + trackers
+    weights = [1 / (rank + 1) for rank in range(len(hosts))]
+    urls: list[str] = []
+    for host in rng.choices(hosts, weights=weights, k=count):
+        path = "/".join(rng.choice(["js", "api", "v2", "p", "collect", "b"]) for _ in range(3))
+        urls.append(f"https://{host}/{path}?id={rng.randrange(10**6)}")
+    return urls
+
+
+def bench(name: str, match: Callable[[str], bool], urls: list[str]) -> int:
+    start = time.perf_counter()
+    blocked = sum(1 for url in urls if match(url))
+    elapsed = time.perf_counter() - start
+    print(f"{name:<24} {elapsed * 1e9 / len(urls):8.0f} ns/url   blocked={blocked}")
+    return blocked
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lists", type=Path, nargs="*", help="blocklist files")
+    parser.add_argument("--download", type=Path, help="download the Docker blocklists here")
+    parser.add_argument("--urls", type=int, default=200_000)
+    args = parser.parse_args()
+
+    if args.download:
+        args.download.mkdir(parents=True, exist_ok=True)
+        for name, url in DOCKER_BLOCKLISTS.items():
+            urllib.request.urlretrieve(url, args.download / f"blocklists-{name}.txt")
+        print(f"Downloaded {len(DOCKER_BLOCKLISTS)} lists to {args.download}")
+        return
+
+    paths = args.lists or sorted(PROJECT_DIR.glob("blocklists-*.txt"))
+    domains = load_domains(paths)
+
+    start = time.perf_counter()
+    matcher = DomainMatcher(domains)
+    build = time.perf_counter() - start
+    print(f"{len(domains)} domains from {len(paths)} list(s), matcher built in {build:.2f}s")
+
+    urls = url_stream(domains, args.urls)
+    expected = bench(
+        "legacy (urlparse+set)", lambda url: legacy_should_be_blocked(url, domains), urls
+    )
+    assert bench("compiled (cold cache)", matcher.matches, urls) == expected
+    assert bench("compiled (warm cache)", matcher.matches, urls) == expected
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Compare blocklist startup time and memory: plain text loading versus the compiled artifact.
+
+Each loader runs in a fresh process, which reports its load time and RSS growth:
+
+- text: read every list into a frozenset of strings (the previous loader)
+- compile: build the compiled artifact from the lists (what the Docker build does)
+- mmap: open an up-to-date compiled artifact
+
+    uv run python -m benchmarks.blocklist_startup --lists /tmp/blocklists/*.txt
+
+See benchmarks/blocklist_matcher.py to download the lists used by the Docker image.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from getgather.browser.domain_matcher import load_compiled_blocklists
+from getgather.browser.resource_policy import allowed_domains
+from getgather.config import PROJECT_DIR
+
+LOADERS = ("text", "compile", "mmap")
+
+
+def _rss_bytes() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * 4096
+
+
+def _child(loader: str, paths: list[Path], artifact: Path) -> None:
+    before = _rss_bytes()
+    start = time.perf_counter()
+    if loader == "text":
+        domains: set[str] = set()
+        for path in paths:
+            domains.update(line.strip() for line in path.read_text().splitlines() if line.strip())
+        loaded: object = frozenset(domains - allowed_domains())
+    else:
+        if loader == "compile":
+            artifact.unlink(missing_ok=True)
+        loaded = load_compiled_blocklists(paths, allowed_domains(), artifact)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"seconds": elapsed, "rss_bytes": _rss_bytes() - before}))
+    del loaded
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lists", type=Path, nargs="*", help="blocklist files")
+    parser.add_argument("--child", choices=LOADERS, help=argparse.SUPPRESS)
+    parser.add_argument("--artifact", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    paths = args.lists or sorted(PROJECT_DIR.glob("blocklists-*.txt"))
+
+    if args.child:
+        _child(args.child, paths, args.artifact)
+        return
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        artifact = Path(temp_dir) / "blocklists.bin"
+        print(f"{len(paths)} list(s): {', '.join(path.name for path in paths)}")
+        for loader in LOADERS:
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.blocklist_startup", "--child", loader]
+                + ["--artifact", str(artifact), "--lists", *map(str, paths)],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(
+                f"{loader:<8} {result['seconds'] * 1000:8.1f} ms"
+                f"  {result['rss_bytes'] / (1024 * 1024):8.1f} MB RSS"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Measure browser cold start: launch on a brand new profile until the first navigation completes.
+
+Runs the same launch path as production (_create_zendriver_browser) with and without the profile
+template, against a local page so network latency does not dominate.
+
+    uv run python -m benchmarks.browser_startup --runs 5
+"""
+
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from getgather.browser.profile_template import ensure_profile_template
+from getgather.config import settings
+from getgather.mcp.browser import terminate_zendriver_browser
+from getgather.zen_distill import _create_zendriver_browser, get_new_page, zen_navigate_with_retry
+
+
+class _PageHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = b"<html><body><h1>ready</h1></body></html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+async def _cold_start(url: str) -> float:
+    start = time.perf_counter()
+    browser = await _create_zendriver_browser()
+    try:
+        page = await get_new_page(browser)
+        await zen_navigate_with_retry(page, url)
+        return time.perf_counter() - start
+    finally:
+        await terminate_zendriver_browser(browser)
+
+
+async def main(runs: int) -> None:
+    server = HTTPServer(("127.0.0.1", 0), _PageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/"
+
+    try:
+        # Built once per deployment, so kept out of the timings
+        await ensure_profile_template()
+        for use_template in (False, True):
+            settings.USE_PROFILE_TEMPLATE = use_template
+            timings = [await _cold_start(url) for _ in range(runs)]
+            print(
+                f"template={'on ' if use_template else 'off'}"
+                f"  median={statistics.median(timings):.2f}s"
+                f"  min={min(timings):.2f}s  max={max(timings):.2f}s"
+            )
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    asyncio.run(main(parser.parse_args().runs))
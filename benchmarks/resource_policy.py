@@ -0,0 +1,65 @@
+"""
+Measure page load time per brand with and without its resource policy.
+
+Loads each URL in a fresh tab of one browser, with blocking disabled and with the policy the URL
+maps to, so a candidate policy can be checked before it ships. Needs network access.
+
+    uv run python -m benchmarks.resource_policy --runs 3 https://www.amazon.com/
+    uv run python -m benchmarks.resource_policy --policy-file strict.yaml https://www.wayfair.com/
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import zendriver as zd
+
+from getgather.browser.resource_policy import load_policies, policy_for_url
+from getgather.config import settings
+from getgather.mcp.browser import terminate_zendriver_browser
+from getgather.zen_distill import (
+    _create_zendriver_browser,
+    get_new_page,
+    safe_close_page,
+    zen_navigate_with_retry,
+)
+
+
+async def _load(browser: zd.Browser, url: str) -> float:
+    page = await get_new_page(browser)
+    try:
+        start = time.perf_counter()
+        await zen_navigate_with_retry(page, url)
+        return time.perf_counter() - start
+    finally:
+        await safe_close_page(page)
+
+
+async def main(urls: list[str], runs: int) -> None:
+    browser = await _create_zendriver_browser()
+    try:
+        for url in urls:
+            policy = policy_for_url(url)
+            for blocking in (False, True):
+                settings.SHOULD_BLOCK_UNWANTED_RESOURCES = blocking
+                timings = [await _load(browser, url) for _ in range(runs)]
+                print(
+                    f"{url}  policy={policy.name if blocking else 'off':<10}"
+                    f"  median={statistics.median(timings):.2f}s"
+                    f"  min={min(timings):.2f}s  max={max(timings):.2f}s"
+                )
+    finally:
+        await terminate_zendriver_browser(browser)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("urls", nargs="+")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--policy-file", help="Policy file to try instead of the packaged one")
+    args = parser.parse_args()
+    if args.policy_file:
+        settings.RESOURCE_POLICY_FILE = args.policy_file
+        load_policies.cache_clear()
+    asyncio.run(main(args.urls, args.runs))
@@ -1,5 +1,6 @@
 import asyncio
 from datetime import datetime
+from typing import Any
 
 from fastapi import FastAPI
 from fastapi.responses import PlainTextResponse
@@ -7,6 +8,7 @@ from fastapi.routing import APIRoute
 
 from getgather.config import settings
 from getgather.mcp.main import MCPDoc, create_mcp_apps, mcp_app_docs
+from getgather.metrics import metrics
 
 
 def custom_generate_unique_id(route: APIRoute) -> str:
@@ -29,6 +31,11 @@ def health():
     )
 
 
+@api_app.get("/metrics")
+def get_metrics() -> dict[str, Any]:
+    return metrics.snapshot()
+
+
 @api_app.get("/docs-mcp")
 async def mcp_docs() -> list[MCPDoc]:
     return await asyncio.gather(*[mcp_app_docs(mcp_app) for mcp_app in create_mcp_apps()])
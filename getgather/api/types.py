@@ -14,6 +14,9 @@ class RequestInfo(BaseModel):
     proxy_type: str | None = Field(
         description="The proxy type to use (e.g., 'proxy-0', 'proxy-1')", default=None
     )
+    user_id: str | None = Field(
+        description="Identity of the client, to reuse its proxy sessions.", default=None
+    )
 
 
 request_info: ContextVar[RequestInfo | None] = ContextVar("request_info", default=None)
@@ -0,0 +1,245 @@
+"""
+Shared disk cache for static assets, across browser profiles.
+
+Profile caches are deleted with their profile, so every new browser downloads each brand's JS
+bundles and CSS again. Scripts and stylesheets are intercepted instead (the Fetch domain with
+zendriver, page routes with patchright): fresh cached copies are served from disk, and
+cacheable responses are stored. Only responses a shared cache may store, with an explicit
+freshness lifetime, are stored, and the cache is bounded by size with least-recently-used
+eviction. The cache is shared by every profile, so responses to requests that carried cookies
+or credentials are never stored.
+
+Intercepting every script and stylesheet costs a round-trip through Python per request, so the
+cache is off unless ASSET_CACHE_MAX_MB is set. A caching forward proxy would not see HTTPS
+responses, hence the interception.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Mapping
+
+from getgather.config import settings
+from getgather.logs import logger
+from getgather.metrics import metrics
+
+# Not stored: hop-by-hop headers, cookies, and the encoding of the body, which is stored decoded
+_DROPPED_HEADERS = frozenset({
+    "connection",
+    "content-encoding",
+    "content-length",
+    "keep-alive",
+    "set-cookie",
+    "transfer-encoding",
+})
+
+asset_cache_requests_total = metrics.counter(
+    "asset_cache_requests_total", "Asset cache lookups and stores, by result"
+)
+
+
+def _cache_control(headers: Mapping[str, str]) -> dict[str, str]:
+    directives: dict[str, str] = {}
+    for part in headers.get("cache-control", "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"')
+    return directives
+
+
+def cache_lifetime(
+    method: str,
+    status: int,
+    request_headers: Mapping[str, str],
+    response_headers: Mapping[str, str],
+) -> float | None:
+    """How long a response may be served from a shared cache, in seconds, or None if it may not.
+
+    Headers are matched case-insensitively. `request_headers` are the headers the request was
+    sent with, cookies included: Chrome adds cookies after a request is intercepted, so the
+    headers of a paused request never show them.
+    """
+    request_headers = {name.lower(): value for name, value in request_headers.items()}
+    response_headers = {name.lower(): value for name, value in response_headers.items()}
+    if method != "GET" or status != 200:
+        return None
+    if request_headers.keys() & {"authorization", "cookie"}:
+        return None
+    if "set-cookie" in response_headers:
+        return None
+    vary = {v.strip().lower() for v in response_headers.get("vary", "").split(",") if v.strip()}
+    if vary - {"accept-encoding"}:
+        return None
+
+    directives = _cache_control(response_headers)
+    if directives.keys() & {"no-store", "no-cache", "private"}:
+        return None
+    lifetime: float | None = None
+    for name in ("s-maxage", "max-age"):
+        if name in directives:
+            try:
+                lifetime = float(directives[name])
+            except ValueError:
+                return None
+            break
+    else:
+        if "expires" in response_headers:
+            try:
+                expires = parsedate_to_datetime(response_headers["expires"]).timestamp()
+                date = response_headers.get("date")
+                now = parsedate_to_datetime(date).timestamp() if date else time.time()
+            except (TypeError, ValueError):
+                return None
+            lifetime = expires - now
+    if lifetime is None:
+        return None
+    try:
+        lifetime -= float(response_headers.get("age", 0))
+    except ValueError:
+        pass
+    return lifetime if lifetime > 0 else None
+
+
+@dataclass(frozen=True)
+class CachedAsset:
+    url: str
+    status: int
+    headers: dict[str, str]
+    body: bytes
+    expires_at: float
+
+
+class AssetCache:
+    """Disk cache of responses keyed by URL, bounded by `max_bytes` with LRU eviction.
+
+    Blocking: reads and writes files, call it off the event loop.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # key -> size, least recently used first
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._size = 0
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self) -> None:
+        files: list[tuple[float, str, int]] = []
+        for path in self.directory.glob("*.asset"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, path.stem, stat.st_size))
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._size += size
+        self._evict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(url.encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.asset"
+
+    def get(self, url: str) -> CachedAsset | None:
+        """The cached response for `url` if it is still fresh."""
+        key = self._key(url)
+        with self._lock:
+            if key not in self._entries:
+                asset_cache_requests_total.inc(result="miss")
+                return None
+            self._entries.move_to_end(key)
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                meta = json.loads(f.readline())
+                body = f.read()
+            os.utime(path)  # keeps the LRU order across restarts
+        except (OSError, ValueError) as e:
+            logger.debug(f"Dropping unreadable cached asset {url}: {e}")
+            self._remove(key)
+            asset_cache_requests_total.inc(result="miss")
+            return None
+        if meta["url"] != url or meta["expires_at"] <= time.time():
+            self._remove(key)
+            asset_cache_requests_total.inc(result="expired")
+            return None
+        asset_cache_requests_total.inc(result="hit")
+        return CachedAsset(
+            url=url,
+            status=meta["status"],
+            headers=meta["headers"],
+            body=body,
+            expires_at=meta["expires_at"],
+        )
+
+    def put(
+        self, url: str, status: int, headers: Mapping[str, str], body: bytes, lifetime: float
+    ) -> None:
+        headers = {
+            name: value for name, value in headers.items() if name.lower() not in _DROPPED_HEADERS
+        }
+        expires_at = time.time() + lifetime
+        meta = {"url": url, "status": status, "headers": headers, "expires_at": expires_at}
+        data = json.dumps(meta).encode() + b"\n" + body
+        if len(data) > self.max_bytes:
+            return
+        key = self._key(url)
+        path = self._path(key)
+        staging = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            staging.write_bytes(data)
+            staging.replace(path)
+        except OSError as e:
+            logger.warning(f"Could not store asset {url} in the cache: {e}")
+            staging.unlink(missing_ok=True)
+            return
+        with self._lock:
+            self._size += len(data) - self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._evict()
+        asset_cache_requests_total.inc(result="store")
+
+    def _remove(self, key: str) -> None:
+        with self._lock:
+            self._size -= self._entries.pop(key, 0)
+        self._path(key).unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        # Called with the lock held
+        while self._size > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._size -= size
+            self._path(key).unlink(missing_ok=True)
+
+
+_asset_cache: AssetCache | None = None
+_asset_cache_lock = threading.Lock()
+
+
+def get_asset_cache() -> AssetCache | None:
+    """The shared asset cache, or None when it is disabled."""
+    global _asset_cache
+    if settings.ASSET_CACHE_MAX_MB <= 0:
+        return None
+    with _asset_cache_lock:
+        if _asset_cache is None:
+            _asset_cache = AssetCache(settings.asset_cache_dir, settings.ASSET_CACHE_MAX_MB << 20)
+        return _asset_cache
@@ -0,0 +1,149 @@
+"""
+Request blocking telemetry.
+
+Counts what request blocking costs and saves: requests paused for a decision in Python and the
+time spent handling them, blocked requests by reason, resource type and domain, and an estimate
+of the bytes not downloaded. The estimate uses the average Content-Length of allowed responses
+of the same resource type, sampled from the first tabs of the process.
+
+Each tab keeps its own BlockingStats, which also adds to the stats of the tool call that opened
+the tab (see `tool_call_stats`) and to the aggregate metrics.
+"""
+
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from getgather.browser.domain_matcher import url_host
+from getgather.browser.filter_rules import base_domain, request_type
+from getgather.metrics import metrics
+
+intercepted_total = metrics.counter(
+    "requests_intercepted_total", "Requests paused for a blocking decision in Python"
+)
+blocked_total = metrics.counter(
+    "requests_blocked_total", "Blocked requests, by reason and resource type"
+)
+blocked_by_domain_total = metrics.counter(
+    "requests_blocked_by_domain_total",
+    "Blocked requests, by base domain of the blocked URL. Domains beyond the first "
+    "MAX_DOMAIN_LABELS count as 'other'.",
+)
+bytes_saved_total = metrics.counter(
+    "blocked_bytes_saved_estimate_total", "Estimated bytes not downloaded, by resource type"
+)
+callback_seconds = metrics.histogram(
+    "interception_callback_seconds",
+    "Time spent handling an intercepted request, until it is continued or failed",
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+
+# Distinct domain labels of requests_blocked_by_domain_total. Per-domain counts of every tab and
+# tool call are in their BlockingStats.
+MAX_DOMAIN_LABELS = 100
+_domain_labels: set[str] = set()
+# Allowed responses sampled for the average response sizes
+RESPONSE_SIZE_SAMPLES = 1000
+
+
+def _domain_label(domain: str) -> str:
+    if domain not in _domain_labels:
+        if len(_domain_labels) >= MAX_DOMAIN_LABELS:
+            return "other"
+        _domain_labels.add(domain)
+    return domain
+
+
+class ResponseSizes:
+    """Running average response size per resource type, from allowed responses."""
+
+    def __init__(self):
+        self._totals: dict[str, tuple[int, int]] = {}
+        self._observed = 0
+
+    def needs_samples(self) -> bool:
+        """Whether new tabs should still observe their responses."""
+        return self._observed < RESPONSE_SIZE_SAMPLES
+
+    def observe(self, resource_type: str | None, headers: dict[str, Any]) -> None:
+        length = next((v for k, v in headers.items() if k.lower() == "content-length"), None)
+        try:
+            size = int(length) if length is not None else -1
+        except (TypeError, ValueError):
+            return
+        if size < 0:
+            return
+        kind = request_type(resource_type) or "document"
+        count, total = self._totals.get(kind, (0, 0))
+        self._totals[kind] = (count + 1, total + size)
+        self._observed += 1
+
+    def estimate(self, resource_type: str | None) -> float:
+        count, total = self._totals.get(request_type(resource_type) or "document", (0, 0))
+        return total / count if count else 0
+
+
+response_sizes = ResponseSizes()
+
+
+@dataclass
+class BlockingStats:
+    """Blocking counters for one tab or one tool call."""
+
+    parent: "BlockingStats | None" = None
+    intercepted: int = 0
+    callback_seconds: float = 0
+    bytes_saved: float = 0
+    blocked_by_reason: Counter[str] = field(default_factory=Counter[str])
+    blocked_by_type: Counter[str] = field(default_factory=Counter[str])
+    blocked_by_domain: Counter[str] = field(default_factory=Counter[str])
+
+    @property
+    def blocked(self) -> int:
+        return sum(self.blocked_by_reason.values())
+
+    def record_intercepted(self, seconds: float) -> None:
+        """A request paused for a decision in Python, which took `seconds` to handle."""
+        intercepted_total.inc()
+        callback_seconds.observe(seconds)
+        stats: BlockingStats | None = self
+        while stats is not None:
+            stats.intercepted += 1
+            stats.callback_seconds += seconds
+            stats = stats.parent
+
+    def record_blocked(self, url: str, resource_type: str | None, reason: str) -> None:
+        kind = request_type(resource_type) or "document"
+        saved = response_sizes.estimate(resource_type)
+        domain = base_domain(url_host(url)) or "unknown"
+        blocked_total.inc(reason=reason, resource_type=kind)
+        blocked_by_domain_total.inc(domain=_domain_label(domain))
+        bytes_saved_total.inc(saved, resource_type=kind)
+        stats: BlockingStats | None = self
+        while stats is not None:
+            stats.blocked_by_reason[reason] += 1
+            stats.blocked_by_type[kind] += 1
+            stats.blocked_by_domain[domain] += 1
+            stats.bytes_saved += saved
+            stats = stats.parent
+
+    def summary(self, top_domains: int = 5) -> dict[str, Any]:
+        return {
+            "intercepted": self.intercepted,
+            "blocked": self.blocked,
+            "blocked_by_reason": dict(self.blocked_by_reason),
+            "blocked_by_type": dict(self.blocked_by_type),
+            "top_blocked_domains": dict(self.blocked_by_domain.most_common(top_domains)),
+            "callback_ms": round(self.callback_seconds * 1000, 1),
+            "bytes_saved_estimate": int(self.bytes_saved),
+        }
+
+
+# Stats of the tool call being served, set by the MCP middleware
+tool_call_stats: ContextVar[BlockingStats | None] = ContextVar("tool_call_stats", default=None)
+
+
+def new_tab_stats() -> BlockingStats:
+    """Stats for a new tab, adding to the current tool call."""
+    return BlockingStats(parent=tool_call_stats.get())
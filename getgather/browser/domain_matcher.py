@@ -0,0 +1,199 @@
+"""
+Compiled domain blocklist, stored as a memory-mapped sorted array.
+
+The blocklist text files are compiled once into a compact binary artifact: the domains with
+their labels reversed ("doubleclick.net" becomes "net.doubleclick"), sorted and packed into a
+single blob with an offset table. The artifact is keyed by a checksum of the source lists, so it
+is rebuilt only when they change, and it is memory-mapped at runtime instead of being loaded
+into Python strings. The Docker image builds it at build time:
+
+    python -m getgather.browser.domain_matcher
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from getgather.logs import logger
+
+MAGIC = b"GGDM"
+FORMAT_VERSION = 1
+# magic, format version, reserved, domain count, checksum of the source lists
+_HEADER = struct.Struct("<4sHHI32s")
+
+
+def url_host(url: str) -> str:
+    """Extract the lowercase host of an absolute URL, without port or credentials.
+
+    Cheaper than urlparse, which this runs instead of for every intercepted request.
+    """
+    start = url.find("://")
+    if start < 0:
+        return ""
+    start += 3
+    end = len(url)
+    for separator in "/?#":
+        index = url.find(separator, start, end)
+        if index >= 0:
+            end = index
+    host = url[start:end].rpartition("@")[2]
+    if host.startswith("["):  # IPv6 literal
+        return host[: host.find("]") + 1].lower()
+    return host.partition(":")[0].lower()
+
+
+def _reverse_labels(domain: str) -> str:
+    return ".".join(reversed(domain.split(".")))
+
+
+def pack_domains(domains: Iterable[str], checksum: bytes = b"") -> bytes:
+    """Compile domains into the packed artifact format."""
+    keys = sorted({_reverse_labels(domain.strip().lower()).encode() for domain in domains})
+    if keys and keys[0] == b"":
+        keys.pop(0)
+    offsets = [0]
+    for key in keys:
+        offsets.append(offsets[-1] + len(key))
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(keys), checksum.ljust(32, b"\0"))
+    return header + struct.pack(f"={len(offsets)}I", *offsets) + b"".join(keys)
+
+
+class DomainMatcher:
+    """Matches URLs against blocked domains and all of their subdomains.
+
+    Blocklists contain base domains (e.g., "doubleclick.net") while requests come from
+    subdomains (e.g., "stats.doubleclick.net"), so each parent of a host is looked up with a
+    binary search over the packed array. Results are cached per host.
+    """
+
+    def __init__(
+        self,
+        domains: Iterable[str] = (),
+        cache_size: int = 8192,
+        buffer: bytes | mmap.mmap | None = None,
+    ):
+        """Match `domains`, or the domains of a compiled artifact in `buffer`."""
+        if buffer is None:
+            buffer = pack_domains(domains)
+        magic, version, _, count, checksum = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError("Not a compiled blocklist or unsupported format version")
+        self._buffer = buffer
+        self._count: int = count
+        self.checksum: bytes = checksum
+        offsets_end = _HEADER.size + 4 * (count + 1)
+        self._offsets = memoryview(buffer)[_HEADER.size : offsets_end].cast("I")
+        self._blob_start = offsets_end
+        self.match_host = lru_cache(maxsize=cache_size)(self._match_host)
+
+    @classmethod
+    def from_buffer(cls, buffer: bytes | mmap.mmap, cache_size: int = 8192) -> "DomainMatcher":
+        return cls(cache_size=cache_size, buffer=buffer)
+
+    @classmethod
+    def open(cls, path: Path) -> "DomainMatcher":
+        """Memory-map a compiled artifact. Its pages are shared by every process using it."""
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls.from_buffer(buffer)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _key(self, index: int) -> bytes:
+        start = self._blob_start
+        return self._buffer[start + self._offsets[index] : start + self._offsets[index + 1]]
+
+    def _contains(self, key: bytes) -> bool:
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            probe = self._key(middle)
+            if probe < key:
+                low = middle + 1
+            elif probe > key:
+                high = middle
+            else:
+                return True
+        return False
+
+    def _match_host(self, host: str) -> bool:
+        labels = host.split(".")
+        key = labels[-1]
+        # A match needs at least 2 labels, so TLDs like 'com' are never blocked on their own
+        for label in reversed(labels[:-1]):
+            key = f"{key}.{label}"
+            if self._contains(key.encode()):
+                return True
+        return False
+
+    def matches(self, url: str) -> bool:
+        host = url_host(url)
+        return bool(host) and self.match_host(host)
+
+    def domains(self) -> Iterator[str]:
+        for index in range(self._count):
+            yield _reverse_labels(self._key(index).decode())
+
+
+def blocklist_checksum(paths: Iterable[Path], allowed_domains: Iterable[str]) -> bytes:
+    digest = hashlib.sha256(f"v{FORMAT_VERSION}".encode())
+    for domain in sorted(allowed_domains):
+        digest.update(f"allow:{domain}\n".encode())
+    for path in sorted(paths):
+        digest.update(f"list:{path.name}\n".encode())
+        digest.update(hashlib.sha256(path.read_bytes()).digest())
+    return digest.digest()
+
+
+def compile_blocklists(
+    paths: Iterable[Path], allowed_domains: Iterable[str], checksum: bytes
+) -> bytes:
+    domains: set[str] = set()
+    for path in paths:
+        for line in path.read_text().splitlines():
+            if domain := line.strip().lower():
+                domains.add(domain)
+    return pack_domains(domains - set(allowed_domains), checksum)
+
+
+def load_compiled_blocklists(
+    paths: list[Path], allowed_domains: Iterable[str], artifact: Path
+) -> DomainMatcher:
+    """Open the compiled artifact for `paths`, rebuilding it if the lists changed.
+
+    Blocking: reads files, run it off the event loop.
+    """
+    allowed_domains = list(allowed_domains)
+    checksum = blocklist_checksum(paths, allowed_domains)
+    if artifact.exists():
+        try:
+            matcher = DomainMatcher.open(artifact)
+            if matcher.checksum == checksum:
+                return matcher
+            logger.info(f"Blocklists changed, recompiling {artifact}")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable compiled blocklist {artifact}: {e}")
+
+    data = compile_blocklists(paths, allowed_domains, checksum)
+    try:
+        staging = artifact.with_name(f".{artifact.name}.{os.getpid()}.tmp")
+        staging.write_bytes(data)
+        staging.replace(artifact)
+        return DomainMatcher.open(artifact)
+    except OSError as e:
+        logger.warning(f"Could not write compiled blocklist {artifact}, keeping it in memory: {e}")
+        return DomainMatcher.from_buffer(data)
+
+
+if __name__ == "__main__":
+    from getgather.browser.resource_blocker import blocklist_paths, compiled_blocklist_path
+    from getgather.browser.resource_policy import allowed_domains
+
+    artifact = compiled_blocklist_path()
+    matcher = load_compiled_blocklists(blocklist_paths(), allowed_domains(), artifact)
+    print(f"Compiled {len(matcher)} domains into {artifact}")
@@ -0,0 +1,117 @@
+"""
+Cached egress validation per proxy route.
+
+Every new browser used to load an IP check page before doing any real work. Validation results
+are now cached per (proxy type, location). A fresh healthy result skips the check. A stale one
+is trusted for a single launch and the first real navigation confirms or invalidates it. Only
+unknown or failing routes are checked inline.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from getgather.api.types import RequestInfo
+from getgather.config import settings
+from getgather.logs import logger
+from getgather.metrics import metrics
+
+EgressKey = tuple[str, str]
+
+# Chrome network errors that point at the proxy or the egress path rather than the site
+EGRESS_ERROR_MARKERS = (
+    "ERR_PROXY",
+    "ERR_TUNNEL",
+    "ERR_SOCKS",
+    "ERR_TIMED_OUT",
+    "ERR_CONNECTION_TIMED_OUT",
+    "ERR_NO_SUPPORTED_PROXIES",
+)
+
+egress_checks_total = metrics.counter(
+    "egress_checks_total", "Browser egress validations by result (ok, failed, skipped)"
+)
+
+
+def egress_key(info: RequestInfo | None) -> EgressKey:
+    """The (proxy type, location) route a browser launched for `info` egresses through."""
+    proxy_type = (info.proxy_type if info else None) or settings.DEFAULT_PROXY_TYPE or "none"
+    location = ""
+    if info:
+        location = "/".join(part for part in (info.country, info.state, info.city) if part)
+    return proxy_type, location.lower() or "any"
+
+
+def is_egress_error(error: BaseException) -> bool:
+    if isinstance(error, TimeoutError):
+        return True
+    message = str(error).upper()
+    return any(marker in message for marker in EGRESS_ERROR_MARKERS)
+
+
+@dataclass
+class _Status:
+    checked_at: float
+    ip: str | None = None
+    # Set when a stale result was trusted for a launch, cleared by the next successful navigation
+    unconfirmed: bool = False
+
+
+class EgressValidator:
+    """Remembers which proxy routes recently reached the internet."""
+
+    def __init__(self):
+        self._healthy: dict[EgressKey, _Status] = {}
+
+    async def validate(self, key: EgressKey, check: Callable[[], Awaitable[str | None]]) -> None:
+        """Run `check` for `key` unless a cached result makes it unnecessary.
+
+        `check` navigates a new browser to IP_CHECK_URL and returns the egress IP if it could
+        read it. It raises if the browser cannot get out, which invalidates the route.
+        """
+        ttl = settings.EGRESS_CHECK_TTL
+        status = self._healthy.get(key)
+        if ttl > 0 and status is not None:
+            if time.monotonic() - status.checked_at < ttl:
+                egress_checks_total.inc(result="skipped")
+                logger.info(f"Egress for {key} validated recently (IP {status.ip}), skipping check")
+                return
+            if not status.unconfirmed:
+                status.unconfirmed = True
+                egress_checks_total.inc(result="skipped")
+                logger.info(f"Egress for {key} is stale, first navigation will revalidate it")
+                return
+
+        logger.info(f"Validating egress for {key} at {settings.IP_CHECK_URL}...")
+        try:
+            ip = await check()
+        except Exception:
+            egress_checks_total.inc(result="failed")
+            self.invalidate(key)
+            raise
+        egress_checks_total.inc(result="ok")
+        logger.info(f"Egress for {key} validated. IP address: {ip or 'unknown'}")
+        self.mark_healthy(key, ip)
+
+    def mark_healthy(self, key: EgressKey, ip: str | None = None) -> None:
+        previous = self._healthy.get(key)
+        if ip is None and previous is not None:
+            ip = previous.ip
+        self._healthy[key] = _Status(checked_at=time.monotonic(), ip=ip)
+
+    def invalidate(self, key: EgressKey) -> None:
+        if self._healthy.pop(key, None) is not None:
+            logger.warning(f"Egress for {key} invalidated, next browser will be checked")
+
+    def record_navigation(self, key: EgressKey, error: BaseException | None = None) -> None:
+        """Use a real navigation as the health signal for its route."""
+        if error is None:
+            self.mark_healthy(key)
+        elif is_egress_error(error):
+            self.invalidate(key)
+
+    def is_healthy(self, key: EgressKey) -> bool:
+        return key in self._healthy
+
+
+egress_validator = EgressValidator()
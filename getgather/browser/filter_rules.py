@@ -0,0 +1,314 @@
+"""
+Adblock-syntax filter rules, for blocking beyond plain domain lists.
+
+Supports the subset of Adblock Plus / uBlock Origin network filters that matters here:
+
+- `||example.com^` domain anchors, `|` start and end anchors, `*` wildcards and `^` separators
+- path patterns such as `/ads/banner*`
+- `$` options: resource types (`script`, `~image`, ...), `third-party` / `first-party` and
+  `domain=a.com|~b.com`
+- `@@` exception rules
+
+Cosmetic filters, regex rules and rules with other options are skipped. Rules are indexed by
+a token from their pattern, so a request only checks the rules sharing a token with its URL.
+"""
+
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Literal
+
+from getgather.browser.domain_matcher import url_host
+
+# Filter option names for request resource types, from CDP (lowercased) and Playwright names
+REQUEST_RESOURCE_TYPES = {
+    "script": "script",
+    "image": "image",
+    "stylesheet": "stylesheet",
+    "xhr": "xmlhttprequest",
+    "fetch": "xmlhttprequest",
+    "media": "media",
+    "font": "font",
+    "ping": "ping",
+    "websocket": "websocket",
+}
+# CDP resource types paused for each filter resource type option
+CDP_RESOURCE_TYPES = {
+    "script": ("Script",),
+    "image": ("Image",),
+    "stylesheet": ("Stylesheet",),
+    "xmlhttprequest": ("XHR", "Fetch"),
+    "media": ("Media",),
+    "font": ("Font",),
+    "ping": ("Ping",),
+    "websocket": ("WebSocket",),
+    "other": ("Other",),
+}
+_OPTION_ALIASES = {
+    "xhr": "xmlhttprequest",
+    "css": "stylesheet",
+    "3p": "third-party",
+    "1p": "first-party",
+    "~third-party": "first-party",
+    "~first-party": "third-party",
+}
+
+_TOKEN = re.compile(r"[0-9a-z%]{2,}")
+# Tokens found in too many URLs to narrow anything down
+_BAD_TOKENS = frozenset({"http", "https", "www", "com", "net", "org", "js", "html"})
+_SEPARATOR = r"(?:[^\w.%-]|$)"
+_HOST_ANCHOR = r"^[a-z][a-z0-9+.-]*://(?:[^/?#]*\.)?"
+
+
+def request_type(resource_type: str | None) -> str | None:
+    """Filter option name for a CDP or Playwright resource type, None for documents."""
+    if resource_type is None:
+        return None
+    resource_type = resource_type.lower()
+    if resource_type == "document":
+        return None  # pages and frames are never filtered
+    return REQUEST_RESOURCE_TYPES.get(resource_type, "other")
+
+
+def base_domain(host: str) -> str:
+    """Approximate registrable domain, good enough to tell first from third party."""
+    labels = host.split(".")
+    if len(labels) >= 3 and len(labels[-1]) == 2 and labels[-2] in {"co", "com", "org", "net"}:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+def _pattern_to_regex(pattern: str) -> str:
+    prefix = ""
+    if pattern.startswith("||"):
+        prefix, pattern = _HOST_ANCHOR, pattern[2:]
+    elif pattern.startswith("|"):
+        prefix, pattern = "^", pattern[1:]
+    suffix = ""
+    if pattern.endswith("|"):
+        suffix, pattern = "$", pattern[:-1]
+    body = "".join(
+        ".*" if char == "*" else _SEPARATOR if char == "^" else re.escape(char) for char in pattern
+    )
+    return prefix + body + suffix
+
+
+def _pattern_to_glob(pattern: str) -> str:
+    """Over-approximate a pattern with a Fetch URL glob, where only '*' and '?' are special."""
+    if pattern.startswith("||"):
+        pattern = "*://*" + pattern[2:]
+    elif pattern.startswith("|"):
+        pattern = pattern[1:]
+    else:
+        pattern = "*" + pattern
+    if pattern.endswith("|"):
+        pattern = pattern[:-1]
+    else:
+        pattern += "*"
+    glob = pattern.replace("\\", "\\\\").replace("?", "\\?").replace("^", "*")
+    return re.sub(r"\*+", "*", glob)
+
+
+def _pattern_token(pattern: str) -> str | None:
+    """The longest token that is guaranteed to appear whole in every matching URL."""
+    anchored_start = pattern.startswith("|")
+    anchored_end = pattern.endswith("|")
+    body = pattern.lstrip("|").rstrip("|")
+    best: str | None = None
+    for match in _TOKEN.finditer(body):
+        start, end = match.span()
+        before = body[start - 1] if start > 0 else ("" if anchored_start else "*")
+        after = body[end] if end < len(body) else ("" if anchored_end else "*")
+        if before == "*" or after == "*":
+            continue  # the URL token may extend past the pattern here
+        token = match.group()
+        if token not in _BAD_TOKENS and (best is None or len(token) > len(best)):
+            best = token
+    return best
+
+
+@dataclass(frozen=True)
+class FilterRule:
+    text: str
+    regex: re.Pattern[str]
+    glob: str
+    token: str | None
+    exception: bool = False
+    resource_types: frozenset[str] | None = None  # None matches every type
+    party: Literal["first", "third"] | None = None
+    include_domains: frozenset[str] = frozenset()
+    exclude_domains: frozenset[str] = frozenset()
+
+    def matches(
+        self, url: str, resource_type: str | None, document_host: str | None, third_party: bool
+    ) -> bool:
+        if self.resource_types is not None and resource_type not in self.resource_types:
+            return False
+        if self.party is not None:
+            if document_host is None or third_party != (self.party == "third"):
+                return False
+        if self.include_domains or self.exclude_domains:
+            if document_host is None:
+                return not self.include_domains
+            if on_domains(document_host, self.exclude_domains):
+                return False
+            if self.include_domains and not on_domains(document_host, self.include_domains):
+                return False
+        return self.regex.search(url) is not None
+
+
+def on_domains(host: str, domains: frozenset[str]) -> bool:
+    return any(host == domain or host.endswith(f".{domain}") for domain in domains)
+
+
+def parse_rule(line: str) -> FilterRule | None:
+    """Parse one filter line, returning None for comments and unsupported rules."""
+    text = line.strip()
+    if not text or text.startswith(("!", "[")) or "#" in text.split("$", 1)[0]:
+        return None  # comments, headers and cosmetic filters
+
+    pattern = text
+    exception = pattern.startswith("@@")
+    if exception:
+        pattern = pattern[2:]
+
+    options: list[str] = []
+    if "$" in pattern:
+        pattern, _, option_text = pattern.rpartition("$")
+        options = [option.strip().lower() for option in option_text.split(",") if option.strip()]
+    pattern = pattern.lower()
+    if pattern.startswith("/") and pattern.endswith("/") and len(pattern) > 1:
+        return None  # regex rules
+
+    included: set[str] = set()
+    excluded: set[str] = set()
+    party: Literal["first", "third"] | None = None
+    include_domains: set[str] = set()
+    exclude_domains: set[str] = set()
+    for option in options:
+        option = _OPTION_ALIASES.get(option, option)
+        negated = option.startswith("~")
+        name = option.lstrip("~")
+        name = _OPTION_ALIASES.get(name, name)
+        if name in CDP_RESOURCE_TYPES:
+            (excluded if negated else included).add(name)
+        elif option == "third-party":
+            party = "third"
+        elif option == "first-party":
+            party = "first"
+        elif option.startswith("domain="):
+            for domain in option.removeprefix("domain=").split("|"):
+                if domain.startswith("~"):
+                    exclude_domains.add(domain[1:])
+                elif domain:
+                    include_domains.add(domain)
+        elif option in {"match-case", "important"}:
+            continue
+        else:
+            return None  # unsupported option, skip rather than over-block
+
+    resource_types: frozenset[str] | None = None
+    if included or excluded:
+        resource_types = frozenset((included or set(CDP_RESOURCE_TYPES)) - excluded)
+
+    return FilterRule(
+        text=text,
+        regex=re.compile(_pattern_to_regex(pattern)),
+        glob=_pattern_to_glob(pattern),
+        token=_pattern_token(pattern),
+        exception=exception,
+        resource_types=resource_types,
+        party=party,
+        include_domains=frozenset(include_domains),
+        exclude_domains=frozenset(exclude_domains),
+    )
+
+
+class _TokenIndex:
+    def __init__(self):
+        self._by_token: dict[str, list[FilterRule]] = defaultdict(list)
+        self._generic: list[FilterRule] = []
+
+    def add(self, rule: FilterRule) -> None:
+        if rule.token is None:
+            self._generic.append(rule)
+        else:
+            self._by_token[rule.token].append(rule)
+
+    def candidates(self, tokens: Iterable[str]) -> Iterable[FilterRule]:
+        yield from self._generic
+        for token in tokens:
+            yield from self._by_token.get(token, ())
+
+
+class FilterEngine:
+    """Decides whether a request is blocked by the loaded filter rules."""
+
+    def __init__(self, rules: Iterable[FilterRule] = ()):
+        self._block = _TokenIndex()
+        self._allow = _TokenIndex()
+        self.rules: list[FilterRule] = []
+        for rule in rules:
+            (self._allow if rule.exception else self._block).add(rule)
+            self.rules.append(rule)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str]) -> "FilterEngine":
+        return cls(rule for line in lines if (rule := parse_rule(line)) is not None)
+
+    @classmethod
+    def load(cls, paths: Iterable[Path]) -> "FilterEngine":
+        """Load filter files. Blocking: reads files, run it off the event loop."""
+        lines: list[str] = []
+        for path in paths:
+            lines.extend(path.read_text().splitlines())
+        return cls.from_lines(lines)
+
+    def match(
+        self, url: str, resource_type: str | None = None, document_url: str | None = None
+    ) -> FilterRule | None:
+        """The rule blocking this request, or None if it is allowed.
+
+        `resource_type` is a CDP or Playwright resource type. Documents are never blocked.
+        """
+        option_type = request_type(resource_type) if resource_type is not None else "other"
+        if option_type is None:
+            return None
+        url = url.lower()
+        host = url_host(url)
+        document_host = url_host(document_url.lower()) if document_url else None
+        third_party = bool(document_host) and base_domain(host) != base_domain(document_host)
+        document_host = document_host or None
+
+        tokens = set(_TOKEN.findall(url))
+        for rule in self._block.candidates(tokens):
+            if rule.matches(url, option_type, document_host, third_party):
+                break
+        else:
+            return None
+        for exception in self._allow.candidates(tokens):
+            if exception.matches(url, option_type, document_host, third_party):
+                return None
+        return rule
+
+    def request_patterns(self) -> list[tuple[str, str | None]]:
+        """(URL glob, CDP resource type or None) pairs covering every request a rule may block.
+
+        Only requests matching these are paused for a decision, the others never leave the
+        browser.
+        """
+        patterns: dict[tuple[str, str | None], None] = {}
+        for rule in self.rules:
+            if rule.exception:
+                continue
+            if rule.resource_types is None:
+                patterns[(rule.glob, None)] = None
+                continue
+            for option_type in sorted(rule.resource_types):
+                for cdp_type in CDP_RESOURCE_TYPES[option_type]:
+                    patterns[(rule.glob, cdp_type)] = None
+        return list(patterns)
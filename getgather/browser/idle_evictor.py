@@ -0,0 +1,147 @@
+"""
+Deadline-based idle eviction for browsers.
+
+Every activity moves a browser's deadline to last activity + BROWSER_SESSION_AGE. Deadlines live
+in a heap, and a single background task sleeps until the earliest one, so each browser is stopped
+exactly when it expires instead of on the next periodic sweep. Superseded heap entries are skipped
+lazily when they reach the top.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from getgather.config import settings
+from getgather.logs import logger
+from getgather.metrics import metrics
+
+EvictCallback = Callable[[], Awaitable[None]]
+
+evictions_total = metrics.counter(
+    "browser_idle_evictions_total", "Browsers stopped after being idle for too long"
+)
+idle_seconds = metrics.histogram(
+    "browser_idle_seconds", "Idle time between browser activities and before eviction"
+)
+
+
+@dataclass
+class _Entry:
+    kind: str
+    last_active: float
+    deadline: float
+    evict: EvictCallback
+
+
+class IdleEvictor:
+    """Evicts idle browsers at their exact deadline."""
+
+    def __init__(self, max_idle: float | None = None):
+        self._max_idle = max_idle
+        self._entries: dict[str, _Entry] = {}
+        self._heap: list[tuple[float, int, str]] = []
+        self._sequence = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        metrics.gauge(
+            "browser_idle_tracked", "Browsers tracked for idle eviction", lambda: len(self)
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    @property
+    def max_idle(self) -> float:
+        """Maximum idle time in seconds."""
+        if self._max_idle is not None:
+            return self._max_idle
+        return settings.BROWSER_SESSION_AGE * 60
+
+    def touch(self, key: str, kind: str, evict: EvictCallback) -> None:
+        """Record activity for `key`, pushing its eviction deadline back."""
+        now = time.monotonic()
+        if previous := self._entries.get(key):
+            idle_seconds.observe(now - previous.last_active, kind=kind, event="activity")
+
+        deadline = now + self.max_idle
+        self._entries[key] = _Entry(kind=kind, last_active=now, deadline=deadline, evict=evict)
+        heapq.heappush(self._heap, (deadline, next(self._sequence), key))
+
+        if self._heap[0][2] == key:
+            self._wakeup.set()  # a new earliest deadline, reschedule the sleeper
+        if len(self._heap) > 4 * len(self._entries) + 64:
+            self._compact()
+
+    def discard(self, key: str) -> None:
+        """Stop tracking `key`, e.g. because its browser was closed explicitly."""
+        self._entries.pop(key, None)
+
+    def _compact(self) -> None:
+        self._heap = [
+            item
+            for item in self._heap
+            if (entry := self._entries.get(item[2])) is not None and entry.deadline == item[0]
+        ]
+        heapq.heapify(self._heap)
+
+    def _next_deadline(self) -> float | None:
+        while self._heap:
+            deadline, _, key = self._heap[0]
+            entry = self._entries.get(key)
+            if entry is not None and entry.deadline == deadline:
+                return deadline
+            heapq.heappop(self._heap)  # stale: the key was touched again or discarded
+        return None
+
+    async def evict_due(self) -> int:
+        """Evict every entry whose deadline has passed. Returns the number evicted."""
+        evicted = 0
+        now = time.monotonic()
+        while (deadline := self._next_deadline()) is not None and deadline <= now:
+            _, _, key = heapq.heappop(self._heap)
+            entry = self._entries.pop(key)
+            evicted += 1
+            evictions_total.inc(kind=entry.kind)
+            idle_seconds.observe(now - entry.last_active, kind=entry.kind, event="eviction")
+            logger.info(
+                f"{key} has been inactive for more than {self.max_idle / 60:g} minutes, stopping it"
+            )
+            try:
+                await entry.evict()
+            except Exception as e:
+                logger.error(f"Failed to evict {key}: {e}")
+        return evicted
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            deadline = self._next_deadline()
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            await self.evict_due()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+idle_evictor = IdleEvictor()
@@ -0,0 +1,195 @@
+"""
+Memory governor that recycles browsers whose process tree grows too large.
+
+Idle eviction only reclaims browsers nobody uses, so a busy long-lived browser (such as the
+global one) can grow without bound. The governor samples the resident memory of each browser's
+process tree from /proc along with its tab count, and restarts the browser on the same profile
+directory when a limit is exceeded. Sign-in state lives in the profile directory and survives.
+"""
+
+import asyncio
+import os
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import cast
+
+from getgather.browser.session import BrowserSession
+from getgather.config import settings
+from getgather.logs import logger
+from getgather.mcp.browser import browser_manager
+from getgather.mcp.dpage import active_pages
+from getgather.metrics import metrics
+from getgather.zen_distill import relaunch_zendriver_browser
+
+PROC_DIR = Path("/proc")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+recycles_total = metrics.counter(
+    "browser_recycles_total", "Browsers restarted by the memory governor"
+)
+browser_rss_bytes = metrics.gauge("browser_rss_bytes", "Resident memory of each browser tree")
+
+
+def _children_by_parent() -> dict[int, list[int]]:
+    """Map every running pid to its direct children, from /proc/<pid>/stat."""
+    children: dict[int, list[int]] = defaultdict(list)
+    for entry in PROC_DIR.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+        except OSError:
+            continue
+        # The command name may contain spaces, so parse the fields after its closing paren
+        fields = stat[stat.rfind(")") + 2 :].split()
+        children[int(fields[1])].append(int(entry.name))
+    return children
+
+
+def _rss_bytes(pid: int) -> int:
+    try:
+        statm = (PROC_DIR / str(pid) / "statm").read_text().split()
+    except OSError:
+        return 0
+    return int(statm[1]) * PAGE_SIZE
+
+
+def process_tree_rss(pid: int, children: dict[int, list[int]] | None = None) -> int:
+    """Total resident memory, in bytes, of `pid` and all of its descendants."""
+    if children is None:
+        children = _children_by_parent()
+    total = 0
+    seen: set[int] = set()
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        total += _rss_bytes(current)
+        stack.extend(children.get(current, []))
+    return total
+
+
+def find_browser_pid(user_data_dir: Path) -> int | None:
+    """Find the main browser process launched with the given user data directory."""
+    needle = f"--user-data-dir={user_data_dir}"
+    for entry in PROC_DIR.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            args = (entry / "cmdline").read_bytes().decode(errors="ignore").split("\0")
+        except OSError:
+            continue
+        # Child processes (renderer, gpu, zygote...) carry a --type= switch
+        if needle in args and not any(arg.startswith("--type=") for arg in args):
+            return int(entry.name)
+    return None
+
+
+@dataclass
+class BrowserUsage:
+    id: str
+    pid: int | None
+    rss_bytes: int
+    tab_count: int
+
+    @property
+    def rss_mb(self) -> float:
+        return self.rss_bytes / (1024 * 1024)
+
+    def exceeds_limits(self) -> bool:
+        if settings.BROWSER_MAX_RSS_MB and self.rss_mb > settings.BROWSER_MAX_RSS_MB:
+            return True
+        return bool(settings.BROWSER_MAX_TABS and self.tab_count > settings.BROWSER_MAX_TABS)
+
+
+def sample_usage(id: str, pid: int | None, user_data_dir: Path, tab_count: int) -> BrowserUsage:
+    """Sample a browser's process tree. Blocking: reads /proc, run it off the event loop."""
+    if pid is None:
+        pid = find_browser_pid(user_data_dir)
+    rss_bytes = process_tree_rss(pid) if pid is not None else 0
+    return BrowserUsage(id=id, pid=pid, rss_bytes=rss_bytes, tab_count=tab_count)
+
+
+class MemoryGovernor:
+    """Periodically recycles browsers that exceed the configured memory or tab limits."""
+
+    async def check(self) -> None:
+        if not PROC_DIR.exists():
+            logger.debug("No /proc filesystem, skipping browser memory check")
+            return
+        await self._check_zendriver_browsers()
+        await self._check_browser_sessions()
+
+    async def _check_zendriver_browsers(self) -> None:
+        for browser in browser_manager.get_all_browsers():
+            browser_id = cast(str, browser.id)  # type: ignore[attr-defined]
+            usage = await asyncio.to_thread(
+                sample_usage,
+                browser_id,
+                getattr(browser, "_process_pid", None),
+                settings.profiles_dir / browser_id,
+                len(browser.tabs),
+            )
+            browser_rss_bytes.set(usage.rss_bytes, profile_id=browser_id)
+            logger.debug(
+                f"Browser {browser_id}: {usage.rss_mb:.0f} MB RSS, {usage.tab_count} tabs",
+                extra={"profile_id": browser_id},
+            )
+            if not usage.exceeds_limits():
+                continue
+            if any(page in browser.tabs for page in active_pages.values()):
+                logger.info(f"Browser {browser_id} is over limits but hosts a sign-in, skipping")
+                continue
+
+            logger.info(
+                f"Recycling browser {browser_id} ({usage.rss_mb:.0f} MB, {usage.tab_count} tabs)",
+                extra={"profile_id": browser_id},
+            )
+            try:
+                recycled = await browser_manager.recycle_browser(
+                    browser,
+                    relaunch=relaunch_zendriver_browser,
+                    drain_timeout=settings.BROWSER_RECYCLE_DRAIN_TIMEOUT,
+                )
+                if recycled is not None:
+                    recycles_total.inc(kind="zendriver")
+            except Exception as e:
+                logger.error(f"Failed to recycle browser {browser_id}: {e}")
+
+    async def _check_browser_sessions(self) -> None:
+        for session in BrowserSession.get_all_sessions():
+            profile_id = session.profile.id
+            pages = session.context.pages
+            usage = await asyncio.to_thread(
+                sample_usage,
+                profile_id,
+                None,
+                session.profile.profile_dir(profile_id),
+                len(pages),
+            )
+            browser_rss_bytes.set(usage.rss_bytes, profile_id=profile_id)
+            logger.debug(
+                f"Session {profile_id}: {usage.rss_mb:.0f} MB RSS, {usage.tab_count} pages",
+                extra={"profile_id": profile_id},
+            )
+            if not usage.exceeds_limits():
+                continue
+            if any(page in pages for page in active_pages.values()):
+                logger.info(f"Session {profile_id} is over limits but hosts a sign-in, skipping")
+                continue
+
+            logger.info(
+                f"Recycling session {profile_id} ({usage.rss_mb:.0f} MB, {usage.tab_count} pages)",
+                extra={"profile_id": profile_id},
+            )
+            try:
+                await session.recycle(drain_timeout=settings.BROWSER_RECYCLE_DRAIN_TIMEOUT)
+                recycles_total.inc(kind="patchright")
+            except Exception as e:
+                logger.error(f"Failed to recycle session {profile_id}: {e}")
+
+
+memory_governor = MemoryGovernor()
@@ -2,7 +2,6 @@ from __future__ import annotations
 
 import os
 import platform
-import shutil
 from pathlib import Path
 
 import sentry_sdk
@@ -12,6 +11,8 @@ from pydantic import ConfigDict, Field, model_validator
 
 from getgather.api.types import request_info
 from getgather.browser.freezable_model import FreezableModel
+from getgather.browser.profile_cleanup import profile_cleaner
+from getgather.browser.profile_template import clone_profile_template
 from getgather.browser.proxy import setup_proxy
 from getgather.config import settings
 from getgather.logs import logger
@@ -49,9 +50,11 @@ class BrowserProfile(FreezableModel):
             extra={"profile_id": profile_id},
         )
 
+        await clone_profile_template(self.profile_dir(profile_id))
+
         # Setup proxy if configured
         req_info = request_info.get()
-        proxy = await setup_proxy(profile_id, req_info)
+        proxy = await setup_proxy(profile_id, req_info, launch=True)
         timezone_id = req_info.timezone if req_info else None
 
         # Get viewport configuration from parent class
@@ -69,29 +72,4 @@ class BrowserProfile(FreezableModel):
         return context
 
     def cleanup(self, profile_id: str):
-        user_data_dir = self.profile_dir(profile_id)
-        logger.info(
-            f"Removing extra stuff in file://{user_data_dir}...",
-            extra={
-                "profile_id": profile_id,
-            },
-        )
-        for directory in [
-            "Default/DawnGraphiteCache",
-            "Default/DawnWebGPUCache",
-            "Default/GPUCache",
-            "Default/Code Cache",
-            "Default/Cache",
-            "GraphiteDawnCache",
-            "GrShaderCache",
-            "ShaderCache",
-            "Subresource Filter",
-            "segmentation_platform",
-        ]:
-            path = user_data_dir / directory
-
-            if path.exists():
-                try:
-                    shutil.rmtree(path)
-                except Exception as e:
-                    logger.warning(f"Failed to remove {directory}: {e}")
+        profile_cleaner.cleanup(self.profile_dir(profile_id))
@@ -0,0 +1,99 @@
+"""
+Background removal of browser profile caches.
+
+Deleting Chrome's cache directories can block for hundreds of milliseconds, which stalls every
+request on the event loop. Instead, each directory is renamed into the trash directory (a cheap
+metadata operation on the same filesystem) and a background worker thread deletes the trash.
+Directories that cannot be moved (e.g. the trash is on another filesystem) are deleted in place
+by the same worker.
+"""
+
+import queue
+import shutil
+import threading
+from pathlib import Path
+
+from nanoid import generate
+
+from getgather.config import settings
+from getgather.logs import logger
+
+CACHE_DIRECTORIES = (
+    "Default/DawnGraphiteCache",
+    "Default/DawnWebGPUCache",
+    "Default/GPUCache",
+    "Default/Code Cache",
+    "Default/Cache",
+    "GraphiteDawnCache",
+    "GrShaderCache",
+    "ShaderCache",
+    "Subresource Filter",
+    "segmentation_platform",
+)
+
+FRIENDLY_CHARS: str = "23456789abcdefghijkmnpqrstuvwxyz"
+
+
+class ProfileCleaner:
+    """Moves profile caches to the trash and deletes them on a worker thread."""
+
+    def __init__(self):
+        self._queue: queue.Queue[Path] = queue.Queue()
+        self._worker: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def cleanup(self, user_data_dir: Path) -> None:
+        """Move the cache directories of a profile to the trash and schedule their deletion."""
+        logger.info(
+            f"Removing extra stuff in file://{user_data_dir}...",
+            extra={"profile_id": user_data_dir.name},
+        )
+        for directory in CACHE_DIRECTORIES:
+            path = user_data_dir / directory
+            if not path.exists():
+                continue
+            fragment = directory.replace("/", "-").replace(" ", "_")
+            target = settings.trash_dir / (
+                f"{user_data_dir.name}-{fragment}-{generate(FRIENDLY_CHARS, 6)}"
+            )
+            try:
+                path.rename(target)
+            except OSError as e:
+                # e.g. EXDEV or EBUSY: the worker deletes it in place instead
+                logger.warning(f"Failed to move {directory} to trash, deleting it in place: {e}")
+                target = path
+            self._enqueue(target)
+
+    def purge_trash(self) -> None:
+        """Schedule deletion of anything left in the trash, e.g. by a previous run."""
+        for path in settings.trash_dir.iterdir():
+            self._enqueue(path)
+
+    def join(self) -> None:
+        """Block until everything scheduled so far has been deleted."""
+        self._queue.join()
+
+    def _enqueue(self, path: Path) -> None:
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._work, name="profile-cleaner", daemon=True
+                )
+                self._worker.start()
+        self._queue.put(path)
+
+    def _work(self) -> None:
+        while True:
+            path = self._queue.get()
+            try:
+                if path.is_dir() and not path.is_symlink():
+                    shutil.rmtree(path)
+                else:
+                    path.unlink(missing_ok=True)
+            except Exception as e:
+                logger.warning(f"Failed to remove {path}: {e}")
+            finally:
+                self._queue.task_done()
+
+
+profile_cleaner = ProfileCleaner()
@@ -0,0 +1,132 @@
+"""
+Prepared template that new browser profiles are cloned from.
+
+On an empty user data directory Chrome runs its first-run initialization (welcome flow, default
+browser check, fresh preferences). New profiles are instead cloned from a template that Chrome
+itself initialized: it is launched once on an empty directory, left to write its own profile
+files and closed, and the caches it created are dropped. Files are cloned with reflink
+copy-on-write where the filesystem supports it and copied otherwise. Hardlinks are not used:
+Chrome rewrites some profile files (e.g. its SQLite databases) in place, which would corrupt the
+template.
+"""
+
+import asyncio
+import json
+import shutil
+from pathlib import Path
+
+import zendriver as zd
+
+from getgather.browser.profile_cleanup import CACHE_DIRECTORIES
+from getgather.config import settings
+from getgather.logs import logger
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
+
+FICLONE = 0x40049409  # from linux/fs.h
+
+# Bump when the way the template is built changes so existing templates are rebuilt
+TEMPLATE_VERSION = "1"
+VERSION_FILE = ".template-version"
+# Files tied to the Chrome process that built the template
+IGNORED_FILES = (VERSION_FILE, "Singleton*", "lockfile", "LOCK")
+
+_lock = asyncio.Lock()
+
+
+def _clone_file(src: str, dst: str) -> str:
+    """Copy a file, sharing its blocks via a reflink when the filesystem supports it."""
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        try:
+            if fcntl is None:
+                raise OSError("reflink not supported")
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        except OSError:
+            shutil.copyfileobj(fsrc, fdst)
+    shutil.copystat(src, dst)
+    return dst
+
+
+async def _initialize_profile(user_data_dir: Path) -> None:
+    """Let Chrome initialize an empty user data directory, then close it."""
+    browser = await zd.start(
+        user_data_dir=str(user_data_dir),
+        headless=True,
+        sandbox=False,  # Required when running as root; safer than --no-sandbox arg
+        browser_args=["--no-first-run", "--no-default-browser-check", "--disable-component-update"],
+    )
+    try:
+        await browser.get("about:blank")
+    finally:
+        await browser.stop()
+
+
+def _finish_template(staging_dir: Path) -> None:
+    for directory in CACHE_DIRECTORIES:
+        shutil.rmtree(staging_dir / directory, ignore_errors=True)
+    # Chrome skips its first-run flow when this sentinel exists
+    (staging_dir / "First Run").touch()
+    # The browser is stopped without a clean shutdown, which would trigger the restore prompt
+    preferences_file = staging_dir / "Default" / "Preferences"
+    if preferences_file.exists():
+        preferences = json.loads(preferences_file.read_text())
+        profile = preferences.setdefault("profile", {})
+        profile.update(exit_type="Normal", exited_cleanly=True)
+        preferences_file.write_text(json.dumps(preferences))
+    (staging_dir / VERSION_FILE).write_text(TEMPLATE_VERSION)
+
+
+async def _build_template(template_dir: Path) -> None:
+    logger.info(f"Preparing browser profile template in file://{template_dir}")
+    staging_dir = template_dir.with_name(f"{template_dir.name}.tmp")
+    await asyncio.to_thread(shutil.rmtree, staging_dir, ignore_errors=True)
+    staging_dir.mkdir(parents=True)
+
+    await _initialize_profile(staging_dir)
+    await asyncio.to_thread(_finish_template, staging_dir)
+
+    await asyncio.to_thread(shutil.rmtree, template_dir, ignore_errors=True)
+    staging_dir.rename(template_dir)
+
+
+async def ensure_profile_template() -> Path:
+    """Return the template directory, (re)building it if missing or outdated."""
+    template_dir = settings.profile_template_dir
+    async with _lock:
+        version_file = template_dir / VERSION_FILE
+        if not version_file.exists() or version_file.read_text() != TEMPLATE_VERSION:
+            await _build_template(template_dir)
+    return template_dir
+
+
+async def clone_profile_template(user_data_dir: Path) -> bool:
+    """Seed a new user data directory from the template.
+
+    Existing profiles are left untouched so their sign-in state is preserved.
+
+    Returns:
+        True if the directory was seeded from the template
+    """
+    if not settings.USE_PROFILE_TEMPLATE:
+        return False
+    if user_data_dir.exists() and any(user_data_dir.iterdir()):
+        return False
+
+    try:
+        template_dir = await ensure_profile_template()
+        # Copying blocks for tens of milliseconds even with reflinks, so off the event loop
+        await asyncio.to_thread(
+            shutil.copytree,
+            template_dir,
+            user_data_dir,
+            copy_function=_clone_file,
+            ignore=shutil.ignore_patterns(*IGNORED_FILES),
+            dirs_exist_ok=True,
+        )
+    except Exception as e:
+        logger.warning(f"Failed to clone profile template into {user_data_dir}: {e}")
+        return False
+    return True
@@ -6,12 +6,14 @@ with hierarchical location support (city, state, country) and multiple proxy typ
 
 from getgather.api.types import RequestInfo
 from getgather.browser.proxy_builder import build_proxy_config
+from getgather.browser.proxy_pool import proxy_candidates, proxy_pool
+from getgather.browser.proxy_sessions import proxy_sessions
 from getgather.config import settings
 from getgather.logs import logger
 
 
 async def setup_proxy(
-    profile_id: str, request_info: RequestInfo | None = None
+    profile_id: str, request_info: RequestInfo | None = None, launch: bool = False
 ) -> dict[str, str] | None:
     """Setup proxy configuration using the proxy type system.
 
@@ -25,9 +27,16 @@ async def setup_proxy(
     2. DEFAULT_PROXY_TYPE environment variable (fallback)
     3. No proxy if neither is set
 
+    When the proxy belongs to a group, or the type names a group, the healthiest proxy of the
+    group is used and pinned to the profile (see ProxyPool).
+
+    With PROXY_SESSION_TTL set, browsers of the same user and location reuse the proxy session
+    of a recent browser instead of opening a new one (see ProxySessionStore).
+
     Args:
         profile_id: Profile ID to use as base proxy username
         request_info: Optional request information containing location data and proxy type
+        launch: Whether a browser is being launched, which may fail over to another proxy
 
     Returns:
         dict: Proxy configuration with server, username and password
@@ -51,17 +60,25 @@ async def setup_proxy(
     # Load proxy configurations
     proxy_configs = settings.proxy_configs
 
-    if proxy_type not in proxy_configs:
+    # The proxy type may name a pool (group) of proxies, pick the healthiest one
+    candidates = proxy_candidates(proxy_type, proxy_configs)
+    proxy_key = proxy_pool.assign(profile_id, candidates, failover=launch)
+    if proxy_key is None:
         logger.warning(
             f"Proxy type '{proxy_type}' not found in configuration. "
             f"Available types: {list(proxy_configs.keys())}"
         )
         return None
+    if proxy_key != proxy_type:
+        logger.info(f"Routing proxy type {proxy_type} through {proxy_key}")
 
-    proxy_config = proxy_configs[proxy_type]
+    proxy_config = proxy_configs[proxy_key]
 
-    # Build proxy configuration with dynamic parameters (profile_id as session)
-    result = build_proxy_config(proxy_config, profile_id, request_info)
+    # Build proxy configuration with dynamic parameters (a sticky session, else the profile_id)
+    session_id = proxy_sessions.session_id(
+        proxy_key, profile_id, request_info, settings.PROXY_SESSION_TTL
+    )
+    result = build_proxy_config(proxy_config, profile_id, request_info, session_id)
 
     # Log the final proxy configuration for debugging
     if result:
@@ -1,6 +1,5 @@
 """Proxy configuration builder with template-based dynamic parameter replacement."""
 
-import re
 from typing import Any
 
 from getgather.api.types import RequestInfo
@@ -12,6 +11,7 @@ def build_proxy_config(
     proxy_config: ProxyConfig,
     profile_id: str,
     request_info: RequestInfo | None = None,
+    session_id: str | None = None,
 ) -> dict[str, str] | None:
     """Build proxy configuration dict with dynamic parameter replacement.
 
@@ -19,6 +19,7 @@ def build_proxy_config(
         proxy_config: ProxyConfig instance to build from
         profile_id: Profile ID to use as session identifier
         request_info: Optional request information with location data
+        session_id: Optional proxy session identifier, defaults to the profile ID
 
     Returns:
         dict: Proxy configuration with server, username, password
@@ -30,11 +31,11 @@ def build_proxy_config(
         return None
 
     # Extract values for template replacement
-    values = _extract_values(profile_id, request_info)
+    values = _extract_values(session_id or profile_id, request_info)
 
     # Format 1: url_template (full URL with credentials and dynamic params)
-    if proxy_config.url_template:
-        full_url = _build_params(proxy_config.url_template, values)
+    if proxy_config.url_params:
+        full_url = proxy_config.url_params.render(values)
         if not full_url:
             logger.warning("url_template resulted in empty string, skipping proxy")
             return None
@@ -68,9 +69,9 @@ def build_proxy_config(
     username = None
 
     # Priority: username_template > base_username
-    if proxy_config.username_template:
+    if proxy_config.username_params:
         # Build from template (may not need base_username)
-        params = _build_params(proxy_config.username_template, values)
+        params = proxy_config.username_params.render(values)
         if params:
             username = params
     elif proxy_config.base_username:
@@ -95,18 +96,18 @@ def build_proxy_config(
     return result
 
 
-def _extract_values(profile_id: str, request_info: RequestInfo | None) -> dict[str, Any]:
+def _extract_values(session_id: str, request_info: RequestInfo | None) -> dict[str, Any]:
     """Extract replacement values from request info.
 
     Args:
-        profile_id: Profile ID to use as session identifier
+        session_id: Proxy session identifier
         request_info: Optional request information
 
     Returns:
         dict: Mapping of placeholder names to values
     """
     values = {
-        "session_id": profile_id,  # Use profile_id as session identifier
+        "session_id": session_id,
     }
 
     if not request_info:
@@ -131,51 +132,3 @@ def _extract_values(profile_id: str, request_info: RequestInfo | None) -> dict[s
         values["postal_code"] = request_info.postal_code
 
     return values
-
-
-def _build_params(template: str, values: dict[str, Any]) -> str:
-    """Build params string by only including segments with actual values.
-
-    Splits template by placeholders and only joins segments that have values.
-
-    Examples:
-    - Template: 'cc-{country}-city-{city}', values: {'country': 'us'} -> 'cc-us'
-    - Template: 'cc-{country}-city-{city}', values: {} -> ''
-    - Template: 'state-us_{state}', values: {'state': 'ca'} -> 'state-us_ca'
-    - Template: 'state-us_{state}', values: {} -> ''
-
-    Args:
-        template: Template string with {placeholders}
-        values: Mapping of placeholder names to values
-
-    Returns:
-        str: Params with only segments that have values, or empty string
-    """
-    # Split by placeholders to get segments
-    # We'll rebuild by only including segments where we have values
-    parts: list[str] = []
-    current = template
-
-    # Find all placeholders in order
-    placeholders: list[str] = re.findall(r"\{([^}]+)\}", template)
-
-    for placeholder in placeholders:
-        # Split on this placeholder
-        before, _, after = current.partition(f"{{{placeholder}}}")
-
-        # If we have a value for this placeholder, include the segment
-        if placeholder in values and values[placeholder] is not None:
-            parts.append(before + str(values[placeholder]))
-
-        current = after
-
-    # Add any remaining text
-    if current:
-        parts.append(current)
-
-    result = "".join(parts)
-
-    # Clean up separators at start/end
-    result = result.strip("-_")
-
-    return result
@@ -0,0 +1,161 @@
+"""
+Proxy pool health scoring.
+
+Proxies sharing a `group` in the proxy configuration form a pool. Real navigations report how
+each proxy performs (connect latency, proxy errors and timeouts), and new browsers are routed to
+the healthiest proxy of the requested group. A proxy that keeps failing is backed off
+exponentially and gets traffic again once its backoff expires.
+
+A browser keeps the proxy it was launched with: the choice is pinned to its profile id, since
+setup_proxy runs again for every new page and must return the same credentials.
+"""
+
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Callable, Mapping, Sequence
+
+from getgather.browser.egress import is_egress_error
+from getgather.browser.proxy_types import ProxyConfig
+from getgather.logs import logger
+from getgather.metrics import metrics
+
+# Assumed latency of a proxy without measurements, so unknown proxies get tried
+UNKNOWN_LATENCY = 1.0
+LATENCY_ALPHA = 0.3
+ERROR_ALPHA = 0.2
+# Each timeout within the window adds this many seconds to the score
+TIMEOUT_PENALTY = 5.0
+TIMEOUT_WINDOW = 300.0
+FAILURES_BEFORE_BACKOFF = 2
+BASE_BACKOFF = 30.0
+MAX_BACKOFF = 600.0
+
+proxy_navigations_total = metrics.counter(
+    "proxy_navigations_total", "Navigations per proxy, by result (ok, error, timeout)"
+)
+proxy_backoffs_total = metrics.counter("proxy_backoffs_total", "Proxies backed off, by proxy")
+
+
+@dataclass
+class ProxyHealth:
+    latency: float | None = None  # moving average, seconds
+    error_rate: float = 0.0  # moving average of failed navigations
+    consecutive_failures: int = 0
+    backoff_until: float = 0.0
+    timeouts: deque[float] = field(default_factory=deque[float])
+
+    def score(self, now: float) -> float:
+        """Expected cost of routing a browser here, lower is better."""
+        while self.timeouts and self.timeouts[0] < now - TIMEOUT_WINDOW:
+            self.timeouts.popleft()
+        latency = UNKNOWN_LATENCY if self.latency is None else self.latency
+        return latency * (1 + 4 * self.error_rate) + TIMEOUT_PENALTY * len(self.timeouts)
+
+
+class ProxyPool:
+    """Health of each proxy, and the proxy each browser profile is pinned to."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic, max_assignments: int = 10_000):
+        self._clock = clock
+        self._health: dict[str, ProxyHealth] = {}
+        self._assignments: OrderedDict[str, str] = OrderedDict()
+        self._max_assignments = max_assignments
+
+    def health(self, proxy_key: str) -> ProxyHealth:
+        return self._health.setdefault(proxy_key, ProxyHealth())
+
+    def record_navigation(
+        self,
+        proxy_key: str | None,
+        latency: float | None = None,
+        error: BaseException | None = None,
+    ) -> None:
+        """Report a navigation through a proxy: its connect latency, or the error it failed with.
+
+        Errors that do not point at the proxy (a site returning an error page, a bad URL) are
+        ignored.
+        """
+        if proxy_key is None:
+            return
+        health = self.health(proxy_key)
+        if error is None:
+            if latency is not None:
+                health.latency = (
+                    latency
+                    if health.latency is None
+                    else LATENCY_ALPHA * latency + (1 - LATENCY_ALPHA) * health.latency
+                )
+            health.error_rate *= 1 - ERROR_ALPHA
+            health.consecutive_failures = 0
+            health.backoff_until = 0.0
+            proxy_navigations_total.inc(proxy=proxy_key, result="ok")
+            return
+        if not is_egress_error(error):
+            return
+
+        now = self._clock()
+        timeout = isinstance(error, TimeoutError)
+        if timeout:
+            health.timeouts.append(now)
+        health.error_rate = ERROR_ALPHA + (1 - ERROR_ALPHA) * health.error_rate
+        health.consecutive_failures += 1
+        proxy_navigations_total.inc(proxy=proxy_key, result="timeout" if timeout else "error")
+        if health.consecutive_failures >= FAILURES_BEFORE_BACKOFF:
+            exponent = health.consecutive_failures - FAILURES_BEFORE_BACKOFF
+            backoff = min(BASE_BACKOFF * 2**exponent, MAX_BACKOFF)
+            health.backoff_until = now + backoff
+            proxy_backoffs_total.inc(proxy=proxy_key)
+            logger.warning(
+                f"Backing off proxy {proxy_key} for {backoff:.0f}s after "
+                f"{health.consecutive_failures} consecutive failures: {error}"
+            )
+
+    def choose(self, candidates: Sequence[str]) -> str | None:
+        """The healthiest candidate not backed off, or the one whose backoff ends first."""
+        if not candidates:
+            return None
+        now = self._clock()
+        available = [key for key in candidates if self.health(key).backoff_until <= now]
+        if not available:
+            return min(candidates, key=lambda key: self.health(key).backoff_until)
+        return min(available, key=lambda key: self.health(key).score(now))
+
+    def assign(
+        self, profile_id: str, candidates: Sequence[str], failover: bool = False
+    ) -> str | None:
+        """The proxy for a browser profile: its current one if still allowed, else the best.
+
+        With `failover` (a browser launch, not a page of a running browser), a current proxy
+        that is backed off is replaced when a healthy candidate exists.
+        """
+        current = self._assignments.get(profile_id)
+        if current is not None and current in candidates:
+            backed_off = self.health(current).backoff_until > self._clock()
+            if not (failover and backed_off):
+                self._assignments.move_to_end(profile_id)
+                return current
+        chosen = self.choose(candidates)
+        if chosen is not None and current is not None and chosen != current:
+            logger.info(f"Failing over profile {profile_id} from proxy {current} to {chosen}")
+        if chosen is not None:
+            self._assignments[profile_id] = chosen
+            while len(self._assignments) > self._max_assignments:
+                self._assignments.popitem(last=False)
+        return chosen
+
+    def assigned(self, profile_id: str | None) -> str | None:
+        return self._assignments.get(profile_id) if profile_id else None
+
+
+def proxy_candidates(proxy_type: str, configs: Mapping[str, ProxyConfig]) -> list[str]:
+    """Proxies a request for `proxy_type` may use: its group, the proxy alone, or the group
+    named `proxy_type`."""
+    config = configs.get(proxy_type)
+    group = config.group if config is not None else proxy_type
+    if config is not None and group is None:
+        return [proxy_type]
+    return [key for key, candidate in configs.items() if candidate.group == group]
+
+
+proxy_pool = ProxyPool()
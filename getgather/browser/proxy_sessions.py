@@ -0,0 +1,89 @@
+"""
+Sticky proxy sessions.
+
+Proxy usernames carry a session id, which selects the upstream session and exit IP. It used to
+be the profile id, so every fresh incognito profile opened a new upstream session, with new
+handshakes, a cold exit IP and more bot challenges. With PROXY_SESSION_TTL set, browsers launched
+for the same user and location within the TTL reuse the same session id instead.
+
+A browser keeps the session id it was launched with, even past the TTL, since every new page
+authenticates again with it.
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable
+
+from getgather.api.types import RequestInfo
+from getgather.browser.egress import egress_key
+from getgather.metrics import metrics
+
+proxy_session_lookups_total = metrics.counter(
+    "proxy_session_lookups_total", "Proxy session lookups at browser launch, by proxy and result"
+)
+proxy_first_byte_seconds = metrics.histogram(
+    "proxy_first_byte_seconds",
+    "Navigation time to first response byte, by proxy and proxy session (new or reused)",
+)
+
+SessionKey = tuple[str, str, str]
+
+
+@dataclass
+class _Session:
+    session_id: str
+    expires_at: float
+
+
+class ProxySessionStore:
+    """Maps (proxy, user, location) to a reusable proxy session id, for `ttl` seconds."""
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.monotonic,
+        max_entries: int = 10_000,
+    ):
+        self._clock = clock
+        self._max_entries = max_entries
+        self._sessions: OrderedDict[SessionKey, _Session] = OrderedDict()
+        # (profile id, proxy) -> (session id, whether it was reused)
+        self._profiles: OrderedDict[tuple[str, str], tuple[str, bool]] = OrderedDict()
+
+    def session_id(
+        self, proxy_key: str, profile_id: str, info: RequestInfo | None, ttl: float
+    ) -> str:
+        """The proxy session id for a browser profile, reusing the user's recent one if any."""
+        pinned = self._profiles.get((profile_id, proxy_key))
+        if pinned is not None:
+            return pinned[0]
+
+        session_id, reused = profile_id, False
+        user_id = info.user_id if info else None
+        if ttl > 0 and user_id:
+            key = (proxy_key, user_id, egress_key(info)[1])
+            now = self._clock()
+            session = self._sessions.get(key)
+            if session is not None and session.expires_at > now:
+                session_id, reused = session.session_id, True
+            else:
+                self._sessions[key] = _Session(session_id, now + ttl)
+            self._sessions.move_to_end(key)
+            while len(self._sessions) > self._max_entries:
+                self._sessions.popitem(last=False)
+            proxy_session_lookups_total.inc(proxy=proxy_key, result="reused" if reused else "new")
+
+        self._profiles[(profile_id, proxy_key)] = (session_id, reused)
+        while len(self._profiles) > self._max_entries:
+            self._profiles.popitem(last=False)
+        return session_id
+
+    def reused(self, profile_id: str | None, proxy_key: str | None) -> bool | None:
+        """Whether a profile's proxy session was reused, None if it has none."""
+        if profile_id is None or proxy_key is None:
+            return None
+        pinned = self._profiles.get((profile_id, proxy_key))
+        return pinned[1] if pinned is not None else None
+
+
+proxy_sessions = ProxySessionStore()
@@ -1,116 +1,174 @@
+import asyncio
+import re
+import time
 from pathlib import Path
 from types import MethodType
-from urllib.parse import urlparse
-
-import aiofiles
-from patchright.async_api import BrowserContext, Page, Route
-
+from typing import Any
+
+from patchright.async_api import BrowserContext, CDPSession, Page, Request, Response, Route
+
+from getgather.browser.asset_cache import AssetCache, cache_lifetime, get_asset_cache
+from getgather.browser.blocking_stats import BlockingStats, new_tab_stats, response_sizes
+from getgather.browser.domain_matcher import DomainMatcher, load_compiled_blocklists
+from getgather.browser.filter_rules import FilterEngine, request_type
+from getgather.browser.resource_policy import (
+    ALLOW,
+    ResourcePolicy,
+    allowed_domains,
+    default_policy,
+    policy_for_url,
+)
 from getgather.config import PROJECT_DIR, settings
 from getgather.logs import logger
 
-_BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
-
-blocked_domains: frozenset[str] | None = None
-allowed_domains: frozenset[str] = frozenset(["amazon.ca", "wayfair.com"])
-
-
-def _get_domain_variants(domain: str) -> list[str]:
-    """Get domain and all parent domains for subdomain matching.
-
-    This is necessary because blocklists typically contain base domains (e.g., "doubleclick.net"),
-    but actual requests come from subdomains (e.g., "ad.doubleclick.net", "stats.doubleclick.net").
-    Without checking parent domains, most blocked requests would be missed.
-
-    Args:
-        domain: Domain to get variants for (e.g., "www.ads.google.com")
-
-    Returns:
-        List of domain variants from most specific to least, requiring at least 2 parts
-        and stopping before potential TLDs (e.g., ["www.ads.google.com", "ads.google.com", "google.com"])
+# Patchright cannot filter interception by resource type inside the browser, so the resource
+# types of a policy are blocked there by file extension instead
+_RESOURCE_TYPE_EXTENSIONS = {
+    "Image": "png jpg jpeg gif webp avif ico bmp svg".split(),
+    "Font": "woff woff2 ttf otf eot".split(),
+    "Media": "mp4 webm mp3 m4a ogg wav".split(),
+    "Stylesheet": ["css"],
+    "Script": ["js", "mjs"],
+}
+# Static assets served from and stored in the shared asset cache, matched by file extension too
+_CACHED_ASSET_URL = re.compile(r"\.(?:m?js|css)(?:[?#]|$)", re.IGNORECASE)
+# The body of a fetched response is decoded, so its encoding and length headers no longer apply
+_BODY_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding"})
+# Blocklists of up to this many domains are handed to the browser as Network.setBlockedURLs
+# patterns, so blocked hosts never round-trip through Python. The lists of the Docker image hold
+# over 100,000 domains: as patterns, a 5.6 MB message for every tab, matched one after another.
+BROWSER_BLOCKLIST_MAX_DOMAINS = 1000
+# Larger blocklists are decided in Python, for the CDP resource types trackers are loaded as
+# only. Stylesheets, images, fonts and media are left to the resource policy.
+HOST_REQUEST_PATTERNS: list[tuple[str, str | None]] = [
+    ("*", resource_type)
+    for resource_type in (
+        "Document",
+        "Script",
+        "XHR",
+        "Fetch",
+        "Ping",
+        "EventSource",
+        "WebSocket",
+        "Other",
+    )
+]
+
+
+blocked_domain_matcher: DomainMatcher | None = None
+# setBlockedURLs patterns for the blocklists, None when they are decided in Python
+blocked_url_patterns: list[str] | None = None
+filter_engine: FilterEngine | None = None
+
+
+def blocklist_paths() -> list[Path]:
+    return sorted(PROJECT_DIR.glob("blocklists-*.txt"))
+
+
+def compiled_blocklist_path() -> Path:
+    return PROJECT_DIR / "blocklists.bin"
+
+
+def filter_paths() -> list[Path]:
+    """Filter rule files, in Adblock syntax."""
+    return sorted(PROJECT_DIR.glob("filters-*.txt"))
+
+
+def _policy_url_patterns(policy: ResourcePolicy) -> list[str]:
+    """Network.setBlockedURLs patterns for the requests `policy` blocks on every page.
+
+    Resource types are matched by file extension. Third-party scripts depend on the page that
+    makes the request, so they are left to Python.
     """
-    parts = domain.split(".")
-    variants: list[str] = []
-
-    # Generate variants from most specific to base domain, stopping at 2 parts minimum
-    # This prevents treating TLDs like 'co.uk' or 'com' as blockable domains
-    for i in range(len(parts) - 1):
-        if len(parts) - i >= 2:
-            variants.append(".".join(parts[i:]))
-
-    return variants
+    patterns: list[str] = []
+    for glob, resource_type in policy.request_patterns():
+        if resource_type is None:
+            patterns.append(glob)
+        elif request_type(resource_type) in policy.block_types:
+            for extension in _RESOURCE_TYPE_EXTENSIONS.get(resource_type, []):
+                patterns += [f"*.{extension}", f"*.{extension}?*"]
+    return patterns
 
 
-async def _load_blocklist_from_file(path: Path) -> frozenset[str]:
-    """Load blocklist domains from a file.
+def _browser_blocked_urls(matcher: DomainMatcher) -> list[str] | None:
+    """setBlockedURLs patterns for the domains of `matcher`, or None if it is too large."""
+    if len(matcher) > BROWSER_BLOCKLIST_MAX_DOMAINS:
+        return None
+    # The browser cannot exempt an allowed subdomain of a blocked domain
+    if any(matcher.match_host(domain) for domain in allowed_domains()):
+        return None
+    return [url for domain in matcher.domains() for url in (f"*://{domain}/*", f"*://*.{domain}/*")]
 
-    Args:
-        path: Path to the blocklist file
-
-    Returns:
-        Frozenset of domain strings
-    """
-    logger.debug(f"Loading blocked domains from {path}...")
-    async with aiofiles.open(path, "r") as f:
-        lines = await f.readlines()
-        domains = frozenset(line.strip() for line in lines if line.strip())
-        logger.debug(f"Loaded {len(domains)} domains from {path}")
-        return domains
 
+def _blocklist_request_patterns() -> list[tuple[str, str | None]]:
+    patterns = list(HOST_REQUEST_PATTERNS) if blocked_url_patterns is None else []
+    return patterns + (filter_engine.request_patterns() if filter_engine is not None else [])
 
-def _extract_domain(url: str) -> str:
-    """Extract the domain from a URL.
 
-    Args:
-        url: Full URL string
+def interception_patterns(policy: ResourcePolicy) -> list[tuple[str, str | None]]:
+    """(URL glob, CDP resource type) pairs for the requests decided in Python under `policy`.
 
-    Returns:
-        The domain portion (e.g., "example.com")
+    Those are the requests to blocked hosts, unless the browser blocks them, third-party scripts
+    and the requests filter rules may block.
     """
-    try:
-        parsed = urlparse(url)
-        return parsed.netloc.lower()
-    except Exception:
-        return ""
+    patterns = _blocklist_request_patterns()
+    if policy.block_scripts and ("*", "Script") not in patterns:
+        patterns.append(("*", "Script"))
+    return patterns
 
 
 async def load_blocklists() -> None:
-    global blocked_domains
+    global blocked_domain_matcher, blocked_url_patterns, filter_engine
     logger.info("Loading blocklists...")
-    all_domains: set[str] = set()
-
-    blocklist_files = list(PROJECT_DIR.glob("blocklists-*.txt"))
-    if blocklist_files:
-        for blocklist_file in blocklist_files:
-            logger.debug(f"Loading blocklist file: {blocklist_file.name}")
-            domains = await _load_blocklist_from_file(blocklist_file)
-            all_domains.update(domains)
-
-        filtered_domains = all_domains - allowed_domains
-        blocked_domains = frozenset(filtered_domains)
 
+    paths = blocklist_paths()
+    if paths:
+        blocked_domain_matcher = await asyncio.to_thread(
+            load_compiled_blocklists, paths, allowed_domains(), compiled_blocklist_path()
+        )
     else:
         logger.warning("No blocklist files found matching pattern 'blocklists-*.txt'")
-        blocked_domains = frozenset()
+        blocked_domain_matcher = DomainMatcher()
+    blocked_url_patterns = _browser_blocked_urls(blocked_domain_matcher)
 
-    logger.info(f"Blocklists loaded: {len(blocked_domains)} total domains")
+    filter_engine = await asyncio.to_thread(FilterEngine.load, filter_paths())
+    logger.info(
+        f"Blocklists loaded: {len(blocked_domain_matcher)} total domains, "
+        f"{len(filter_engine)} filter rules, "
+        f"{'blocked in the browser' if blocked_url_patterns is not None else 'decided in Python'}"
+    )
+
+
+async def get_blocklist_patterns() -> tuple[list[str], list[tuple[str, str | None]]]:
+    """The setBlockedURLs patterns the browser blocks, and the (URL glob, CDP resource type)
+    pairs for the requests the blocklists or filter rules need to decide on in Python."""
+    if filter_engine is None:
+        await load_blocklists()
+    return blocked_url_patterns or [], _blocklist_request_patterns()
 
 
 async def configure_context(context: BrowserContext) -> None:
-    """Install resource blocking for all existing and future pages in the context."""
-    if not settings.SHOULD_BLOCK_UNWANTED_RESOURCES:
+    """Install resource blocking and the asset cache for all future pages in the context."""
+    if getattr(context, "_gather_resource_blocking_configured", False):
         return
 
-    if getattr(context, "_gather_resource_blocking_configured", False):
+    blocking = settings.SHOULD_BLOCK_UNWANTED_RESOURCES
+    asset_cache = await asyncio.to_thread(get_asset_cache)
+    if not blocking and asset_cache is None:
         return
 
-    if blocked_domains is None:
+    if blocking and blocked_domain_matcher is None:
         await load_blocklists()
 
     original_new_page = context.new_page
 
     async def new_page_with_blocking(self: BrowserContext) -> Page:
         page = await original_new_page()
-        await _maybe_block_unwanted_resources(page)
+        # Routes registered last run first: blocking is decided before the cache is looked up
+        if asset_cache is not None:
+            await _cache_assets(page, asset_cache)
+        if blocking:
+            await _maybe_block_unwanted_resources(page)
         return page
 
     context.new_page = MethodType(new_page_with_blocking, context)
@@ -118,43 +176,177 @@ async def configure_context(context: BrowserContext) -> None:
     setattr(context, "_gather_resource_blocking_configured", True)
 
 
-async def _maybe_block_unwanted_resources(page: Page) -> None:
-    await page.route("**/*", _handle_route)
+async def _cache_assets(page: Page, asset_cache: AssetCache) -> None:
+    async def handle_route(route: Route) -> None:
+        await _handle_asset_route(route, asset_cache)
 
+    await page.route(_CACHED_ASSET_URL, handle_route)
 
-async def should_be_blocked(url: str) -> bool:
-    domain = _extract_domain(url)
-    if not domain:
-        return False
 
-    if blocked_domains is None:
-        return False
+async def _handle_asset_route(route: Route, asset_cache: AssetCache) -> None:
+    """Serve a script or stylesheet from the asset cache, or fetch it and store it."""
+    request = route.request
+    try:
+        if request.method != "GET" or request.resource_type not in ("script", "stylesheet"):
+            await route.fallback()
+            return
+        asset = await asyncio.to_thread(asset_cache.get, request.url)
+        if asset is not None:
+            await route.fulfill(status=asset.status, headers=asset.headers, body=asset.body)
+            return
 
-    for variant in _get_domain_variants(domain):
-        if variant in blocked_domains:
-            return True
+        response = await route.fetch()
+        body = await response.body()
+        sent_headers = await _fetch_headers(request)
+    except Exception as exc:
+        logger.debug(
+            "Asset route falls back to the network.",
+            extra={"url": request.url, "error": str(exc)},
+        )
+        # The request is left to the browser, so the page does not wait on it forever
+        try:
+            await route.fallback()
+        except Exception:
+            pass  # closed page or context, or the route was already handled
+        return
 
-    return False
+    headers = {
+        name: value for name, value in response.headers.items() if name.lower() not in _BODY_HEADERS
+    }
+    try:
+        await route.fulfill(status=response.status, headers=headers, body=body)
+    except Exception as exc:
+        logger.debug(
+            "Asset route handling ignored for closed page or context.",
+            extra={"url": request.url, "error": str(exc)},
+        )
+        return
+    lifetime = cache_lifetime(request.method, response.status, sent_headers, headers)
+    if lifetime is not None:
+        await asyncio.to_thread(
+            asset_cache.put, request.url, response.status, headers, body, lifetime
+        )
 
 
-async def _handle_route(route: Route) -> None:
-    request = route.request
-    resource_type = request.resource_type
-    url = request.url
+async def _fetch_headers(request: Request) -> dict[str, str]:
+    """The headers route.fetch() sent for `request`: its own and the cookies of its context."""
+    headers = dict(request.headers)
+    cookies = await request.frame.page.context.cookies(request.url)
+    if cookies:
+        headers["cookie"] = "; ".join(f"{c.get('name')}={c.get('value')}" for c in cookies)
+    return headers
 
-    try:
-        if resource_type in _BLOCKED_RESOURCE_TYPES:
-            await route.abort()
-            return
 
-        if await should_be_blocked(url):
-            logger.debug(f"DENY URL: {url}")
-            await route.abort()
+async def _maybe_block_unwanted_resources(page: Page) -> None:
+    # The policy, and the blocklists when they are small enough, are applied inside the browser,
+    # so the requests they block never round-trip through Python
+    cdp = await page.context.new_cdp_session(page)
+    await cdp.send("Network.enable")  # type: ignore[reportUnknownMemberType]
+    policy = default_policy()
+    stats = new_tab_stats()
+    fetch_enabled = False
+
+    async def apply_policy(new_policy: ResourcePolicy) -> None:
+        nonlocal policy, fetch_enabled
+        policy = new_policy
+        urls = _policy_url_patterns(policy) + (blocked_url_patterns or [])
+        await cdp.send("Network.setBlockedURLs", {"urls": urls})  # type: ignore[reportUnknownMemberType]
+        # Everything else is decided in Python, in one interception
+        if patterns := interception_patterns(policy):
+            await cdp.send(  # type: ignore[reportUnknownMemberType]
+                "Fetch.enable",
+                {
+                    "patterns": [
+                        {"urlPattern": glob, "resourceType": resource_type}
+                        for glob, resource_type in patterns
+                    ]
+                },
+            )
+            fetch_enabled = True
+        elif fetch_enabled:
+            await cdp.send("Fetch.disable")  # type: ignore[reportUnknownMemberType]
+            fetch_enabled = False
+
+    # The policy follows the site the tab navigates to
+    async def on_request(request: Request) -> None:
+        if not request.is_navigation_request() or request.frame != page.main_frame:
             return
+        if (new_policy := policy_for_url(request.url)) is not policy:
+            logger.debug(f"Applying resource policy '{new_policy.name}' for {request.url}")
+            await apply_policy(new_policy)
+
+    async def on_request_paused(event: dict[str, Any]) -> None:
+        await _handle_paused_request(cdp, event, policy, stats)
+
+    cdp.on("Fetch.requestPaused", on_request_paused)
+    await apply_policy(policy)
+    page.on("request", on_request)
+    if response_sizes.needs_samples():
+        # Response sizes, for the bytes saved estimate, from the first tabs only
+        page.on("response", _observe_response_size)
+
+
+def _observe_response_size(response: Response) -> None:
+    response_sizes.observe(response.request.resource_type, response.headers)
+
 
-        await route.continue_()
+async def _handle_paused_request(
+    cdp: CDPSession, event: dict[str, Any], policy: ResourcePolicy, stats: BlockingStats
+) -> None:
+    request = event["request"]
+    url: str = request["url"]
+    resource_type: str | None = event.get("resourceType")
+    started = time.perf_counter()
+    try:
+        reason = block_reason(url, resource_type, request["headers"].get("Referer"), policy)
+        if reason is not None:
+            logger.debug(f"DENY URL ({reason}): {url}")
+            stats.record_blocked(url, resource_type, reason)
+            await cdp.send(  # type: ignore[reportUnknownMemberType]
+                "Fetch.failRequest",
+                {"requestId": event["requestId"], "errorReason": "BlockedByClient"},
+            )
+            return
+        await cdp.send("Fetch.continueRequest", {"requestId": event["requestId"]})  # type: ignore[reportUnknownMemberType]
     except Exception as exc:
         logger.debug(
-            "Route handling ignored for closed page or context.",
+            "Paused request handling ignored for closed page or context.",
             extra={"url": url, "error": str(exc)},
         )
+    finally:
+        stats.record_intercepted(time.perf_counter() - started)
+
+
+def block_reason(
+    url: str,
+    resource_type: str | None = None,
+    document_url: str | None = None,
+    policy: ResourcePolicy | None = None,
+) -> str | None:
+    """Why a request is blocked by the resource policy, the domain lists or the filter rules.
+
+    `resource_type` is a CDP or Playwright resource type and `document_url` the page that made
+    the request, used by rules restricted to resource types, third parties or domains. Returns
+    None when the request is allowed.
+    """
+    if policy is not None:
+        decision = policy.decide(url, resource_type, document_url)
+        if decision == ALLOW:
+            return None
+        if decision is not None:
+            return decision
+    if blocked_domain_matcher is not None and blocked_domain_matcher.matches(url):
+        return "domain"
+    if filter_engine is not None and filter_engine.match(url, resource_type, document_url):
+        return "filter"
+    return None
+
+
+def should_be_blocked(
+    url: str,
+    resource_type: str | None = None,
+    document_url: str | None = None,
+    policy: ResourcePolicy | None = None,
+) -> bool:
+    """Whether a request is blocked, see `block_reason`."""
+    return block_reason(url, resource_type, document_url, policy) is not None
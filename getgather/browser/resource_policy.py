@@ -0,0 +1,135 @@
+"""
+Per-brand resource blocking policies.
+
+Which resource types can be blocked without breaking a site differs per brand: some render and
+distill fine without CSS or third-party scripts, others break. Policies are declared in
+resource_policies.yaml (or the file in RESOURCE_POLICY_FILE) and picked by the hostname a tab
+navigates to.
+"""
+
+from dataclasses import dataclass
+from functools import cache
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+from getgather.browser.domain_matcher import url_host
+from getgather.browser.filter_rules import (
+    CDP_RESOURCE_TYPES,
+    base_domain,
+    on_domains,
+    request_type,
+)
+from getgather.config import settings
+from getgather.logs import logger
+
+DEFAULT_POLICY = "default"
+ALLOW = "allow"
+SCRIPT_CLASSES = frozenset({"third-party"})
+PACKAGED_POLICY_FILE = Path(__file__).parent / "resource_policies.yaml"
+
+
+@dataclass(frozen=True)
+class ResourcePolicy:
+    name: str
+    hosts: frozenset[str] = frozenset()
+    block_types: frozenset[str] = frozenset({"image", "media", "font"})
+    block_scripts: frozenset[str] = frozenset()
+    block_domains: frozenset[str] = frozenset()
+    allow_domains: frozenset[str] = frozenset()
+
+    @classmethod
+    def from_config(cls, name: str, config: dict[str, Any]) -> "ResourcePolicy":
+        def names(key: str, allowed: frozenset[str] | None = None) -> frozenset[str]:
+            configured: list[Any] = config.get(key) or []
+            values = frozenset(str(value).lower() for value in configured)
+            if allowed is not None and (unknown := values - allowed):
+                raise ValueError(f"Resource policy '{name}': unknown {key} {sorted(unknown)}")
+            return values
+
+        return cls(
+            name=name,
+            hosts=names("hosts"),
+            block_types=names("block_types", frozenset(CDP_RESOURCE_TYPES)),
+            block_scripts=names("block_scripts", SCRIPT_CLASSES),
+            block_domains=names("block_domains"),
+            allow_domains=names("allow_domains"),
+        )
+
+    def applies_to(self, host: str) -> bool:
+        return on_domains(host, self.hosts)
+
+    def decide(self, url: str, resource_type: str | None, document_url: str | None) -> str | None:
+        """The reason to block a request ("type", "third-party" or "domain"), ALLOW to exempt it
+        from the blocklists, or None to leave it to them.
+
+        Documents are never blocked. `allow_domains` only overrides the blocklists and filter
+        rules, resource types are blocked on every domain. Like the domains removed from the
+        blocklists, allowed domains are matched exactly, not their subdomains.
+        """
+        option_type = request_type(resource_type) if resource_type is not None else "other"
+        if option_type is None:
+            return None
+        host = url_host(url)
+        if option_type in self.block_types:
+            return "type"
+        if on_domains(host, self.block_domains):
+            return "domain"
+        if option_type == "script" and "third-party" in self.block_scripts and document_url:
+            document_host = url_host(document_url)
+            if document_host and base_domain(host) != base_domain(document_host):
+                return "third-party"
+        if host in self.allow_domains:
+            return ALLOW
+        return None
+
+    def request_patterns(self) -> list[tuple[str, str | None]]:
+        """(URL glob, CDP resource type) pairs for the requests this policy decides on."""
+        patterns: list[tuple[str, str | None]] = []
+        for option_type in sorted(self.block_types):
+            patterns.extend(("*", cdp_type) for cdp_type in CDP_RESOURCE_TYPES[option_type])
+        if self.block_scripts and "script" not in self.block_types:
+            patterns.append(("*", "Script"))
+        for domain in sorted(self.block_domains):
+            patterns.extend([(f"*://{domain}/*", None), (f"*://*.{domain}/*", None)])
+        return patterns
+
+
+def policy_file() -> Path:
+    if settings.RESOURCE_POLICY_FILE:
+        return Path(settings.RESOURCE_POLICY_FILE)
+    return PACKAGED_POLICY_FILE
+
+
+@cache
+def load_policies(path: Path | None = None) -> dict[str, ResourcePolicy]:
+    path = path or policy_file()
+    with open(path) as f:
+        data: dict[str, Any] = yaml.safe_load(f) or {}
+    policies = {
+        name: ResourcePolicy.from_config(name, config or {}) for name, config in data.items()
+    }
+    policies.setdefault(DEFAULT_POLICY, ResourcePolicy(name=DEFAULT_POLICY))
+    logger.debug(f"Loaded {len(policies)} resource policies from {path}")
+    return policies
+
+
+def default_policy() -> ResourcePolicy:
+    return load_policies()[DEFAULT_POLICY]
+
+
+def policy_for_url(url: str) -> ResourcePolicy:
+    """The policy of the brand hosting `url`, or the default policy."""
+    policies = load_policies()
+    host = url_host(url)
+    if host:
+        for policy in policies.values():
+            if policy.applies_to(host):
+                return policy
+    return default_policy()
+
+
+def allowed_domains() -> frozenset[str]:
+    """Domains allowed by any policy. They are removed from the blocklists."""
+    return frozenset[str]().union(*(policy.allow_domains for policy in load_policies().values()))
@@ -10,11 +10,16 @@ from fastapi import HTTPException
 from nanoid import generate
 from patchright.async_api import BrowserContext, Page, Playwright, async_playwright
 
+from getgather.api.types import request_info
+from getgather.browser.egress import egress_key, egress_validator
+from getgather.browser.idle_evictor import idle_evictor
 from getgather.browser.profile import BrowserProfile
 from getgather.browser.resource_blocker import configure_context
+from getgather.config import settings
 from getgather.logs import logger
 
 FRIENDLY_CHARS: str = "23456789abcdefghijkmnpqrstuvwxyz"
+EGRESS_CHECK_TIMEOUT = 10  # seconds
 
 
 class BrowserStartupError(HTTPException):
@@ -43,6 +48,8 @@ class BrowserSession:
         self._playwright: Playwright | None = None
         self._context: BrowserContext | None = None
         self.last_active_timestamp: datetime | None = None
+        self._ready = asyncio.Event()  # cleared while the browser is being recycled
+        self._ready.set()
 
         self.session_id = generate(FRIENDLY_CHARS, 8)
         self.total_event = 0
@@ -68,11 +75,23 @@ class BrowserSession:
         assert self._playwright is not None, "Browser session not started"
         return self._playwright
 
+    @property
+    def _idle_key(self) -> str:
+        return f"session:{self.profile.id}"
+
     def _update_last_active(self):
-        """Update the last active timestamp for this session."""
+        """Update the last active timestamp for this session and push back its idle deadline."""
         self.last_active_timestamp = datetime.now()
+        idle_evictor.touch(self._idle_key, "session", self._evict_idle)
+
+    async def _evict_idle(self) -> None:
+        if self._sessions.get(self.profile.id) is not self:
+            return
+        await self.stop()
+        logger.info(f"Successfully stopped session {self.profile.id}")
 
     async def new_page(self) -> Page:
+        await self._ready.wait()
         logger.info(f"Creating new page in context with profile {self.profile.id}")
         self._update_last_active()
         page = await self.context.new_page()
@@ -80,13 +99,14 @@ class BrowserSession:
 
     async def page(self) -> Page:
         # TODO: It's okay for now to return the last page. We may want to track all pages in the future.
+        await self._ready.wait()
         self._update_last_active()
         if self.context.pages and len(self.context.pages) > 0:
             logger.info(f"Returning existing page in context with profile {self.profile.id}")
             return self.context.pages[-1]
         return await self.new_page()
 
-    async def start(self, debug_url: str | None = "https://ip.fly.dev/all") -> BrowserSession:
+    async def start(self, validate_egress: bool = True) -> BrowserSession:
         if self.profile.id in BrowserSession._sessions:
             # Session already started
             return BrowserSession._sessions[self.profile.id]
@@ -101,23 +121,12 @@ class BrowserSession:
                     extra={"profile_id": self.profile.id},
                 )
 
-                self._playwright = await async_playwright().start()
-                self._context = await self.profile.launch(
-                    profile_id=self.profile.id, browser_type=self.playwright.chromium
-                )
-
-                # Set last active timestamp and safely register the session at the end
-                self.last_active_timestamp = datetime.now()
-                self._sessions[self.profile.id] = self
-                logger.info(
-                    f"Session {self.profile.id} registered in sessions with last_active_timestamp {self.last_active_timestamp}"
-                )
-
-                await configure_context(self._context)
+                await self._launch()
 
-                if debug_url:
-                    debug_page = await self.page()
-                    await debug_page.goto(debug_url)
+                if validate_egress:
+                    await egress_validator.validate(
+                        egress_key(request_info.get()), self._check_egress
+                    )
 
                 # Intentionally create a new page to apply resources filtering (from blocklists)
                 await self.new_page()
@@ -128,6 +137,60 @@ class BrowserSession:
                 logger.error(f"Error starting browser: {e}")
                 raise BrowserStartupError(f"Failed to start browser: {e}") from e
 
+    async def _check_egress(self) -> str | None:
+        # A page of its own, closed afterwards so that it does not hold up _drain_pages
+        page = await self.context.new_page()
+        try:
+            await page.goto(settings.IP_CHECK_URL, timeout=EGRESS_CHECK_TIMEOUT * 1000)
+            return (await page.evaluate("() => document.body.innerText")).strip() or None
+        finally:
+            with suppress(Exception):
+                await page.close()
+
+    async def _launch(self) -> None:
+        self._playwright = await async_playwright().start()
+        self._context = await self.profile.launch(
+            profile_id=self.profile.id, browser_type=self.playwright.chromium
+        )
+
+        # Set last active timestamp and safely register the session at the end
+        self._update_last_active()
+        self._sessions[self.profile.id] = self
+        logger.info(
+            f"Session {self.profile.id} registered in sessions with last_active_timestamp {self.last_active_timestamp}"
+        )
+
+        await configure_context(self._context)
+
+    async def recycle(self, drain_timeout: float) -> None:
+        """Restart the browser on the same profile directory to release its memory.
+
+        New pages are held back while recycling, and in-flight pages get up to
+        `drain_timeout` seconds to finish. Cookies live in the profile directory,
+        so sign-in state survives the restart.
+        """
+        self._ready.clear()
+        try:
+            async with self._locks[self.profile.id]:
+                await self._drain_pages(drain_timeout)
+                await self.stop()
+                await self._launch()
+                await self.context.new_page()
+        finally:
+            self._ready.set()
+
+    async def _drain_pages(self, timeout: float) -> None:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self._context is not None:
+            busy = [page for page in self.context.pages if page.url != "about:blank"]
+            if not busy:
+                return
+            if loop.time() >= deadline:
+                logger.warning(f"Recycling {self.profile.id} with {len(busy)} page(s) still open")
+                return
+            await asyncio.sleep(1)
+
     async def stop(self):
         logger.info(
             "Closing browser",
@@ -151,6 +214,7 @@ class BrowserSession:
             self.profile.cleanup(self.profile.id)
         finally:  # ensure we always remove session from tracking
             self._sessions.pop(self.profile.id, None)
+            idle_evictor.discard(self._idle_key)
             self._context = None
             self._playwright = None
 
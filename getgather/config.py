@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Mapping
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -24,18 +25,67 @@ class Settings(BaseSettings):
     # Browser Package Settings
     HEADLESS: bool = False
     SHOULD_BLOCK_UNWANTED_RESOURCES: bool = True
+    # Per-brand resource blocking policies (defaults to the packaged resource_policies.yaml)
+    RESOURCE_POLICY_FILE: str = ""
 
     BROWSER_TIMEOUT: int = 30_000
+    # MCP tool calls are cancelled after this many seconds, closing their tabs (0 disables);
+    # clients can ask for less with the x-request-timeout header
+    TOOL_CALL_TIMEOUT: int = 300
+    # How long check_signin waits for a sign-in to complete, in seconds (per brand: GatherMCP)
+    SIGNIN_TIMEOUT: int = 120
+    # Sign-in state (tabs, results, pending actions) not accessed for this long is dropped,
+    # in seconds, and at most this many entries are kept per kind
+    DPAGE_TTL: int = 3600
+    DPAGE_MAX_ENTRIES: int = 1000
+    # Where sign-in state shared by workers lives: empty for in-process, or sqlite:///path/to/db
+    # on a volume shared by the workers
+    DPAGE_STATE_URL: str = ""
+
+    # Derive navigation, distillation and dpage timeouts from the latencies observed per brand:
+    # p99 × TIMEOUT_P99_FACTOR, between TIMEOUT_MIN and TIMEOUT_MAX seconds, and at most
+    # TIMEOUT_DEFAULT_FACTOR × the hardcoded timeout of the call site
+    ADAPTIVE_TIMEOUTS: bool = True
+    TIMEOUT_P99_FACTOR: float = 1.5
+    TIMEOUT_MIN: float = 5
+    TIMEOUT_MAX: float = 180
+    TIMEOUT_DEFAULT_FACTOR: float = 2
+
+    # Disk cache for static assets shared by all browsers, in MB. Off by default (0): every
+    # script and stylesheet is then intercepted to be looked up
+    ASSET_CACHE_MAX_MB: int = 0
+
+    # Clone new browser profiles from a prepared template instead of an empty directory
+    USE_PROFILE_TEMPLATE: bool = True
 
     # Default Proxy Type (optional - e.g., "proxy-0", "proxy-1")
     # If not set, no proxy will be used unless specified via x-proxy-type header
     DEFAULT_PROXY_TYPE: str = ""
 
     HOSTNAME: str = ""
+    # Base URLs of the other nodes by their HOSTNAME, as JSON, to forward sign-in requests to
+    # the node whose browser holds them, e.g. {"node-b": "http://10.0.0.2:23456"}
+    NODE_ROUTES: dict[str, str] = {}
+
+    # Page used to validate that a new browser can reach the internet through its proxy
+    IP_CHECK_URL: str = "https://ip.fly.dev/ip"
+    # How long a successful egress validation is trusted per proxy route, in seconds
+    # (0 disables caching)
+    EGRESS_CHECK_TTL: int = 600
+    # How long browsers of the same user and location reuse a proxy session, in seconds (0 disables)
+    PROXY_SESSION_TTL: int = 0
 
     # Max session age, in minutes
     BROWSER_SESSION_AGE: int = 60
 
+    # Memory governor: browsers above these limits are recycled (0 disables the limit)
+    BROWSER_MAX_RSS_MB: int = 2048
+    BROWSER_MAX_TABS: int = 30
+    # How often the memory governor samples browsers, in seconds (0 disables the governor)
+    BROWSER_GOVERNOR_INTERVAL: int = 60
+    # How long to wait for in-flight tabs before recycling a browser, in seconds
+    BROWSER_RECYCLE_DRAIN_TIMEOUT: int = 60
+
     @property
     def data_dir(self) -> Path:
         path = Path(self.DATA_DIR).resolve() if self.DATA_DIR else PROJECT_DIR / "data"
@@ -60,6 +110,22 @@ class Settings(BaseSettings):
         path.mkdir(parents=True, exist_ok=True)
         return path
 
+    @property
+    def profile_template_dir(self) -> Path:
+        return self.data_dir / "profile-template"
+
+    @property
+    def asset_cache_dir(self) -> Path:
+        path = self.data_dir / "asset-cache"
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    @property
+    def trash_dir(self) -> Path:
+        path = self.data_dir / "trash"
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
     @property
     def persistent_store_dir(self) -> Path:
         path = self.data_dir / "store"
@@ -67,15 +133,17 @@ class Settings(BaseSettings):
         return path
 
     @property
-    def proxy_configs(self) -> dict[str, ProxyConfig]:
-        """Load proxy configurations from YAML file or environment variable (cached).
+    def proxy_configs(self) -> Mapping[str, ProxyConfig]:
+        """Proxy configurations from YAML file or environment variable (cached).
+
+        Parsed once and reloaded when the source changes, see ProxyRegistry.
 
         Returns:
             dict: Mapping of proxy identifiers (e.g., 'proxy-0') to ProxyConfig objects
         """
-        from getgather.browser.proxy_loader import load_proxy_configs
+        from getgather.browser.proxy_loader import proxy_registry
 
-        return load_proxy_configs()
+        return proxy_registry.configs()
 
 
 settings = Settings()
@@ -1,7 +1,9 @@
 import asyncio
 import json
+import math
 import os
 import re
+import time
 import urllib.parse
 from dataclasses import dataclass
 from datetime import datetime
@@ -16,10 +18,15 @@ from bs4.element import Tag
 from nanoid import generate
 from patchright.async_api import Locator, Page
 
+from getgather.api.types import request_info
+from getgather.browser.egress import egress_key, egress_validator
 from getgather.browser.profile import BrowserProfile
 from getgather.browser.session import BrowserSession, browser_session
 from getgather.config import settings
+from getgather.flow_graph import distill_seconds, flow_graph, flow_key, flow_predictions_total
+from getgather.latency_budgets import latency_budgets
 from getgather.logs import logger
+from getgather.request_deadline import cleanup_after_cancel, deadline_remaining
 
 
 @dataclass
@@ -387,6 +394,12 @@ async def terminate(distilled: str) -> bool:
     return False
 
 
+def asks_for_input(distilled: str) -> bool:
+    """Whether a distilled screen is a form for the user (e.g. a sign-in) rather than a result."""
+    document = BeautifulSoup(distilled, "html.parser")
+    return document.select_one("[gg-stop]") is None and document.find("input") is not None
+
+
 async def check_error(distilled: str) -> bool:
     document = BeautifulSoup(distilled, "html.parser")
     errors = document.find_all(attrs={"gg-error": True})
@@ -405,13 +418,87 @@ def load_distillation_patterns(path: str) -> list[Pattern]:
     return patterns
 
 
+def predicted_patterns(
+    hostname: str | None, previous: str | None, patterns: list[Pattern]
+) -> list[Pattern]:
+    """The patterns to probe first after an action on the `previous` screen.
+
+    These are its likely successors in the flow graph of the site and the patterns of every
+    site (network errors). The screen itself is left out: a page still showing it goes through
+    the full set. Empty when nothing is predicted yet.
+    """
+    if not previous:
+        return []
+    successors = flow_graph.successors(hostname, flow_key(previous))
+    if not successors:
+        return []
+    keys = set(successors)
+    predicted: list[Pattern] = []
+    for item in patterns:
+        root = item.pattern.find("html")
+        domain = root.get("gg-domain") if isinstance(root, Tag) else None
+        if not domain or flow_key(item.name) in keys:
+            predicted.append(item)
+    return predicted
+
+
 async def distill(
     hostname: str | None,
     page: Page,
     patterns: list[Pattern],
     reload_on_error: bool = True,
     profile_id: str | None = None,
+    previous: str | None = None,
 ) -> Match | None:
+    """The best matching pattern for the page.
+
+    `previous` is the pattern matched before the last action: its likely successors in the flow
+    graph of the site are probed first, and the other patterns only when none of them matches.
+    """
+    started = time.perf_counter()
+    predicted = predicted_patterns(hostname, previous, patterns)
+    result: list[Match] = []
+    if predicted:
+        result = await _distill_matches(hostname, page, predicted, profile_id)
+        flow_predictions_total.inc(result="hit" if result else "miss")
+    if result:
+        distill_seconds.observe(time.perf_counter() - started, mode="predicted")
+    else:
+        probed = {id(item) for item in predicted}
+        rest = [item for item in patterns if id(item) not in probed]
+        result = await _distill_matches(hostname, page, rest, profile_id)
+        distill_seconds.observe(time.perf_counter() - started, mode="full")
+
+    result = sorted(result, key=lambda x: x.priority)
+
+    if len(result) == 0:
+        logger.debug("No matches found")
+        return None
+    else:
+        logger.debug(f"Number of matches: {len(result)}")
+        for item in result:
+            logger.debug(f" - {item.name} with priority {item.priority}")
+        match = result[0]
+        logger.info(f"✓ Best match: {match.name}")
+
+        if reload_on_error and any(pattern in match.name for pattern in NETWORK_ERROR_PATTERNS):
+            logger.info(f"Error pattern detected: {match.name}")
+            await page.reload(timeout=settings.BROWSER_TIMEOUT, wait_until="domcontentloaded")
+            logger.info("Retrying distillation after error...")
+            return await distill(
+                hostname,
+                page,
+                patterns,
+                reload_on_error=False,
+                profile_id=profile_id,
+                previous=previous,
+            )
+        return match
+
+
+async def _distill_matches(
+    hostname: str | None, page: Page, patterns: list[Pattern], profile_id: str | None = None
+) -> list[Match]:
     result: list[Match] = []
 
     for item in patterns:
@@ -507,24 +594,7 @@ async def distill(
                 )
             )
 
-    result = sorted(result, key=lambda x: x.priority)
-
-    if len(result) == 0:
-        logger.debug("No matches found")
-        return None
-    else:
-        logger.debug(f"Number of matches: {len(result)}")
-        for item in result:
-            logger.debug(f" - {item.name} with priority {item.priority}")
-        match = result[0]
-        logger.info(f"✓ Best match: {match.name}")
-
-        if reload_on_error and any(pattern in match.name for pattern in NETWORK_ERROR_PATTERNS):
-            logger.info(f"Error pattern detected: {match.name}")
-            await page.reload(timeout=settings.BROWSER_TIMEOUT, wait_until="domcontentloaded")
-            logger.info("Retrying distillation after error...")
-            return await distill(hostname, page, patterns, reload_on_error=False)
-        return match
+    return result
 
 
 async def run_distillation_loop(
@@ -536,9 +606,13 @@ async def run_distillation_loop(
     stop_ok: bool = False,
     close_page: bool = False,
     page: Page | None = None,
+    handoff: bool = False,
 ) -> tuple[bool, str, ConversionResult | None]:
     """Run the distillation loop.
 
+    With `handoff`, the loop stops as soon as the page asks for input and leaves it open, so the
+    caller can hand it over to an interactive dpage without loading it again.
+
     Returns:
         terminated: bool indicating successful termination
         distilled: the raw distilled HTML
@@ -555,76 +629,97 @@ async def run_distillation_loop(
 
     async with browser_session(profile, stop_ok=stop_ok) as session:
         page = page or await session.new_page()
-
-        logger.info(f"Starting browser {profile.id}")
-        logger.info(f"Navigating to {location}")
         try:
-            await page.goto(location, timeout=settings.BROWSER_TIMEOUT)
-        except Exception as error:
-            logger.error(f"Failed to navigate to {location}: {error}")
-            await report_distill_error(
-                error=error,
-                page=page,
-                profile_id=profile.id,
-                location=location,
-                hostname=hostname,
-                iteration=0,
-            )
-            raise ValueError(f"Failed to navigate to {location}: {error}")
-
-        if settings.LOG_LEVEL == "DEBUG":
-            await capture_page_artifacts(
-                page,
-                identifier=profile.id,
-                prefix="distill_debug",
-            )
+            logger.info(f"Starting browser {profile.id}")
+            logger.info(f"Navigating to {location}")
+            route = egress_key(request_info.get())
+            try:
+                goto_timeout = deadline_remaining(settings.BROWSER_TIMEOUT / 1000) * 1000
+                await page.goto(location, timeout=goto_timeout)
+                egress_validator.record_navigation(route)
+            except Exception as error:
+                egress_validator.record_navigation(route, error)
+                logger.error(f"Failed to navigate to {location}: {error}")
+                await report_distill_error(
+                    error=error,
+                    page=page,
+                    profile_id=profile.id,
+                    location=location,
+                    hostname=hostname,
+                    iteration=0,
+                )
+                raise ValueError(f"Failed to navigate to {location}: {error}")
 
-        TICK = 1  # seconds
-        max = timeout // TICK
+            if settings.LOG_LEVEL == "DEBUG":
+                await capture_page_artifacts(
+                    page,
+                    identifier=profile.id,
+                    prefix="distill_debug",
+                )
 
-        current = Match(name="", priority=-1, distilled="")
+            TICK = 1  # seconds
+            max = math.ceil(latency_budgets.timeout("distillation", hostname, timeout) / TICK)
+
+            current = Match(name="", priority=-1, distilled="")
+            started = time.monotonic()
+            seen: set[str] = set()
+
+            for iteration in range(max):
+                logger.info("")
+                logger.info(f"Iteration {iteration + 1} of {max}")
+                await asyncio.sleep(TICK)
+
+                match = await distill(hostname, page, patterns, previous=current.name or None)
+                if match:
+                    if match.name not in seen:
+                        seen.add(match.name)
+                        latency_budgets.record("pattern", match.name, time.monotonic() - started)
+                    if match.distilled == current.distilled:
+                        logger.debug(f"Still the same: {match.name}")
+                    else:
+                        distilled = match.distilled
+                        flow_graph.record(hostname, current.name, match.name)
+                        current = match
+
+                        if await terminate(distilled):
+                            elapsed = time.monotonic() - started
+                            latency_budgets.record("distillation", hostname, elapsed)
+                            converted = await convert(distilled)
+                            if close_page:
+                                await page.close()
+                            return (True, distilled, converted)
+
+                        if handoff and asks_for_input(distilled):
+                            logger.info(f"{match.name} asks for input, handing the page over")
+                            return (False, distilled, None)
+
+                        if interactive:
+                            distilled = await autofill(page, distilled)
+                            await autoclick(page, distilled, "[gg-autoclick]:not(button)")
+                            await autoclick(
+                                page, distilled, "button[gg-autoclick], button[type=submit]"
+                            )
 
-        for iteration in range(max):
-            logger.info("")
-            logger.info(f"Iteration {iteration + 1} of {max}")
-            await asyncio.sleep(TICK)
+                        current.distilled = distilled
 
-            match = await distill(hostname, page, patterns)
-            if match:
-                if match.distilled == current.distilled:
-                    logger.debug(f"Still the same: {match.name}")
                 else:
-                    distilled = match.distilled
-                    current = match
-
-                    if await terminate(distilled):
-                        converted = await convert(distilled)
-                        if close_page:
-                            await page.close()
-                        return (True, distilled, converted)
-
-                    if interactive:
-                        distilled = await autofill(page, distilled)
-                        await autoclick(page, distilled, "[gg-autoclick]:not(button)")
-                        await autoclick(
-                            page, distilled, "button[gg-autoclick], button[type=submit]"
-                        )
+                    logger.debug(f"No matched pattern found")
 
-                    current.distilled = distilled
-
-            else:
-                logger.debug(f"No matched pattern found")
-
-        await report_distill_error(
-            error=ValueError("No matched pattern found"),
-            page=page,
-            profile_id=profile.id,
-            location=location,
-            hostname=hostname,
-            iteration=max,
-        )
-        await page.close()
-        return (False, current.distilled, None)
+            latency_budgets.record_timeout("distillation", hostname)
+            await report_distill_error(
+                error=ValueError("No matched pattern found"),
+                page=page,
+                profile_id=profile.id,
+                location=location,
+                hostname=hostname,
+                iteration=max,
+            )
+            await page.close()
+            return (False, current.distilled, None)
+        except asyncio.CancelledError:
+            # The request is gone: release the tab at once
+            await cleanup_after_cancel(page.close())
+            raise
 
 
 async def get_incognito_browser_profile(signin_id: str | None) -> BrowserProfile:
@@ -638,19 +733,15 @@ async def get_incognito_browser_profile(signin_id: str | None) -> BrowserProfile
             raise ValueError(f"Browser profile for signin {signin_id} not found")
 
     MAX_ATTEMPTS = 3
-    CHECK_URL = "https://ip.fly.dev/all"
-    CHECK_TIMEOUT = 10  # seconds
     for attempt in range(1, MAX_ATTEMPTS + 1):
         logger.info(f"Creating incognito browser profile (attempt {attempt}/{MAX_ATTEMPTS})...")
         fresh_profile = BrowserProfile()
         fresh_session = BrowserSession.get(fresh_profile)
 
         try:
-            await fresh_session.start(debug_url=None)
-            check_page = await fresh_session.new_page()
-            logger.info(f"Validating incognito browser profile at {CHECK_URL}...")
-            await check_page.goto(CHECK_URL, timeout=CHECK_TIMEOUT * 1000)
-            logger.info(f"Incognito browser profile validated on attempt {attempt}")
+            # Egress is validated on start, or skipped if the proxy route was validated recently
+            await fresh_session.start()
+            logger.info(f"Incognito browser profile ready on attempt {attempt}")
             return fresh_profile
 
         except Exception as e:
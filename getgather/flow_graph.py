@@ -0,0 +1,91 @@
+"""
+Sign-in flow graphs learned from the screens distilled on each site.
+
+Sign-ins go through a fairly fixed sequence of screens (email, password, MFA, orders...). Each
+time a distillation loop moves on to a new screen, the transition is counted per site hostname.
+distill() first probes the likely successors of the current screen, and only falls back to the
+other patterns, the current screen included, when none of them matches.
+
+Patterns are identified by file name without extension, so the graph survives moving the
+patterns directory. The counts are saved under the persistent store directory.
+"""
+
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable
+
+from getgather.metrics import metrics
+from getgather.persisted_state import PersistedState
+
+# A successor is predicted once seen this many times, and when it makes this share of the
+# transitions from its screen
+MIN_TRANSITIONS = 3
+MIN_SHARE = 0.1
+MAX_PREDICTIONS = 3
+
+flow_predictions_total = metrics.counter(
+    "flow_predictions_total", "Distillations probing predicted screens first, by result (hit, miss)"
+)
+distill_seconds = metrics.histogram(
+    "distill_seconds", "Time to distill a page, by mode (predicted, full)"
+)
+
+
+def flow_key(pattern_name: str) -> str:
+    """The name of a pattern in the graph: its file name without extension."""
+    return Path(pattern_name).stem
+
+
+class FlowGraph(PersistedState):
+    """Transition counts between the screens of each site, persisted to `path`."""
+
+    file_name = "flow_graph.json"
+    description = "flow graph"
+
+    def __init__(self, path: Path | None = None, clock: Callable[[], float] = time.monotonic):
+        super().__init__(path, clock)
+        self._transitions: dict[str, dict[str, dict[str, int]]] = defaultdict(
+            lambda: defaultdict(dict)
+        )
+
+    def _restore(self, data: Any) -> None:
+        for site, screens in data.items():
+            for screen, successors in screens.items():
+                counts = self._transitions[site][screen]
+                for successor, count in successors.items():
+                    counts[successor] = counts.get(successor, 0) + int(count)
+
+    def _state(self) -> Any:
+        return self._transitions
+
+    def record(self, site: str | None, previous: str | None, current: str) -> None:
+        """Count a move from the `previous` screen to the `current` one, by pattern name."""
+        if not site or not previous:
+            return
+        previous, current = flow_key(previous), flow_key(current)
+        if previous == current:
+            return
+        self._load()
+        counts = self._transitions[site][previous]
+        counts[current] = counts.get(current, 0) + 1
+        self._changed()
+
+    def successors(self, site: str | None, screen: str) -> list[str]:
+        """The screens most often seen after `screen` on `site`, most frequent first."""
+        if not site:
+            return []
+        self._load()
+        counts = self._transitions.get(site, {}).get(screen)
+        if not counts:
+            return []
+        total = sum(counts.values())
+        likely = [
+            successor
+            for successor, count in counts.items()
+            if count >= MIN_TRANSITIONS and count >= MIN_SHARE * total
+        ]
+        return sorted(likely, key=lambda successor: -counts[successor])[:MAX_PREDICTIONS]
+
+
+flow_graph = FlowGraph()
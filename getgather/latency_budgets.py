@@ -0,0 +1,171 @@
+"""
+Timeouts learned from the latencies observed per brand and per distillation pattern.
+
+Navigations, distillation loops and dpage steps record how long they took, by kind and key: the
+site hostname for a brand, or the name of a distillation pattern for the time until its screen
+showed up. Attempts that time out or run out of iterations only count as timeouts: their duration
+is the budget itself, and feeding it back would raise the budget a little on every stuck run.
+After TIMEOUT_STREAK timeouts in a row, a key gets at least the hardcoded timeout again, so a
+budget learned while the site was fast cannot keep it failing.
+
+Once a key has MIN_SAMPLES observations, its budget is its p99 × TIMEOUT_P99_FACTOR, within
+[TIMEOUT_MIN, TIMEOUT_MAX] and at most TIMEOUT_DEFAULT_FACTOR × the hardcoded timeout of the call
+site, which it replaces. Fast brands give up early on stuck pages, and slow brands get the time
+they need. Observations weigh half as much every HALF_LIFE, so budgets follow sites that change,
+and keys not seen for a while go back to the hardcoded timeout.
+
+The decayed counts are saved under the persistent store directory and loaded back on restart.
+The latencies are exposed as observed_latency_seconds and the budgets as
+timeout_budget_seconds.
+"""
+
+import bisect
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from getgather.config import settings
+from getgather.metrics import Histogram, metrics
+from getgather.persisted_state import PersistedState
+
+LATENCY_BUCKETS: tuple[float, ...] = (
+    0.5,
+    1,
+    2,
+    3,
+    5,
+    7.5,
+    10,
+    15,
+    20,
+    30,
+    45,
+    60,
+    90,
+    120,
+    180,
+    300,
+)
+# Observations a key needs before its hardcoded timeout is replaced
+MIN_SAMPLES = 20
+# Time after which an observation weighs half as much, in seconds
+HALF_LIFE = 7 * 24 * 3600
+# Timeouts in a row after which a key gets at least the hardcoded timeout again
+TIMEOUT_STREAK = 3
+
+observed_latency_seconds = metrics.histogram(
+    "observed_latency_seconds",
+    "Latencies of navigations, distillations and dpage steps, by kind and key (brand or pattern)",
+    LATENCY_BUCKETS,
+)
+timeout_budget_seconds = metrics.gauge(
+    "timeout_budget_seconds", "Timeouts derived from observed latencies, by kind and key"
+)
+
+
+@dataclass
+class _Series:
+    counts: list[float]
+    updated_at: float
+
+
+class LatencyBudgets(PersistedState):
+    """Records latencies in decaying histograms persisted to `path`, and derives timeouts from
+    them. `histogram` exports the latencies and provides the buckets."""
+
+    file_name = "latencies.json"
+    description = "latencies"
+
+    def __init__(
+        self,
+        histogram: Histogram,
+        path: Path | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        now: Callable[[], float] = time.time,
+    ):
+        super().__init__(path, clock)
+        self.histogram = histogram
+        self._now = now
+        # (kind, key) -> bucket counts, decayed to `updated_at`, and the last slot for values
+        # above the largest bucket
+        self._series: dict[tuple[str, str], _Series] = {}
+        # (kind, key) -> timeouts since the last recorded latency
+        self._timeouts: dict[tuple[str, str], int] = {}
+
+    def _restore(self, data: Any) -> None:
+        for series in data:
+            counts = [float(count) for count in series["counts"]]
+            if len(counts) == len(self.histogram.buckets) + 1:
+                key = (series["kind"], series["key"])
+                self._series[key] = _Series(counts, float(series["updated_at"]))
+
+    def _state(self) -> Any:
+        return [
+            {"kind": kind, "key": key, "counts": series.counts, "updated_at": series.updated_at}
+            for (kind, key), series in self._series.items()
+        ]
+
+    def _decayed(self, kind: str, key: str) -> _Series | None:
+        series = self._series.get((kind, key))
+        if series is not None:
+            now = self._now()
+            weight = 0.5 ** (max(now - series.updated_at, 0) / HALF_LIFE)
+            series.counts = [count * weight for count in series.counts]
+            series.updated_at = now
+        return series
+
+    def record(self, kind: str, key: str | None, seconds: float) -> None:
+        if not key:
+            return
+        self._load()
+        self.histogram.observe(seconds, kind=kind, key=key)
+        series = self._decayed(kind, key)
+        if series is None:
+            buckets = len(self.histogram.buckets) + 1
+            series = self._series[kind, key] = _Series([0.0] * buckets, self._now())
+        series.counts[bisect.bisect_left(self.histogram.buckets, seconds)] += 1
+        self._timeouts.pop((kind, key), None)
+        self._changed()
+
+    def record_timeout(self, kind: str, key: str | None) -> None:
+        """An attempt ran into its timeout: its latency is unknown, only that it was longer."""
+        if key:
+            self._timeouts[kind, key] = self._timeouts.get((kind, key), 0) + 1
+
+    def _quantile(self, series: _Series, q: float) -> float:
+        rank = q * sum(series.counts)
+        cumulative = 0.0
+        for index, count in enumerate(series.counts):
+            cumulative += count
+            if cumulative >= rank and count > 0:
+                buckets = self.histogram.buckets
+                return buckets[index] if index < len(buckets) else float("inf")
+        return float("inf")
+
+    def budget(self, kind: str, key: str | None, default: float) -> float | None:
+        """The timeout learned for `key`, or None until it has enough observations.
+
+        `default` is the hardcoded timeout it replaces, and bounds how far it can grow.
+        """
+        if not settings.ADAPTIVE_TIMEOUTS or not key:
+            return None
+        self._load()
+        series = self._decayed(kind, key)
+        if series is None or sum(series.counts) < MIN_SAMPLES:
+            return None
+        budget = self._quantile(series, 0.99) * settings.TIMEOUT_P99_FACTOR
+        budget = min(max(budget, settings.TIMEOUT_MIN), settings.TIMEOUT_MAX)
+        budget = min(budget, default * settings.TIMEOUT_DEFAULT_FACTOR)
+        if self._timeouts.get((kind, key), 0) >= TIMEOUT_STREAK:
+            budget = max(budget, default)
+        timeout_budget_seconds.set(budget, kind=kind, key=key)
+        return budget
+
+    def timeout(self, kind: str, key: str | None, default: float) -> float:
+        """The timeout learned for `key`, or `default` until it has enough observations."""
+        budget = self.budget(kind, key, default)
+        return default if budget is None else budget
+
+
+latency_budgets = LatencyBudgets(observed_latency_seconds)
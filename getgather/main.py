@@ -4,7 +4,7 @@ import socket
 from contextlib import AsyncExitStack, asynccontextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Awaitable, Callable, Final
+from typing import Any, Awaitable, Callable
 
 import httpx
 from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
@@ -19,14 +19,20 @@ from fastapi.routing import APIRoute
 from fastapi.staticfiles import StaticFiles
 
 from getgather.api.api import api_app
+from getgather.browser.idle_evictor import idle_evictor
+from getgather.browser.memory_governor import memory_governor
 from getgather.browser.profile import BrowserProfile
+from getgather.browser.profile_cleanup import profile_cleaner
+from getgather.browser.proxy_loader import install_reload_signal
 from getgather.browser.session import BrowserSession
-from getgather.browser.session_cleanup import cleanup_old_sessions
 from getgather.config import settings
+from getgather.flow_graph import flow_graph
+from getgather.latency_budgets import latency_budgets
 from getgather.logs import logger
-from getgather.mcp.browser import browser_manager
 from getgather.mcp.dpage import router as dpage_router
+from getgather.mcp.dpage_store import dpage_sweeper
 from getgather.mcp.main import create_mcp_apps
+from getgather.node_routing import NODE_MCP_PREFIX, close_node_client, route_to_owner
 from getgather.startup import startup
 
 # Create MCP apps once and reuse for lifespan and mounting
@@ -41,34 +47,46 @@ def custom_generate_unique_id(route: APIRoute) -> str:
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await startup(app)
+    profile_cleaner.purge_trash()
+    install_reload_signal()
 
     stop_event = asyncio.Event()
 
-    async def timer_loop():
+    async def governor_loop():
         while not stop_event.is_set():
             try:
-                await cleanup_old_sessions()
+                await memory_governor.check()
             except Exception as e:
-                logger.error(f"Error in cleanup_old_sessions: {e}", exc_info=True)
+                logger.error(f"Error in memory_governor.check: {e}", exc_info=True)
             try:
-                await browser_manager.cleanup_incognito_browsers()
-            except Exception as e:
-                logger.error(f"Error in cleanup_incognito_browsers: {e}", exc_info=True)
-            try:
-                await asyncio.wait_for(stop_event.wait(), timeout=5 * 60)
+                await asyncio.wait_for(
+                    stop_event.wait(), timeout=settings.BROWSER_GOVERNOR_INTERVAL
+                )
             except asyncio.TimeoutError:
-                pass  # Timeout = 5 minutes passed, continue loop
+                pass
 
-    background_task = asyncio.create_task(timer_loop())
+    idle_evictor.start()
+    dpage_sweeper.start()
+    governor_task = (
+        asyncio.create_task(governor_loop()) if settings.BROWSER_GOVERNOR_INTERVAL > 0 else None
+    )
 
     async with AsyncExitStack() as stack:
         for mcp_app in mcp_apps:
             # type: ignore
             await stack.enter_async_context(mcp_app.app.lifespan(app))
+            if settings.NODE_ROUTES:
+                await stack.enter_async_context(mcp_app.node_app.lifespan(app))
         yield
 
         stop_event.set()
-        await background_task
+        await idle_evictor.stop()
+        await dpage_sweeper.stop()
+        await close_node_client()
+        latency_budgets.save()
+        flow_graph.save()
+        if governor_task is not None:
+            await governor_task
 
 
 app = FastAPI(
@@ -198,16 +216,14 @@ def health():
     )
 
 
-IP_CHECK_URL: Final[str] = "https://ip.fly.dev/ip"
-
-
 @app.get("/extended-health")
 async def extended_health():
     session = BrowserSession.get(BrowserProfile())
     try:
-        session = await session.start()
+        # Always check the egress here, this is what the health check is for
+        session = await session.start(validate_egress=False)
         page = await session.page()
-        await page.goto(IP_CHECK_URL, timeout=3000)
+        await page.goto(settings.IP_CHECK_URL, timeout=3000)
         ip_text: str = await page.evaluate("() => document.body.innerText.trim()")
     except Exception as e:
         return PlainTextResponse(content=f"Error: {e}")
@@ -278,12 +294,24 @@ async def mcp_slash_middleware(
     return await call_next(request)
 
 
+@app.middleware("http")
+async def node_routing_middleware(
+    request: Request, call_next: Callable[[Request], Awaitable[Response]]
+):
+    """Forward sign-in requests to the node whose browser holds the sign-in."""
+    if response := await route_to_owner(request):
+        return response
+    return await call_next(request)
+
+
 # Mount routers and apps AFTER middleware
 app.include_router(dpage_router)
 app.mount("/api", api_app)
 
 for mcp_app in mcp_apps:
     app.mount(mcp_app.route, mcp_app.app)
+    if settings.NODE_ROUTES:
+        app.mount(f"{NODE_MCP_PREFIX}{mcp_app.route}", mcp_app.node_app)
 
 
 # Serve static homepage
@@ -1,9 +1,10 @@
-from datetime import datetime, timedelta
-from typing import TypedDict, cast
+import asyncio
+from typing import Awaitable, Callable, cast
 
 import zendriver as zd
-from zendriver.core.browser import shutil
 
+from getgather.browser.idle_evictor import idle_evictor
+from getgather.browser.profile_cleanup import profile_cleaner
 from getgather.config import settings
 from getgather.logs import logger
 
@@ -16,29 +17,21 @@ async def terminate_zendriver_browser(browser: zd.Browser):
         f"Terminating Zendriver browser with user_data_dir: {user_data_dir}",
         extra={"profile_id": browser_id},
     )
-    for directory in [
-        "Default/DawnGraphiteCache",
-        "Default/DawnWebGPUCache",
-        "Default/GPUCache",
-        "Default/Code Cache",
-        "Default/Cache",
-        "GraphiteDawnCache",
-        "GrShaderCache",
-        "ShaderCache",
-        "Subresource Filter",
-        "segmentation_platform",
-    ]:
-        path = user_data_dir / directory
-
-        if path.exists():
-            try:
-                shutil.rmtree(path)
-            except Exception as e:
-                logger.warning(f"Failed to remove {directory}: {e}")
+    profile_cleaner.cleanup(user_data_dir)
 
 
-class BrowserInformation(TypedDict):
-    last_active_timestamp: datetime
+async def _drain_tabs(browser: zd.Browser, timeout: float) -> None:
+    """Wait until every tab of the browser is back on about:blank, or `timeout` elapses."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        busy = [tab for tab in browser.tabs if tab.url and tab.url != "about:blank"]
+        if not busy:
+            return
+        if loop.time() >= deadline:
+            logger.warning(f"Recycling browser with {len(busy)} tab(s) still open after draining")
+            return
+        await asyncio.sleep(1)
 
 
 class BrowserManager:
@@ -47,7 +40,7 @@ class BrowserManager:
     def __init__(self):
         self._incognito_browsers: dict[str, zd.Browser] = {}
         self._zen_global_browser: zd.Browser | None = None
-        self._browser_information: dict[str, BrowserInformation] = {}
+        self._recycle_gates: dict[str, asyncio.Event] = {}  # browser id -> gate while recycling
 
     def get_incognito_browser(self, id: str) -> zd.Browser | None:
         """Get an incognito browser by ID."""
@@ -71,53 +64,97 @@ class BrowserManager:
         """Set the global browser instance."""
         self._zen_global_browser = browser
 
+    def get_all_browsers(self) -> list[zd.Browser]:
+        """Get every live browser (global and incognito), without duplicates."""
+        browsers: dict[str, zd.Browser] = {}
+        if self._zen_global_browser is not None:
+            browsers[self._zen_global_browser.id] = self._zen_global_browser  # type: ignore[attr-defined]
+        for browser in self._incognito_browsers.values():
+            browsers.setdefault(browser.id, browser)  # type: ignore[attr-defined]
+        return list(browsers.values())
+
+    def _find_browser(self, browser_id: str) -> zd.Browser | None:
+        for browser in self.get_all_browsers():
+            if browser.id == browser_id:  # type: ignore[attr-defined]
+                return browser
+        return None
+
+    async def wait_for_recycle(self, browser: zd.Browser) -> zd.Browser:
+        """Wait until `browser` is not being recycled and return its current instance."""
+        browser_id = cast(str, browser.id)  # type: ignore[attr-defined]
+        if gate := self._recycle_gates.get(browser_id):
+            logger.info(f"Waiting for browser {browser_id} to finish recycling...")
+            await gate.wait()
+        return self._find_browser(browser_id) or browser
+
+    async def recycle_browser(
+        self,
+        browser: zd.Browser,
+        relaunch: Callable[[zd.Browser], Awaitable[zd.Browser]],
+        drain_timeout: float,
+    ) -> zd.Browser | None:
+        """Restart `browser` on the same profile directory, keeping its registrations.
+
+        New tabs are held back while recycling. In-flight tabs get up to `drain_timeout` seconds
+        to finish before the browser is stopped.
+        """
+        browser_id = cast(str, browser.id)  # type: ignore[attr-defined]
+        if browser_id in self._recycle_gates:
+            return None
+
+        gate = asyncio.Event()
+        self._recycle_gates[browser_id] = gate
+        try:
+            await _drain_tabs(browser, drain_timeout)
+            await terminate_zendriver_browser(browser)
+            try:
+                new_browser = await relaunch(browser)
+            except Exception:
+                self._forget_browser(browser)
+                raise
+            self._replace_browser(browser, new_browser)
+            return new_browser
+        finally:
+            gate.set()
+            self._recycle_gates.pop(browser_id, None)
+
+    def _replace_browser(self, old: zd.Browser, new: zd.Browser) -> None:
+        if self._zen_global_browser is old:
+            self._zen_global_browser = new
+        for id, browser in self._incognito_browsers.items():
+            if browser is old:
+                self._incognito_browsers[id] = new
+
+    def _forget_browser(self, browser: zd.Browser) -> None:
+        if self._zen_global_browser is browser:
+            self._zen_global_browser = None
+        for id in [id for id, b in self._incognito_browsers.items() if b is browser]:
+            self.remove_incognito_browser(id)
+
     def update_last_active(self, id: str):
-        """Update the last active timestamp for this session."""
-        if id not in self._browser_information:
-            self._browser_information[id] = {"last_active_timestamp": datetime.now()}
-        self._browser_information[id]["last_active_timestamp"] = datetime.now()
+        """Push back the idle eviction deadline of this signin's browser."""
+        idle_evictor.touch(
+            f"incognito:{id}", "incognito", lambda: self._evict_incognito_browser(id)
+        )
 
     def remove_incognito_browser(self, id: str):
         """Remove a browser by ID."""
         if id in self._incognito_browsers:
             self._incognito_browsers.pop(id)
-        if id in self._browser_information:
-            self._browser_information.pop(id)
-
-    async def cleanup_incognito_browsers(self):
-        """Cleanup incognito browsers that have not been used in the last 1 hour."""
-        current_time = datetime.now()
-        max_session_age = timedelta(minutes=settings.BROWSER_SESSION_AGE)
-        signin_ids = list(self._incognito_browsers.keys())
-
-        logger.info(f"Checking for old browsers to stop. Found {len(signin_ids)} browsers")
-
-        # Find sessions that are older than max_session_age
-        for signin_id in signin_ids:
-            browser_information = self._browser_information.get(signin_id)
-            if browser_information is None:
-                logger.warning(
-                    f"Signin ID {signin_id} has no browser information, skipping cleanup check"
-                )
-                continue
-
-            last_active_timestamp = browser_information.get("last_active_timestamp")
-            session_age = current_time - last_active_timestamp
-            if session_age > max_session_age:
-                try:
-                    logger.info(
-                        f"Signin ID {signin_id} has been inactive for more than {settings.BROWSER_SESSION_AGE} minutes, stopping it"
-                    )
-                    browser = self._incognito_browsers.get(signin_id)
-                    if browser is None:
-                        logger.warning(f"Signin ID {signin_id} not found, skipping termination")
-                        continue
-                    await terminate_zendriver_browser(browser)
-                    logger.info(f"Successfully stopped browser with signin ID {signin_id}")
-                except Exception as e:
-                    logger.error(f"Failed to stop browser with signin ID {signin_id}: {e}")
-                finally:
-                    self.remove_incognito_browser(signin_id)
+        idle_evictor.discard(f"incognito:{id}")
+
+    async def _evict_incognito_browser(self, id: str) -> None:
+        """Stop an incognito browser that has not been used for BROWSER_SESSION_AGE minutes."""
+        browser = self._incognito_browsers.get(id)
+        if browser is None:
+            return
+        try:
+            await terminate_zendriver_browser(browser)
+            logger.info(f"Successfully stopped browser with signin ID {id}")
+        except Exception as e:
+            logger.error(f"Failed to stop browser with signin ID {id}: {e}")
+        finally:
+            self.remove_incognito_browser(id)
 
 
 browser_manager = BrowserManager()
@@ -1,14 +1,19 @@
 import asyncio
+import html
+import inspect
 import ipaddress
+import math
 import os
+import time
 import urllib.parse
+from collections import Counter
 from typing import Any
 
 import zendriver as zd
 from bs4 import BeautifulSoup, Tag
 from fastapi import APIRouter, HTTPException, Request
-from fastapi.responses import HTMLResponse
-from fastmcp.server.dependencies import get_http_headers
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
+from fastmcp.server.dependencies import get_context, get_http_headers
 from nanoid import generate
 from patchright.async_api import Page
 
@@ -17,6 +22,7 @@ from getgather.browser.session import BrowserSession
 from getgather.config import settings
 from getgather.distill import (
     Match,
+    asks_for_input,
     autoclick,
     capture_page_artifacts,
     check_error,
@@ -29,9 +35,16 @@ from getgather.distill import (
     run_distillation_loop,
     terminate,
 )
+from getgather.flow_graph import flow_graph
+from getgather.latency_budgets import latency_budgets
 from getgather.logs import logger
 from getgather.mcp.browser import browser_manager, terminate_zendriver_browser
+from getgather.mcp.dpage_store import DpageStore, owner_id, shared_dpage_store
+from getgather.mcp.dpage_stream import KEEPALIVE_INTERVAL, DpageUpdates, PageWatcher
 from getgather.mcp.html_renderer import DEFAULT_TITLE, render_form
+from getgather.mcp.page_actor import page_actor
+from getgather.mcp.registry import GatherMCP
+from getgather.request_deadline import cleanup_after_cancel, deadline_remaining
 from getgather.zen_distill import (
     autoclick as zen_autoclick,
     capture_page_artifacts as zen_capture_page_artifacts,
@@ -40,6 +53,7 @@ from getgather.zen_distill import (
     init_zendriver_browser,
     page_query_selector,
     run_distillation_loop as zen_run_distillation_loop,
+    safe_close_page,
     zen_navigate_with_retry,
     zen_report_distill_error,
 )
@@ -47,20 +61,70 @@ from getgather.zen_distill import (
 router = APIRouter(prefix="/dpage", tags=["dpage"])
 
 
-active_pages: dict[str, Page | zd.Tab] = {}
-distillation_results: dict[str, str | list[dict[str, str | list[str]]] | dict[str, Any]] = {}
-pending_actions: dict[str, dict[str, Any]] = {}  # Store actions to resume after signin
+async def _close_page(id: str, page: Page | zd.Tab) -> None:
+    page_owners.pop(id, None)
+    await page.close()
+
+
+async def _stop_incognito_session(id: str, profile: BrowserProfile) -> None:
+    await BrowserSession.get(profile).stop()
+
+
+active_pages: DpageStore[Page | zd.Tab] = DpageStore("active_pages", _close_page)
+# Store actions to resume after signin
+pending_actions: DpageStore[dict[str, Any]] = DpageStore("pending_actions")
+# Set when the result of a signin is stored, to wake up check_signin
+signin_completed: DpageStore[asyncio.Event] = DpageStore("signin_completed")
+# Number of check_signin calls waiting on each event, which the last one removes
+signin_waiters: Counter[str] = Counter()
+
+# Shared with the other workers (see DPAGE_STATE_URL)
+distillation_results = shared_dpage_store("distillation_results")
+signin_timeouts = shared_dpage_store("signin_timeouts")
+page_owners = shared_dpage_store("page_owners")  # dpage id -> owner_id() of its tab
+# How often check_signin looks for results stored by other workers, in seconds
+SHARED_RESULT_POLL_INTERVAL = 1
+
+# Screens pushed to the sign-in page, and the tasks watching the tabs (Zendriver)
+dpage_updates: DpageStore[DpageUpdates] = DpageStore("dpage_updates")
+watch_tasks: dict[str, asyncio.Task[None]] = {}
 
 # Patchright
-incognito_browser_profiles: dict[str, BrowserProfile] = {}
+incognito_browser_profiles: DpageStore[BrowserProfile] = DpageStore(
+    "incognito_browser_profiles", _stop_incognito_session
+)
 global_browser_profile: BrowserProfile | None = None
 
 FRIENDLY_CHARS: str = "23456789abcdefghijkmnpqrstuvwxyz"
 
 
-async def dpage_add(page: Page | zd.Tab, location: str, profile_id: str | None = None):
+async def _signin_timeout() -> float:
+    """How long check_signin waits for a signin started by the current tool call."""
+    try:
+        state: Any = get_context().get_state("brand_id")
+    except RuntimeError:  # not in a tool call
+        state = None
+    # fastmcp 2 returns the state, newer versions a coroutine
+    brand_id: str | None = await state if inspect.isawaitable(state) else state
+    brand = GatherMCP.registry.get(brand_id) if brand_id else None
+    if brand is not None and brand.signin_timeout is not None:
+        return brand.signin_timeout
+    return settings.SIGNIN_TIMEOUT
+
+
+def set_distillation_result(id: str, result: Any) -> None:
+    """Store the result of a signin and wake up whoever waits for it."""
+    distillation_results[id] = result
+    if event := signin_completed.pop(id, None):
+        event.set()
+
+
+async def dpage_add(
+    page: Page | zd.Tab, location: str, profile_id: str | None = None, navigate: bool = True
+):
+    """Register `page` as an interactive dpage, navigating it to `location` unless it is there."""
     if isinstance(page, zd.Tab):
-        return await zen_dpage_add(page, location, profile_id)
+        return await zen_dpage_add(page, location, profile_id, navigate)
 
     id = generate(FRIENDLY_CHARS, 8)
     if settings.HOSTNAME:
@@ -69,7 +133,13 @@ async def dpage_add(page: Page | zd.Tab, location: str, profile_id: str | None =
     try:
         if not location.startswith("http"):
             location = f"https://{location}"
-        await page.goto(location, timeout=settings.BROWSER_TIMEOUT, wait_until="domcontentloaded")
+        if navigate:
+            await page.goto(
+                location, timeout=settings.BROWSER_TIMEOUT, wait_until="domcontentloaded"
+            )
+    except asyncio.CancelledError:
+        await cleanup_after_cancel(page.close())
+        raise
     except Exception as error:
         hostname = urllib.parse.urlparse(location).hostname or "unknown"
         await report_distill_error(
@@ -81,10 +151,14 @@ async def dpage_add(page: Page | zd.Tab, location: str, profile_id: str | None =
             iteration=0,
         )
     active_pages[id] = page
+    page_owners[id] = owner_id()
+    signin_timeouts[id] = await _signin_timeout()
     return id
 
 
-async def zen_dpage_add(page: zd.Tab, location: str, profile_id: str | None = None):
+async def zen_dpage_add(
+    page: zd.Tab, location: str, profile_id: str | None = None, navigate: bool = True
+):
     id = generate(FRIENDLY_CHARS, 8)
     if settings.HOSTNAME:
         id = f"{settings.HOSTNAME}-{id}"
@@ -92,7 +166,11 @@ async def zen_dpage_add(page: zd.Tab, location: str, profile_id: str | None = No
     try:
         if not location.startswith("http"):
             location = f"https://{location}"
-        await zen_navigate_with_retry(page, location)
+        if navigate:
+            await zen_navigate_with_retry(page, location)
+    except asyncio.CancelledError:
+        await cleanup_after_cancel(safe_close_page(page))
+        raise
     except Exception as error:
         hostname = urllib.parse.urlparse(location).hostname or "unknown"
         await zen_report_distill_error(
@@ -104,29 +182,45 @@ async def zen_dpage_add(page: zd.Tab, location: str, profile_id: str | None = No
             iteration=0,
         )
     active_pages[id] = page
+    page_owners[id] = owner_id()
+    signin_timeouts[id] = await _signin_timeout()
     return id
 
 
 async def dpage_close(id: str) -> None:
-    if id in active_pages:
-        await active_pages[id].close()
-        del active_pages[id]
+    page_owners.pop(id, None)
+    if page := active_pages.pop(id, None):
+        await page.close()
 
 
 async def dpage_check(id: str):
-    TICK = 1  # seconds
-    TIMEOUT = 120  # seconds
-    max = TIMEOUT // TICK
-
-    for iteration in range(max):
-        logger.debug(f"Checking dpage {id}: {iteration + 1} of {max}")
-        await asyncio.sleep(TICK)
-
-        # Check if signin completed
-        if id in distillation_results:
-            return distillation_results[id]
-
-    return None
+    if id not in distillation_results:
+        # Answer "not yet" before the deadline of the tool call rather than be cancelled
+        timeout = deadline_remaining(signin_timeouts.get(id, settings.SIGNIN_TIMEOUT))
+        logger.debug(f"Waiting up to {timeout}s for dpage {id}")
+        event = signin_completed.setdefault(id, asyncio.Event())
+        signin_waiters[id] += 1
+        try:
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + timeout
+            # Results stored by another worker do not set the event, look for them periodically
+            while id not in distillation_results:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return None
+                if distillation_results.shared:
+                    remaining = min(remaining, SHARED_RESULT_POLL_INTERVAL)
+                try:
+                    await asyncio.wait_for(event.wait(), remaining)
+                except TimeoutError:
+                    pass
+        finally:
+            signin_waiters[id] -= 1
+            if not signin_waiters[id]:
+                del signin_waiters[id]
+                signin_completed.pop(id, None)
+
+    return distillation_results.get(id)
 
 
 async def dpage_finalize(id: str):
@@ -156,8 +250,9 @@ def render(content: str, options: dict[str, str] | None = None) -> str:
 
     title = options.get("title", DEFAULT_TITLE)
     action = options.get("action", "")
+    stream = options.get("stream") == "1"
 
-    return render_form(content, title, action)
+    return render_form(content, title, action, stream)
 
 
 # Since the browser can't redirect from GET to POST,
@@ -180,21 +275,45 @@ def redirect(id: str) -> HTMLResponse:
 async def get_dpage(id: str | None = None) -> HTMLResponse:
     if id:
         if id in active_pages:
+            if isinstance(active_pages[id], zd.Tab):
+                # The form is pushed through /dpage/{id}/events, see render_form
+                return HTMLResponse(render(LOADING_MSG, {"action": f"/dpage/{id}", "stream": "1"}))
             return redirect(id)
+        _check_owner(id)
         raise HTTPException(status_code=404, detail="Invalid page id")
 
     raise HTTPException(status_code=400, detail="Missing page id")
 
 
 FINISHED_MSG = "Finished! You can close this window now."
+LOADING_MSG = 'Loading...<noscript><button type="submit">Continue</button></noscript>'
+
+
+def _check_owner(id: str) -> None:
+    """Refuse requests for a page whose tab lives in another worker."""
+    owner = page_owners.get(id)
+    if owner is not None and owner != owner_id():
+        raise HTTPException(status_code=421, detail=f"Page is served by {owner}")
 
 
 @router.post("/{id}", response_class=HTMLResponse)
 async def post_dpage(id: str, request: Request) -> HTMLResponse:
     if id not in active_pages:
+        _check_owner(id)
         raise HTTPException(status_code=404, detail="Page not found")
 
-    page = active_pages[id]
+    form_data = await request.form()
+    # A retried submission of the same fields joins the one still in the page's mailbox
+    key = ("submit", frozenset((k, str(v)) for k, v in form_data.items()))
+    return await page_actor(id).run(lambda: _post_dpage(id, request), kind="submit", key=key)
+
+
+async def _post_dpage(id: str, request: Request) -> HTMLResponse:
+    page = active_pages.get(id)
+    if page is None:  # finished by the interaction queued before this one
+        if id in distillation_results:
+            return HTMLResponse(render(FINISHED_MSG, {"title": DEFAULT_TITLE}))
+        raise HTTPException(status_code=404, detail="Page not found")
     if isinstance(page, zd.Tab):
         return await zen_post_dpage(page, id, request)
 
@@ -209,9 +328,11 @@ async def post_dpage(id: str, request: Request) -> HTMLResponse:
 
     TICK = 1  # seconds
     TIMEOUT = 15  # seconds
-    max = TIMEOUT // TICK
+    site = urllib.parse.urlparse(page.url).hostname
+    max = math.ceil(latency_budgets.timeout("dpage", site, TIMEOUT) / TICK)
 
     current = Match(name="", priority=-1, distilled="")
+    started = time.monotonic()
 
     if settings.LOG_LEVEL == "DEBUG":
         await capture_page_artifacts(page, identifier=id, prefix="dpage_debug")
@@ -223,7 +344,9 @@ async def post_dpage(id: str, request: Request) -> HTMLResponse:
         location = page.url
         hostname = urllib.parse.urlparse(location).hostname
 
-        match = await distill(hostname, page, patterns, profile_id=id)
+        match = await distill(
+            hostname, page, patterns, profile_id=id, previous=current.name or None
+        )
         if not match:
             logger.info("No matched pattern found")
             continue
@@ -242,13 +365,16 @@ async def post_dpage(id: str, request: Request) -> HTMLResponse:
             max_reached = iteration == max - 1
             if max_reached and has_inputs:
                 logger.info("Still the same after timeout and need inputs, render the page...")
+                latency_budgets.record_timeout("dpage", site)
                 return HTMLResponse(render(str(document.find("body")), options))
             continue
 
+        flow_graph.record(hostname, current.name, match.name)
         current = match
 
         if await terminate(distilled):
             logger.info("Finished!")
+            latency_budgets.record("dpage", site, time.monotonic() - started)
             error = await check_error(distilled)
 
             if id in pending_actions and not error:
@@ -263,9 +389,9 @@ async def post_dpage(id: str, request: Request) -> HTMLResponse:
                     _page_id=id,
                 )
 
-                distillation_results[id] = action_result
+                set_distillation_result(id, action_result)
 
-                del pending_actions[id]
+                pending_actions.pop(id, None)
                 await dpage_close(id)
                 return HTMLResponse(render(FINISHED_MSG, options))
 
@@ -273,10 +399,10 @@ async def post_dpage(id: str, request: Request) -> HTMLResponse:
             await dpage_close(id)
             if converted is not None:
                 print(converted)
-                distillation_results[id] = converted
+                set_distillation_result(id, converted)
             else:
                 logger.info("No conversion found")
-                distillation_results[id] = distilled
+                set_distillation_result(id, distilled)
             return HTMLResponse(render(FINISHED_MSG, options))
 
         names: list[str] = []
@@ -376,6 +502,7 @@ async def post_dpage(id: str, request: Request) -> HTMLResponse:
 
     location = page.url
     hostname = urllib.parse.urlparse(location).hostname or "unknown"
+    latency_budgets.record_timeout("dpage", site)
     timeout_error = TimeoutError("Timeout reached in post_dpage")
     await report_distill_error(
         error=timeout_error,
@@ -432,8 +559,12 @@ async def dpage_mcp_tool(initial_url: str, result_key: str, timeout: int = 2) ->
 
         browser_profile = global_browser_profile
 
+    session = BrowserSession.get(browser_profile)
+    page: Page | None = None
     if not incognito or signin_id is not None:
         # First, try without any interaction as this will work if the user signed in previously (using global browser profile or incognito with signin_id)
+        await session.start()
+        probe = await session.new_page()
         terminated, distilled, converted = await run_distillation_loop(
             initial_url,
             patterns,
@@ -441,16 +572,22 @@ async def dpage_mcp_tool(initial_url: str, result_key: str, timeout: int = 2) ->
             interactive=False,
             timeout=timeout,
             stop_ok=False,  # Keep global session alive
+            page=probe,
+            handoff=True,
         )
         if terminated:
             distillation_result = converted if converted is not None else distilled
             return {result_key: distillation_result}
+        if asks_for_input(distilled):
+            page = probe  # left open on the sign-in screen
 
     # If that didn't work, try signing in via distillation
-    session = BrowserSession.get(browser_profile)
-    await session.start()
-    page = await session.context.new_page()
-    id = await dpage_add(page, initial_url, browser_profile.id)
+    if page is not None:
+        id = await dpage_add(page, initial_url, browser_profile.id, navigate=False)
+    else:
+        await session.start()
+        page = await session.context.new_page()
+        id = await dpage_add(page, initial_url, browser_profile.id)
 
     if incognito:
         incognito_browser_profiles[id] = browser_profile
@@ -492,9 +629,11 @@ async def zen_post_dpage(page: zd.Tab, id: str, request: Request) -> HTMLRespons
 
     TICK = 1  # seconds
     TIMEOUT = pending_actions.get(id, {}).get("dpage_timeout", 15)  # seconds
-    max = TIMEOUT // TICK
+    site: str | None = getattr(page, "hostname", None)  # type: ignore[assignment]
+    max = math.ceil(latency_budgets.timeout("dpage", site, TIMEOUT) / TICK)
 
     current = Match(name="", priority=-1, distilled="")
+    started = time.monotonic()
 
     if settings.LOG_LEVEL == "DEBUG":
         await zen_capture_page_artifacts(page, identifier=id, prefix="dpage_debug")
@@ -505,7 +644,7 @@ async def zen_post_dpage(page: zd.Tab, id: str, request: Request) -> HTMLRespons
 
         hostname: str | None = getattr(page, "hostname", None)  # type: ignore[assignment]
 
-        match = await zen_distill(hostname, page, patterns)
+        match = await zen_distill(hostname, page, patterns, previous=current.name or None)
         if not match:
             logger.info("No matched pattern found")
             continue
@@ -525,123 +664,25 @@ async def zen_post_dpage(page: zd.Tab, id: str, request: Request) -> HTMLRespons
             max_reached = iteration == max - 1
             if max_reached and has_inputs:
                 logger.info("Still the same after timeout and need inputs, render the page...")
+                latency_budgets.record_timeout("dpage", site)
                 return HTMLResponse(render(str(document.find("body")), options))
             continue
 
+        flow_graph.record(hostname, current.name, match.name)
         current = match
 
         if await terminate(distilled):
             logger.info("Finished!")
-
-            error = await check_error(distilled)
-
-            if id in pending_actions and not error:
-                action_info = pending_actions[id]
-                logger.info(f"Signin completed for {id}, resuming action...")
-
-                action_result = await zen_dpage_with_action(
-                    initial_url=action_info["initial_url"],
-                    action=action_info["action"],
-                    timeout=action_info["timeout"],
-                    _signin_completed=True,
-                    _page_id=id,
-                )
-
-                distillation_results[id] = action_result
-
-                del pending_actions[id]
-                await dpage_close(id)
-                return HTMLResponse(render(FINISHED_MSG, options))
-
-            converted = await convert(distilled)
-            await dpage_close(id)
-            if converted is not None:
-                print(converted)
-                distillation_results[id] = converted
-            else:
-                logger.info("No conversion found")
-                distillation_results[id] = distilled
+            latency_budgets.record("dpage", site, time.monotonic() - started)
+            await _zen_complete_signin(id, distilled)
             return HTMLResponse(render(FINISHED_MSG, options))
 
-        names: list[str] = []
-
-        if fields.get("button"):
-            button = document.find("button", value=str(fields.get("button")))
-            if button:
-                logger.info(f"Clicking button button[value={fields.get('button')}]")
-                await zen_autoclick(page, distilled, f"button[value={fields.get('button')}]")
-                continue
-
-        for input in inputs:
-            if isinstance(input, Tag):
-                gg_match = input.get("gg-match")
-                element = await page_query_selector(
-                    page, selector=str(gg_match) if gg_match is not None else ""
-                )
-                name = input.get("name")
-                input_type = input.get("type")
-
-                if element:
-                    if input_type == "checkbox":
-                        if not name:
-                            logger.warning(f"No name for the checkbox {gg_match}")
-                            continue
-                        value = fields.get(str(name))
-                        checked = value and len(str(value)) > 0
-                        names.append(str(name))
-                        logger.info(f"Status of checkbox {name}={checked}")
-                        current_checked_value = (
-                            element.element.get("checked") or element.element.get("value") == "true"
-                        )
-                        if current_checked_value != checked:
-                            logger.info(f"Clicking checkbox {name} to set it to {checked}")
-                            await element.click()
-                    elif input_type == "radio":
-                        if name is not None:
-                            name_str = str(name)
-                            value = fields.get(name_str)
-                            if not value or len(value) == 0:
-                                logger.warning(f"No form data found for radio button group {name}")
-                                continue
-                            radio = document.find("input", {"type": "radio", "value": str(value)})
-                            if not radio or not isinstance(radio, Tag):
-                                logger.warning(f"No radio button found with value {value}")
-                                continue
-                            logger.info(f"Handling radio button group {name}")
-                            logger.info(f"Using form data {name}={value}")
-                            radio_element = await page_query_selector(
-                                page, selector=str(radio.get("gg-match"))
-                            )
-                            if radio_element:
-                                await radio_element.click()
-                                radio["checked"] = "checked"
-                                current.distilled = str(document)
-                                names.append(str(input.get("id")) if input.get("id") else "radio")
-                    elif name is not None:
-                        name_str = str(name)
-                        value = fields.get(name_str)
-                        if value and len(value) > 0:
-                            logger.info(f"Using form data {name}")
-                            names.append(name_str)
-                            input["value"] = value
-                            current.distilled = str(document)
-                            await element.type_text(value)
-                            del fields[name_str]
-                        else:
-                            logger.info(f"No form data found for {name}")
-
-        await zen_autoclick(page, distilled, "[gg-autoclick]:not(button)")
-        SUBMIT_BUTTON = "button[gg-autoclick], button[type=submit]"
-        if document.select(SUBMIT_BUTTON):
-            if len(names) > 0 and len(inputs) == len(names):
-                logger.info("Submitting form, all fields are filled...")
-                await zen_autoclick(page, distilled, SUBMIT_BUTTON)
-                continue
-            logger.warning("Not all form fields are filled")
+        if await _zen_fill_form(page, document, current, fields):
             return HTMLResponse(render(str(document.find("body")), options))
 
     hostname_attr: str | None = getattr(page, "hostname", None)  # type: ignore[assignment]
     location = getattr(page, "url", "unknown")  # type: ignore[assignment]
+    latency_budgets.record_timeout("dpage", site)
     timeout_error = TimeoutError("Timeout reached in zen_post_dpage")
     await zen_report_distill_error(
         error=timeout_error,
@@ -654,6 +695,234 @@ async def zen_post_dpage(page: zd.Tab, id: str, request: Request) -> HTMLRespons
     raise HTTPException(status_code=503, detail="Timeout reached")
 
 
+async def _zen_complete_signin(id: str, distilled: str) -> None:
+    """Store the result of a finished signin, resuming its pending action if any."""
+    error = await check_error(distilled)
+
+    if id in pending_actions and not error:
+        action_info = pending_actions[id]
+        logger.info(f"Signin completed for {id}, resuming action...")
+
+        action_result = await zen_dpage_with_action(
+            initial_url=action_info["initial_url"],
+            action=action_info["action"],
+            timeout=action_info["timeout"],
+            _signin_completed=True,
+            _page_id=id,
+        )
+
+        set_distillation_result(id, action_result)
+
+        pending_actions.pop(id, None)
+        await dpage_close(id)
+        return
+
+    converted = await convert(distilled)
+    await dpage_close(id)
+    if converted is not None:
+        print(converted)
+        set_distillation_result(id, converted)
+    else:
+        logger.info("No conversion found")
+        set_distillation_result(id, distilled)
+
+
+async def _zen_fill_form(
+    page: zd.Tab, document: BeautifulSoup, current: Match, fields: dict[str, str]
+) -> bool:
+    """Fill the distilled form `current` of `page` with `fields` and submit it when complete.
+
+    Returns whether the form still needs input from the user.
+    """
+    distilled = current.distilled
+    inputs = document.find_all("input")
+    names: list[str] = []
+
+    if fields.get("button"):
+        button = document.find("button", value=str(fields.get("button")))
+        if button:
+            logger.info(f"Clicking button button[value={fields.get('button')}]")
+            await zen_autoclick(page, distilled, f"button[value={fields.get('button')}]")
+            return False
+
+    for input in inputs:
+        if isinstance(input, Tag):
+            gg_match = input.get("gg-match")
+            element = await page_query_selector(
+                page, selector=str(gg_match) if gg_match is not None else ""
+            )
+            name = input.get("name")
+            input_type = input.get("type")
+
+            if element:
+                if input_type == "checkbox":
+                    if not name:
+                        logger.warning(f"No name for the checkbox {gg_match}")
+                        continue
+                    value = fields.get(str(name))
+                    checked = value and len(str(value)) > 0
+                    names.append(str(name))
+                    logger.info(f"Status of checkbox {name}={checked}")
+                    current_checked_value = (
+                        element.element.get("checked") or element.element.get("value") == "true"
+                    )
+                    if current_checked_value != checked:
+                        logger.info(f"Clicking checkbox {name} to set it to {checked}")
+                        await element.click()
+                elif input_type == "radio":
+                    if name is not None:
+                        name_str = str(name)
+                        value = fields.get(name_str)
+                        if not value or len(value) == 0:
+                            logger.warning(f"No form data found for radio button group {name}")
+                            continue
+                        radio = document.find("input", {"type": "radio", "value": str(value)})
+                        if not radio or not isinstance(radio, Tag):
+                            logger.warning(f"No radio button found with value {value}")
+                            continue
+                        logger.info(f"Handling radio button group {name}")
+                        logger.info(f"Using form data {name}={value}")
+                        radio_element = await page_query_selector(
+                            page, selector=str(radio.get("gg-match"))
+                        )
+                        if radio_element:
+                            await radio_element.click()
+                            radio["checked"] = "checked"
+                            current.distilled = str(document)
+                            names.append(str(input.get("id")) if input.get("id") else "radio")
+                elif name is not None:
+                    name_str = str(name)
+                    value = fields.get(name_str)
+                    if value and len(value) > 0:
+                        logger.info(f"Using form data {name}")
+                        names.append(name_str)
+                        input["value"] = value
+                        current.distilled = str(document)
+                        await element.type_text(value)
+                        del fields[name_str]
+                    else:
+                        logger.info(f"No form data found for {name}")
+
+    await zen_autoclick(page, distilled, "[gg-autoclick]:not(button)")
+    SUBMIT_BUTTON = "button[gg-autoclick], button[type=submit]"
+    if document.select(SUBMIT_BUTTON):
+        if len(names) > 0 and len(inputs) == len(names):
+            logger.info("Submitting form, all fields are filled...")
+            await zen_autoclick(page, distilled, SUBMIT_BUTTON)
+            return False
+        logger.warning("Not all form fields are filled")
+        return True
+    return False
+
+
+def _zen_page(id: str) -> zd.Tab:
+    page = active_pages.get(id)
+    if not isinstance(page, zd.Tab):
+        _check_owner(id)
+        raise HTTPException(status_code=404, detail="Page not found")
+    return page
+
+
+def _screen(distilled: str) -> dict[str, str]:
+    document = BeautifulSoup(distilled, "html.parser")
+    title_element = document.find("title")
+    title = title_element.get_text() if title_element is not None else DEFAULT_TITLE
+    return {"title": title, "content": str(document.find("body"))}
+
+
+async def _zen_watch(id: str, page: zd.Tab, updates: DpageUpdates) -> None:
+    """Publish each new distilled screen of the tab, until the signin finishes or nobody listens.
+
+    Screens without inputs get their auto-clicks, like in zen_post_dpage.
+    """
+    path = os.path.join(os.path.dirname(__file__), "patterns", "**/*.html")
+    patterns = load_distillation_patterns(path)
+    hostname: str | None = getattr(page, "hostname", None)  # type: ignore[assignment]
+    watcher = PageWatcher(page)
+    await watcher.start()
+    current = ""
+    previous: str | None = None  # pattern of the current screen
+
+    async def step() -> bool:
+        """Distill and publish the current screen. Returns True once the signin is over."""
+        nonlocal current, previous
+        if id not in active_pages:  # closed by a submission queued before this step
+            return True
+        match = await zen_distill(hostname, page, patterns, previous=previous)
+        if match is not None and match.distilled != current:
+            current = match.distilled
+            flow_graph.record(hostname, previous, match.name)
+            previous = match.name
+            if await terminate(current):
+                logger.info(f"Finished signin {id}")
+                await _zen_complete_signin(id, current)
+                updates.publish("finished", {"title": DEFAULT_TITLE, "content": FINISHED_MSG})
+                return True
+            document = BeautifulSoup(current, "html.parser")
+            if not document.find_all("input"):
+                await _zen_fill_form(page, document, match, {})
+            updates.publish("form", _screen(current))
+        return False
+
+    try:
+        while updates.subscribers > 0 and id in active_pages:
+            if await page_actor(id).run(step, kind="distill"):
+                return
+            await watcher.wait_for_change(timeout=KEEPALIVE_INTERVAL)
+    except Exception as error:
+        logger.warning(f"Stopped watching dpage {id}: {error}")
+        updates.publish("failed", {"title": DEFAULT_TITLE, "content": html.escape(str(error))})
+    finally:
+        watch_tasks.pop(id, None)
+        await watcher.stop()
+
+
+@router.get("/{id}/events")
+async def get_dpage_events(id: str) -> StreamingResponse:
+    """Server-sent events with each new screen of the signin, see dpage_stream."""
+    page = _zen_page(id)
+    browser_manager.update_last_active(id)
+    updates = dpage_updates.get(id)
+    if updates is None:
+        updates = dpage_updates[id] = DpageUpdates()
+    queue = updates.subscribe()  # before the watcher starts, which stops without subscribers
+    task = watch_tasks.get(id)
+    if task is None or task.done():
+        watch_tasks[id] = asyncio.create_task(_zen_watch(id, page, updates))
+    return StreamingResponse(
+        updates.stream(queue),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+@router.post("/{id}/fields")
+async def post_dpage_fields(id: str, request: Request) -> JSONResponse:
+    """Fill the current screen of the signin with the posted fields, without waiting for the next.
+
+    The next screen is pushed through /dpage/{id}/events.
+    """
+    _zen_page(id)
+    browser_manager.update_last_active(id)
+    form_data = await request.form()
+    fields: dict[str, str] = {k: str(v) for k, v in form_data.items()}
+
+    async def fill() -> bool:
+        page = _zen_page(id)
+        path = os.path.join(os.path.dirname(__file__), "patterns", "**/*.html")
+        patterns = load_distillation_patterns(path)
+        hostname: str | None = getattr(page, "hostname", None)  # type: ignore[assignment]
+        match = await zen_distill(hostname, page, patterns)
+        if match is None:
+            raise HTTPException(status_code=409, detail="No sign-in form on the page")
+        document = BeautifulSoup(match.distilled, "html.parser")
+        return await _zen_fill_form(page, document, match, dict(fields))
+
+    key = ("fields", frozenset(fields.items()))
+    needs_input = await page_actor(id).run(fill, kind="fields", key=key)
+    return JSONResponse({"needs_input": needs_input}, status_code=202)
+
+
 async def zen_dpage_mcp_tool(initial_url: str, result_key: str, timeout: int = 2) -> dict[str, Any]:
     """Generic MCP tool based on distillation with Zendriver"""
     path = os.path.join(os.path.dirname(__file__), "patterns", "**/*.html")
@@ -674,19 +943,27 @@ async def zen_dpage_mcp_tool(initial_url: str, result_key: str, timeout: int = 2
             await get_new_page(browser)
             logger.info(f"Global browser created with id {browser.id}")  # type: ignore[attr-defined]
 
+    page: zd.Tab | None = None
     if not incognito or signin_id is not None:
         # First, try without any interaction as this will work if the user signed in previously
+        probe = await get_new_page(browser)
         terminated, distilled, converted = await zen_run_distillation_loop(
-            initial_url, patterns, browser, timeout, interactive=False
+            initial_url, patterns, browser, timeout, interactive=False, page=probe, handoff=True
         )
         if terminated:
             distillation_result = converted if converted is not None else distilled
             return {result_key: distillation_result}
+        if asks_for_input(distilled):
+            page = probe  # left open on the sign-in screen
 
-    page = await get_new_page(browser)
+    if page is not None:
+        navigate = False
+    else:
+        page = await get_new_page(browser)
+        navigate = True
     page.hostname = urllib.parse.urlparse(initial_url).hostname  # type: ignore[attr-defined]
 
-    id = await dpage_add(page, initial_url, browser.id)  # type: ignore[attr-defined]
+    id = await dpage_add(page, initial_url, browser.id, navigate)  # type: ignore[attr-defined]
 
     if incognito:
         browser_manager.set_incognito_browser(id, browser)
@@ -715,6 +992,22 @@ async def zen_dpage_mcp_tool(initial_url: str, result_key: str, timeout: int = 2
     }
 
 
+async def _asks_for_input(page: Page | zd.Tab, initial_url: str) -> bool:
+    """Whether a page left by a failed action shows a screen for the user, e.g. a sign-in."""
+    path = os.path.join(os.path.dirname(__file__), "patterns", "**/*.html")
+    patterns = load_distillation_patterns(path)
+    hostname = urllib.parse.urlparse(initial_url).hostname
+    try:
+        if isinstance(page, zd.Tab):
+            match = await zen_distill(hostname, page, patterns)
+        else:
+            match = await distill(hostname, page, patterns)
+    except Exception as e:
+        logger.debug(f"Could not distill the page left by the action: {e}")
+        return False
+    return match is not None and asks_for_input(match.distilled)
+
+
 async def dpage_with_action(
     initial_url: str,
     action: Any,
@@ -742,22 +1035,29 @@ async def dpage_with_action(
     # Step 1: If resuming after signin completion, use the active page directly
     if _signin_completed and _page_id is not None and _page_id in active_pages:
         logger.info(f"Resuming action after signin with page_id={_page_id}")
-        page = active_pages[_page_id]
-        action_info = pending_actions[_page_id]
-        if isinstance(page, Page):
-            await page.goto(initial_url, wait_until="commit")
-        else:
-            await zen_navigate_with_retry(page, initial_url)
-        result = await action(page, action_info["browser_profile"])
-        return result
+        page_id = _page_id
+
+        async def resume() -> dict[str, Any]:
+            page = active_pages[page_id]
+            action_info = pending_actions[page_id]
+            if isinstance(page, Page):
+                await page.goto(initial_url, wait_until="commit")
+            else:
+                await zen_navigate_with_retry(page, initial_url)
+            return await action(page, action_info["browser_profile"])
+
+        return await page_actor(page_id).run(resume, kind="resume")
 
     # Step 2: If global_browser_profile exists, try executing action directly
     # This will work if user signed in previously and session is still valid
+    # A page left on a sign-in screen is handed over to step 3
+    handoff: tuple[Page, BrowserProfile] | None = None
     if (global_browser_profile is not None and not incognito) or signin_id is not None:
         if global_browser_profile is not None and not incognito:
             browser_profile = global_browser_profile
         else:
             browser_profile = await get_incognito_browser_profile(signin_id=signin_id)
+        page = None
         try:
             logger.info("Trying action with existing global browser session...")
             session = BrowserSession.get(browser_profile)
@@ -768,10 +1068,19 @@ async def dpage_with_action(
             await page.close()
             logger.info("Action succeeded with existing session!")
             return result
+        except asyncio.CancelledError:
+            if page is not None:
+                await cleanup_after_cancel(page.close())
+            raise
         except Exception as e:
             logger.info(
                 f"dpage_with_action failed with existing session (likely not signed in): {e}"
             )
+            if page is not None:
+                if await _asks_for_input(page, initial_url):
+                    handoff = (page, browser_profile)
+                else:
+                    await page.close()
 
     # Step 3: User not signed in - create interactive signin flow with action
     # Create or get browser profile for signin flow
@@ -784,10 +1093,16 @@ async def dpage_with_action(
             global_browser_profile = BrowserProfile()
         browser_profile = global_browser_profile
 
-    session = BrowserSession.get(browser_profile)
-    await session.start()
-    page = await session.context.new_page()
-    id = await dpage_add(page, initial_url, browser_profile.id)
+    if handoff is not None and handoff[1] is browser_profile:
+        page = handoff[0]
+        id = await dpage_add(page, initial_url, browser_profile.id, navigate=False)
+    else:
+        if handoff is not None:
+            await handoff[0].close()
+        session = BrowserSession.get(browser_profile)
+        await session.start()
+        page = await session.context.new_page()
+        id = await dpage_add(page, initial_url, browser_profile.id)
 
     # Store action for auto-resumption after signin
     pending_actions[id] = {
@@ -853,23 +1168,29 @@ async def zen_dpage_with_action(
     # Step 1: If resuming after signin completion, use the active page directly
     if _signin_completed and _page_id is not None and _page_id in active_pages:
         logger.info(f"Resuming action after signin with page_id={_page_id}")
-        page = active_pages[_page_id]
+        page_id = _page_id
 
-        if not isinstance(page, zd.Tab):
-            raise ValueError(f"Expected Zendriver Tab for page {_page_id}, got {type(page)}")
+        async def resume() -> dict[str, Any]:
+            page = active_pages[page_id]
 
-        action_info = pending_actions[_page_id]
+            if not isinstance(page, zd.Tab):
+                raise ValueError(f"Expected Zendriver Tab for page {page_id}, got {type(page)}")
 
-        try:
-            await zen_navigate_with_retry(page, initial_url)
-        except Exception as e:
-            logger.warning(f"Failed to navigate to {initial_url}: {e}")
+            action_info = pending_actions[page_id]
 
-        result = await action(page, action_info["browser"])
-        return result
+            try:
+                await zen_navigate_with_retry(page, initial_url)
+            except Exception as e:
+                logger.warning(f"Failed to navigate to {initial_url}: {e}")
+
+            return await action(page, action_info["browser"])
+
+        return await page_actor(page_id).run(resume, kind="resume")
 
     # Step 2: If global_browser_profile exists, try executing action directly
     # This will work if user signed in previously and session is still valid
+    # A page left on a sign-in screen is handed over to step 3
+    handoff: tuple[zd.Tab, zd.Browser] | None = None
     global_browser = browser_manager.get_global_browser()
     if (global_browser and not incognito) or signin_id:
         if global_browser and not incognito:
@@ -877,6 +1198,7 @@ async def zen_dpage_with_action(
         else:
             browser = await init_zendriver_browser(signin_id)
 
+        page = None
         try:
             logger.info("Trying action with existing global browser session...")
             page = await get_new_page(browser)
@@ -885,10 +1207,19 @@ async def zen_dpage_with_action(
             await page.close()
             logger.info("Action succeeded with existing session!")
             return result
+        except asyncio.CancelledError:
+            if page is not None:
+                await cleanup_after_cancel(safe_close_page(page))
+            raise
         except Exception as e:
             logger.info(
                 f"zen_dpage_with_action failed with existing session (likely not signed in): {e}"
             )
+            if page is not None:
+                if await _asks_for_input(page, initial_url):
+                    handoff = (page, browser)
+                else:
+                    await safe_close_page(page)
 
     # Step 3: User not signed in - create interactive signin flow with action
     browser_instance: zd.Browser
@@ -902,10 +1233,15 @@ async def zen_dpage_with_action(
             await get_new_page(global_browser)
         browser_instance = browser_manager.get_global_browser()  # type: ignore
 
-    page = await get_new_page(browser_instance)
+    if handoff is not None and handoff[1] is browser_instance:
+        page, navigate = handoff[0], False
+    else:
+        if handoff is not None:
+            await safe_close_page(handoff[0])
+        page, navigate = await get_new_page(browser_instance), True
     page.hostname = urllib.parse.urlparse(initial_url).hostname  # type: ignore
 
-    id = await dpage_add(page, initial_url, browser_instance.id)  # type: ignore
+    id = await dpage_add(page, initial_url, browser_instance.id, navigate)  # type: ignore
 
     # Store action for auto-resumption after signin
     pending_actions[id] = {
@@ -0,0 +1,342 @@
+"""
+Bounded stores for dpage state.
+
+Sign-in state (open tabs, results, pending actions, incognito profiles) is keyed by dpage id and
+used to live in plain dicts, which nothing cleaned up when a sign-in was abandoned or its result
+never collected. Each DpageStore drops entries not accessed for `ttl` seconds and the least
+recently used entries beyond `max_entries`, and runs an eviction callback for each, e.g. to close
+the tab or stop the browser it holds. Removing an entry explicitly does not run the callback.
+
+Expired entries are swept by a single background task (`dpage_sweeper`), and are also dropped
+when they are looked up.
+
+State that other workers need (results, sign-in timeouts, page owners) can live in a shared
+backend instead, selected by DPAGE_STATE_URL: in memory by default, or an SQLite database on a
+volume shared by the workers (`sqlite:///path/to/dpage.db`). Live objects (tabs, browsers, pending
+action callables) always stay in the worker that owns them, see `owner_id`, so shared entries are
+plain JSON with nothing to clean up, and shared stores take no eviction callback.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Generic, Iterator, MutableMapping, TypeVar
+
+from getgather.config import settings
+from getgather.logs import logger
+from getgather.metrics import metrics
+
+V = TypeVar("V")
+EvictCallback = Callable[[str, V], Awaitable[None]]
+
+SWEEP_INTERVAL = 60  # seconds
+# How long a statement waits for a database locked by another worker, in seconds
+BUSY_TIMEOUT = 0.5
+
+dpage_entries = metrics.gauge("dpage_store_entries", "Live dpage state entries, by store")
+dpage_evictions_total = metrics.counter(
+    "dpage_store_evictions_total", "Dpage state entries evicted, by store and reason"
+)
+
+
+def owner_id() -> str:
+    """Identifies this worker as the owner of the tabs and browsers it holds."""
+    return f"{settings.HOSTNAME or socket.gethostname()}:{os.getpid()}"
+
+
+class DpageStore(MutableMapping[str, V], Generic[V]):
+    """A dict of dpage state whose entries expire `ttl` seconds after their last access."""
+
+    # Whether other workers see the entries
+    shared = False
+
+    def __init__(
+        self,
+        name: str,
+        on_evict: EvictCallback[V] | None = None,
+        ttl: float | None = None,
+        max_entries: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self._on_evict = on_evict
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._clock = clock
+        # key -> (value, expires at), least recently used first
+        self._entries: OrderedDict[str, tuple[V, float]] = OrderedDict()
+        self._pending: set[asyncio.Task[None]] = set()
+        dpage_sweeper.register(self)
+
+    @property
+    def ttl(self) -> float:
+        """Seconds an entry lives after its last access."""
+        return self._ttl if self._ttl is not None else settings.DPAGE_TTL
+
+    @property
+    def max_entries(self) -> int:
+        return self._max_entries if self._max_entries is not None else settings.DPAGE_MAX_ENTRIES
+
+    def __getitem__(self, key: str) -> V:
+        value, expires_at = self._entries[key]
+        if expires_at <= self._clock():
+            self._evict(key, "expired")
+            raise KeyError(key)
+        self._entries[key] = (value, self._clock() + self.ttl)
+        self._entries.move_to_end(key)
+        return value
+
+    def __setitem__(self, key: str, value: V) -> None:
+        self._entries[key] = (value, self._clock() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > max(self.max_entries, 1):
+            self._evict(next(iter(self._entries)), "capacity")
+        self._update_gauge()
+
+    def __delitem__(self, key: str) -> None:
+        del self._entries[key]
+        self._update_gauge()
+
+    def __contains__(self, key: object) -> bool:
+        entry = self._entries.get(key)  # type: ignore[call-overload]
+        return entry is not None and entry[1] > self._clock()
+
+    def __iter__(self) -> Iterator[str]:
+        now = self._clock()
+        return iter([key for key, (_, expires_at) in self._entries.items() if expires_at > now])
+
+    def __len__(self) -> int:
+        self._evict_expired()
+        return len(self._entries)
+
+    def _update_gauge(self) -> None:
+        dpage_entries.set(len(self._entries), store=self.name)
+
+    def _evict(self, key: str, reason: str) -> None:
+        value, _ = self._entries.pop(key)
+        self._update_gauge()
+        dpage_evictions_total.inc(store=self.name, reason=reason)
+        logger.info(f"Evicting {reason} dpage {self.name} entry {key}")
+        if self._on_evict is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            logger.warning(f"No event loop to clean up dpage {self.name} entry {key}")
+            return
+        task = loop.create_task(self._run_callback(key, value))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _run_callback(self, key: str, value: V) -> None:
+        assert self._on_evict is not None
+        try:
+            await self._on_evict(key, value)
+        except Exception as e:
+            logger.error(f"Failed to clean up dpage {self.name} entry {key}: {e}")
+
+    def _evict_expired(self) -> int:
+        now = self._clock()
+        expired = [key for key, (_, expires_at) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            self._evict(key, "expired")
+        return len(expired)
+
+    async def evict_expired(self) -> int:
+        """Evict every expired entry and wait for the cleanups. Returns the number evicted."""
+        evicted = self._evict_expired()
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        return evicted
+
+
+class SqliteDpageStore(MutableMapping[str, V], Generic[V]):
+    """Dpage state in an SQLite database shared by workers, with the DpageStore expiry rules.
+
+    Values must be JSON serializable. Expiry uses wall-clock time, since workers share it.
+    Entries are evicted without callbacks, see the module docstring.
+
+    Statements run on the calling thread, the event loop for the dpage routes: they touch a
+    few rows of an indexed table, and a database locked by another worker fails them after
+    BUSY_TIMEOUT rather than stall every request of the worker.
+    """
+
+    shared = True
+
+    def __init__(
+        self,
+        name: str,
+        path: Path,
+        ttl: float | None = None,
+        max_entries: int | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.name = name
+        self.path = path
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(
+            path, timeout=BUSY_TIMEOUT, check_same_thread=False, isolation_level=None
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS dpage_state ("
+            " store TEXT NOT NULL, id TEXT NOT NULL, value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL, PRIMARY KEY (store, id))"
+        )
+        dpage_sweeper.register(self)
+
+    @property
+    def ttl(self) -> float:
+        return self._ttl if self._ttl is not None else settings.DPAGE_TTL
+
+    @property
+    def max_entries(self) -> int:
+        return self._max_entries if self._max_entries is not None else settings.DPAGE_MAX_ENTRIES
+
+    def _execute(self, sql: str, *params: Any) -> list[Any]:
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def __getitem__(self, key: str) -> V:
+        now = self._clock()
+        rows = self._execute(
+            "UPDATE dpage_state SET expires_at = ? WHERE store = ? AND id = ? AND expires_at > ?"
+            " RETURNING value",
+            now + self.ttl,
+            self.name,
+            key,
+            now,
+        )
+        if not rows:
+            raise KeyError(key)
+        return json.loads(rows[0][0])
+
+    def __setitem__(self, key: str, value: V) -> None:
+        self._execute(
+            "INSERT OR REPLACE INTO dpage_state (store, id, value, expires_at) VALUES (?, ?, ?, ?)",
+            self.name,
+            key,
+            json.dumps(value),
+            self._clock() + self.ttl,
+        )
+        evicted = self._execute(
+            "DELETE FROM dpage_state WHERE store = ? AND id NOT IN (SELECT id FROM dpage_state"
+            " WHERE store = ? ORDER BY expires_at DESC LIMIT ?) RETURNING id",
+            self.name,
+            self.name,
+            max(self.max_entries, 1),
+        )
+        if evicted:
+            dpage_evictions_total.inc(len(evicted), store=self.name, reason="capacity")
+        self._update_gauge()
+
+    def __delitem__(self, key: str) -> None:
+        rows = self._execute(
+            "DELETE FROM dpage_state WHERE store = ? AND id = ? RETURNING id", self.name, key
+        )
+        if not rows:
+            raise KeyError(key)
+        self._update_gauge()
+
+    def __contains__(self, key: object) -> bool:
+        rows = self._execute(
+            "SELECT 1 FROM dpage_state WHERE store = ? AND id = ? AND expires_at > ?",
+            self.name,
+            key,
+            self._clock(),
+        )
+        return bool(rows)
+
+    def __iter__(self) -> Iterator[str]:
+        rows = self._execute(
+            "SELECT id FROM dpage_state WHERE store = ? AND expires_at > ?",
+            self.name,
+            self._clock(),
+        )
+        return iter([row[0] for row in rows])
+
+    def __len__(self) -> int:
+        return self._execute(
+            "SELECT COUNT(*) FROM dpage_state WHERE store = ? AND expires_at > ?",
+            self.name,
+            self._clock(),
+        )[0][0]
+
+    def _update_gauge(self) -> None:
+        dpage_entries.set(len(self), store=self.name)
+
+    async def evict_expired(self) -> int:
+        """Delete every expired entry. Returns the number deleted."""
+        rows = await asyncio.to_thread(
+            self._execute,
+            "DELETE FROM dpage_state WHERE store = ? AND expires_at <= ? RETURNING id",
+            self.name,
+            self._clock(),
+        )
+        if rows:
+            dpage_evictions_total.inc(len(rows), store=self.name, reason="expired")
+            self._update_gauge()
+        return len(rows)
+
+
+def shared_dpage_store(name: str) -> DpageStore[Any] | SqliteDpageStore[Any]:
+    """A store for dpage state other workers may need, in the DPAGE_STATE_URL backend."""
+    url = settings.DPAGE_STATE_URL
+    if not url:
+        return DpageStore(name)
+    if url.startswith("sqlite:///"):
+        return SqliteDpageStore(name, Path(url.removeprefix("sqlite:///")))
+    raise ValueError(f"Unsupported DPAGE_STATE_URL: {url}")
+
+
+class DpageSweeper:
+    """Background task evicting the expired entries of every dpage store."""
+
+    def __init__(self, interval: float = SWEEP_INTERVAL):
+        self.interval = interval
+        self._stores: list[DpageStore[Any] | SqliteDpageStore[Any]] = []
+        self._task: asyncio.Task[None] | None = None
+
+    def register(self, store: "DpageStore[Any] | SqliteDpageStore[Any]") -> None:
+        self._stores.append(store)
+
+    async def sweep(self) -> int:
+        evicted = 0
+        for store in self._stores:
+            try:
+                evicted += await store.evict_expired()
+            except Exception as e:
+                logger.error(f"Error sweeping dpage {store.name} store: {e}", exc_info=True)
+        return evicted
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.sweep()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+dpage_sweeper = DpageSweeper()
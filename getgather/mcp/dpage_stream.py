@@ -0,0 +1,139 @@
+"""
+Push channel for dpage sign-in forms.
+
+Instead of a full-page POST per step, each of which re-distills the tab once a second for up to
+15 seconds, the sign-in page subscribes to `/dpage/{id}/events` (server-sent events) and posts
+field values to `/dpage/{id}/fields` in the background. A PageWatcher wakes up on DOM changes in
+the tab, reported by a MutationObserver through a CDP binding, and every new distilled screen is
+published to the subscribers of the dpage.
+"""
+
+import asyncio
+import json
+from typing import Any, AsyncIterator
+
+import zendriver as zd
+
+from getgather.logs import logger
+from getgather.metrics import metrics
+
+CHANGE_BINDING = "__ggPageChanged"
+# Reports DOM changes at most every 150 ms, including those of documents loaded later
+OBSERVER_SCRIPT = f"""
+(() => {{
+  if (window.__ggObserving) return;
+  window.__ggObserving = true;
+  let timer = null;
+  const notify = () => {{
+    if (timer) return;
+    timer = setTimeout(() => {{
+      timer = null;
+      window.{CHANGE_BINDING}("");
+    }}, 150);
+  }};
+  const observe = () => {{
+    new MutationObserver(notify).observe(document, {{
+      subtree: true, childList: true, attributes: true, characterData: true
+    }});
+    notify();
+  }};
+  if (document.readyState === "loading") document.addEventListener("DOMContentLoaded", observe);
+  else observe();
+}})();
+"""
+KEEPALIVE_INTERVAL = 15  # seconds
+
+dpage_updates_total = metrics.counter(
+    "dpage_updates_total", "Sign-in screens pushed to dpage subscribers, by event"
+)
+dpage_subscribers = metrics.gauge("dpage_subscribers", "Connected dpage event streams")
+
+
+class PageWatcher:
+    """Signals DOM changes in a tab, without polling."""
+
+    def __init__(self, page: zd.Tab):
+        self.page = page
+        self._changed = asyncio.Event()
+        self._script_id: Any = None
+
+    async def _on_binding_called(self, event: zd.cdp.runtime.BindingCalled) -> None:
+        if event.name == CHANGE_BINDING:
+            self._changed.set()
+
+    async def start(self) -> None:
+        # Handlers are coroutines: zendriver runs plain functions in a thread per event
+        self.page.add_handler(zd.cdp.runtime.BindingCalled, self._on_binding_called)  # type: ignore[arg-type]
+        await self.page.send(zd.cdp.runtime.add_binding(CHANGE_BINDING))
+        self._script_id = await self.page.send(
+            zd.cdp.page.add_script_to_evaluate_on_new_document(OBSERVER_SCRIPT)
+        )
+        await self.page.evaluate(OBSERVER_SCRIPT)
+
+    async def wait_for_change(self, timeout: float) -> bool:
+        """Wait until the page changed since the last call. Returns False on timeout."""
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except TimeoutError:
+            return False
+        self._changed.clear()
+        return True
+
+    async def stop(self) -> None:
+        self.page.remove_handlers(zd.cdp.runtime.BindingCalled, self._on_binding_called)  # type: ignore[arg-type]
+        try:
+            if self._script_id is not None:
+                await self.page.send(
+                    zd.cdp.page.remove_script_to_evaluate_on_new_document(self._script_id)
+                )
+            await self.page.send(zd.cdp.runtime.remove_binding(CHANGE_BINDING))
+        except Exception as e:
+            logger.debug(f"Could not remove the page watcher: {e}")
+
+
+class DpageUpdates:
+    """Fan-out of the screens of one dpage to its subscribers, replaying the latest on subscribe."""
+
+    def __init__(self):
+        self.latest: tuple[str, str] | None = None
+        self._subscribers: list[asyncio.Queue[tuple[str, str]]] = []
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event: str, data: dict[str, Any]) -> None:
+        message = (event, json.dumps(data))
+        self.latest = message
+        dpage_updates_total.inc(event=event)
+        for queue in self._subscribers:
+            queue.put_nowait(message)
+
+    def subscribe(self) -> "asyncio.Queue[tuple[str, str]]":
+        """A queue of the next screens, starting with the latest one."""
+        queue: asyncio.Queue[tuple[str, str]] = asyncio.Queue()
+        if self.latest is not None:
+            queue.put_nowait(self.latest)
+        self._subscribers.append(queue)
+        dpage_subscribers.inc()
+        return queue
+
+    def unsubscribe(self, queue: "asyncio.Queue[tuple[str, str]]") -> None:
+        if queue in self._subscribers:
+            self._subscribers.remove(queue)
+            dpage_subscribers.dec()
+
+    async def stream(self, queue: "asyncio.Queue[tuple[str, str]]") -> AsyncIterator[str]:
+        """Server-sent events from a subscription, until it disconnects or the signin ends."""
+        try:
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), KEEPALIVE_INTERVAL)
+                except TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event}\ndata: {data}\n\n"
+                if event in ("finished", "failed"):
+                    return
+        finally:
+            self.unsubscribe(queue)
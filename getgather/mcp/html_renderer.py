@@ -2,9 +2,68 @@
 
 DEFAULT_TITLE = "Sign In"
 
+# Shows the screens pushed through {action}/events and posts the fields to {action}/fields in the
+# background. Falls back to posting the form itself when the stream is not available.
+STREAM_SCRIPT = """
+    <script>
+      (function () {
+        const card = document.querySelector("div.card");
+        const form = card.querySelector("form");
+        const action = form.getAttribute("action");
+        const clearOverlay = () => card.querySelectorAll(".form-overlay").forEach((o) => o.remove());
+        if (!window.EventSource || !window.fetch) {
+          form.submit();
+          return;
+        }
+        let streaming = false;
+        const events = new EventSource(action + "/events");
+        const show = (event) => {
+          const screen = JSON.parse(event.data);
+          streaming = true;
+          document.title = screen.title;
+          card.querySelector("h2").textContent = screen.title;
+          card.querySelector(".content-wrapper").innerHTML = screen.content;
+          clearOverlay();
+        };
+        events.addEventListener("form", show);
+        events.addEventListener("finished", (event) => {
+          show(event);
+          events.close();
+        });
+        events.addEventListener("failed", (event) => {
+          show(event);
+          events.close();
+        });
+        events.addEventListener("error", () => {
+          if (!streaming) {
+            events.close();
+            form.submit();
+          }
+        });
+        form.addEventListener("submit", (event) => {
+          if (!streaming) return;
+          event.preventDefault();
+          const data = new FormData(form);
+          if (event.submitter && event.submitter.name) {
+            data.append(event.submitter.name, event.submitter.value);
+          }
+          fetch(action + "/fields", { method: "POST", body: new URLSearchParams(data) })
+            .then((response) => (response.ok ? response.json() : Promise.reject(response.status)))
+            .then((result) => result.needs_input && clearOverlay())
+            .catch(() => form.submit());
+        });
+      })();
+    </script>"""
+
+
+def render_form(
+    content: str, title: str = DEFAULT_TITLE, action: str = "", stream: bool = False
+) -> str:
+    """Render HTML form with the given content and options.
 
-def render_form(content: str, title: str = DEFAULT_TITLE, action: str = "") -> str:
-    """Render HTML form with the given content and options."""
+    With `stream`, the screens of the sign-in are pushed to the page instead (see dpage_stream).
+    """
+    stream_script = STREAM_SCRIPT if stream else ""
     return f"""<!doctype html>
 <html lang="en">
   <head>
@@ -254,6 +313,6 @@ def render_form(content: str, title: str = DEFAULT_TITLE, action: str = "") -> s
           {content}
         </div>
       </form>
-    </div>
+    </div>{stream_script}
   </body>
 </html>"""
@@ -1,4 +1,6 @@
+import inspect
 import json
+import time
 from dataclasses import dataclass
 from functools import cache, cached_property
 from typing import Any, Literal
@@ -10,11 +12,15 @@ from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
 from pydantic import BaseModel
 
 from getgather.api.types import RequestInfo, request_info
+from getgather.browser.blocking_stats import BlockingStats, tool_call_stats
+from getgather.config import settings
 from getgather.logs import logger
 from getgather.mcp.auto_import import auto_import
 from getgather.mcp.calendar_utils import calendar_mcp
 from getgather.mcp.dpage import dpage_check, dpage_finalize, dpage_mcp_tool
 from getgather.mcp.registry import GatherMCP
+from getgather.metrics import metrics
+from getgather.request_deadline import request_deadline
 
 # Ensure calendar MCP is registered by importing its module
 try:
@@ -23,12 +29,50 @@ except Exception as e:
     logger.warning(f"Failed to register calendar MCP: {e}")
 
 
+tool_call_seconds = metrics.histogram("tool_call_seconds", "Duration of MCP tool calls")
+
+
+def _tool_call_timeout() -> float:
+    """TOOL_CALL_TIMEOUT, or the shorter timeout the client asked for in x-request-timeout."""
+    timeout = float(settings.TOOL_CALL_TIMEOUT)
+    header = get_http_headers(include_all=True).get("x-request-timeout")
+    if header:
+        try:
+            requested = float(header)
+        except ValueError:
+            logger.warning(f"Ignoring invalid x-request-timeout header: {header}")
+        else:
+            if requested > 0:
+                timeout = min(timeout, requested) if timeout > 0 else requested
+    return timeout
+
+
 class LocationProxyMiddleware(Middleware):
     # type: ignore
     async def on_call_tool(self, context: MiddlewareContext[Any], call_next: CallNext[Any, Any]):
         if not context.fastmcp_context:
             return await call_next(context)
 
+        # Timing record of the tool call, with the request blocking stats of the tabs it opened
+        name = context.message.name
+        stats = BlockingStats()
+        token = tool_call_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            async with request_deadline(_tool_call_timeout()):
+                return await self._call_tool(context, call_next)
+        finally:
+            elapsed = time.perf_counter() - started
+            tool_call_stats.reset(token)
+            tool_call_seconds.observe(elapsed, tool=name)
+            logger.info(
+                f"Tool call {name} took {elapsed:.2f}s",
+                extra={"tool": name, "duration": round(elapsed, 3), "blocking": stats.summary()},
+            )
+
+    async def _call_tool(self, context: MiddlewareContext[Any], call_next: CallNext[Any, Any]):
+        assert context.fastmcp_context is not None
+
         headers = get_http_headers(include_all=True)
 
         # Build logging context with session IDs
@@ -59,6 +103,11 @@ class LocationProxyMiddleware(Middleware):
         if proxy_type is not None:
             info_data["proxy_type"] = proxy_type
 
+        # Identity of the client, to reuse its proxy sessions (see PROXY_SESSION_TTL)
+        user_id = browser_session_id or mcp_session_id
+        if user_id:
+            info_data["user_id"] = user_id
+
         # Set request_info if we have any data
         if info_data:
             request_info.set(RequestInfo(**info_data))  # type: ignore[arg-type]
@@ -70,7 +119,10 @@ class LocationProxyMiddleware(Middleware):
                 return await call_next(context)
 
         brand_id = context.message.name.split("_")[0]
-        context.fastmcp_context.set_state("brand_id", brand_id)
+        # A coroutine in fastmcp versions after 2
+        result: Any = context.fastmcp_context.set_state("brand_id", brand_id)
+        if inspect.isawaitable(result):
+            await result
 
         # Use contextualize to set context for all logs during tool execution
         with logger.contextualize(**log_context):
@@ -95,9 +147,18 @@ class MCPApp:
     route: str
     brand_ids: list[str]
 
+    @cached_property
+    def server(self) -> FastMCP[Context]:
+        return _create_mcp_server(self.name, self.brand_ids)
+
     @cached_property
     def app(self) -> StarletteWithLifespan:
-        return _create_mcp_app(self.name, self.brand_ids)
+        return self.server.http_app(path="/")
+
+    @cached_property
+    def node_app(self) -> StarletteWithLifespan:
+        """Stateless app serving tool calls forwarded by other nodes (see node_routing)."""
+        return self.server.http_app(path="/", stateless_http=True)
 
 
 @cache
@@ -136,8 +197,8 @@ def create_mcp_apps() -> list[MCPApp]:
     return apps
 
 
-def _create_mcp_app(bundle_name: str, brand_ids: list[str]):
-    """Create and return the MCP ASGI app.
+def _create_mcp_server(bundle_name: str, brand_ids: list[str]) -> FastMCP[Context]:
+    """Create and return the MCP server.
 
     This performs plugin discovery/registration and mounts brand MCPs.
     """
@@ -181,7 +242,7 @@ def _create_mcp_app(bundle_name: str, brand_ids: list[str]):
 
     mcp.mount(server=calendar_mcp, prefix="calendar")
 
-    return mcp.http_app(path="/")
+    return mcp
 
 
 class MCPToolDoc(BaseModel):
@@ -0,0 +1,126 @@
+"""
+One actor per dpage, serializing the interactions with its tab.
+
+Form submissions, the distillation steps of the page watcher and the resumed actions all drive
+the same tab. Each dpage gets a task with a mailbox that runs them one at a time, in arrival
+order, while different dpages run in parallel. A message carrying the key of a message already
+waiting or running (a client retrying the same submission) shares its result instead of running
+twice.
+
+Work running in the actor that reaches the actor again (e.g. a submission finishing the sign-in
+and resuming the pending action) runs inline. The actor stops after being idle for a while and is
+started again by the next message.
+"""
+
+import asyncio
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+from getgather.logs import logger
+from getgather.metrics import metrics
+
+T = TypeVar("T")
+
+IDLE_TIMEOUT = 30  # seconds
+
+actor_wait_seconds = metrics.histogram(
+    "dpage_actor_wait_seconds", "Time dpage interactions wait for the previous ones, by kind"
+)
+actor_coalesced_total = metrics.counter(
+    "dpage_actor_coalesced_total", "Duplicate dpage interactions served by a pending one, by kind"
+)
+
+# The actor whose task is running, to run nested messages inline
+_running_actor: ContextVar["PageActor | None"] = ContextVar("running_actor", default=None)
+
+
+@dataclass
+class _Message:
+    kind: str
+    key: Hashable | None
+    work: Callable[[], Awaitable[Any]]
+    future: "asyncio.Future[Any]"
+    queued_at: float
+
+
+class PageActor:
+    """Runs the interactions with one dpage one at a time."""
+
+    def __init__(self, id: str):
+        self.id = id
+        self._mailbox: asyncio.Queue[_Message] = asyncio.Queue()
+        self._pending: dict[Hashable, _Message] = {}
+        self._task: asyncio.Task[None] | None = None
+
+    async def run(
+        self, work: Callable[[], Awaitable[T]], kind: str = "work", key: Hashable | None = None
+    ) -> T:
+        """Run `work` after the interactions sent before it, and return its result."""
+        if _running_actor.get() is self:
+            return await work()
+        if key is not None and (pending := self._pending.get(key)) is not None:
+            actor_coalesced_total.inc(kind=kind)
+            logger.info(f"Joining the pending {kind} of dpage {self.id}")
+            return await asyncio.shield(pending.future)
+
+        future: asyncio.Future[T] = asyncio.get_running_loop().create_future()
+        message = _Message(kind, key, work, future, time.monotonic())
+        if key is not None:
+            self._pending[key] = message
+        self._mailbox.put_nowait(message)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+        # The work goes on if the caller goes away, e.g. a client disconnecting mid-submission
+        return await asyncio.shield(future)
+
+    async def _loop(self) -> None:
+        _running_actor.set(self)
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(self._mailbox.get(), IDLE_TIMEOUT)
+                except TimeoutError:
+                    if self._mailbox.empty():
+                        if _actors.get(self.id) is self:
+                            del _actors[self.id]
+                        return
+                    continue
+                await self._handle(message)
+        finally:
+            # Stopped by a cancellation: the messages still queued will never run
+            while not self._mailbox.empty():
+                message = self._mailbox.get_nowait()
+                if not message.future.done():
+                    message.future.cancel()
+            self._pending.clear()
+
+    async def _handle(self, message: _Message) -> None:
+        actor_wait_seconds.observe(time.monotonic() - message.queued_at, kind=message.kind)
+        try:
+            result = await message.work()
+        except Exception as error:
+            if not message.future.done():
+                message.future.set_exception(error)
+        else:
+            if not message.future.done():
+                message.future.set_result(result)
+        finally:
+            # Cancelled (or another BaseException): the callers must not wait forever
+            if not message.future.done():
+                message.future.cancel()
+            if message.key is not None:
+                self._pending.pop(message.key, None)
+
+
+_actors: dict[str, PageActor] = {}
+metrics.gauge("dpage_actors", "Running dpage actors", lambda: len(_actors))
+
+
+def page_actor(id: str) -> PageActor:
+    """The actor of a dpage, created on first use."""
+    actor = _actors.get(id)
+    if actor is None:
+        actor = _actors[id] = PageActor(id)
+    return actor
@@ -8,8 +8,11 @@ from getgather.logs import logger
 class GatherMCP(FastMCP[Context]):
     registry: ClassVar[dict[str, "GatherMCP"]] = {}
 
-    def __init__(self, *, brand_id: str, name: str) -> None:
+    def __init__(self, *, brand_id: str, name: str, signin_timeout: float | None = None) -> None:
         super().__init__(name=name)
         self.brand_id = brand_id
+        # How long check_signin waits for a sign-in to this brand, in seconds
+        # (None: settings.SIGNIN_TIMEOUT)
+        self.signin_timeout = signin_timeout
         GatherMCP.registry[self.brand_id] = self
         logger.debug(f"Registered GatherMCP with brand_id '{brand_id}' and name '{name}'")
@@ -0,0 +1,188 @@
+"""In-process metrics (counters, gauges and histograms) exposed at /api/metrics."""
+
+import bisect
+import threading
+from collections import defaultdict
+from typing import Any, Callable
+
+LabelSet = tuple[tuple[str, str], ...]
+
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    30,
+    60,
+    120,
+    300,
+    600,
+    1800,
+    3600,
+)
+
+
+def _label_set(labels: dict[str, Any]) -> LabelSet:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class Counter:
+    """Monotonically increasing value, optionally split by labels."""
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._values: dict[LabelSet, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        with self._lock:
+            self._values[_label_set(labels)] += amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(_label_set(labels), 0)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            values = [{"labels": dict(key), "value": v} for key, v in self._values.items()]
+        return {"type": "counter", "description": self.description, "values": values}
+
+
+class Gauge:
+    """Value that goes up and down. A callback gauge is read when the snapshot is taken."""
+
+    def __init__(self, name: str, description: str, callback: Callable[[], float] | None = None):
+        self.name = name
+        self.description = description
+        self.callback = callback
+        self._values: dict[LabelSet, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def set(self, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._values[_label_set(labels)] = value
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        with self._lock:
+            self._values[_label_set(labels)] += amount
+
+    def dec(self, amount: float = 1, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: Any) -> float:
+        if self.callback is not None and not labels:
+            return self.callback()
+        return self._values.get(_label_set(labels), 0)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            values = [{"labels": dict(key), "value": v} for key, v in self._values.items()]
+        if self.callback is not None:
+            values.append({"labels": {}, "value": self.callback()})
+        return {"type": "gauge", "description": self.description, "values": values}
+
+
+class _HistogramData:
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.count = 0
+        self.sum = 0.0
+
+
+class Histogram:
+    """Distribution of observed values in fixed buckets, with approximate quantiles."""
+
+    def __init__(self, name: str, description: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self._data: dict[LabelSet, _HistogramData] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _label_set(labels)
+        with self._lock:
+            data = self._data.get(key)
+            if data is None:
+                # the last slot counts values above the largest bucket
+                data = self._data[key] = _HistogramData(len(self.buckets) + 1)
+            data.counts[bisect.bisect_left(self.buckets, value)] += 1
+            data.count += 1
+            data.sum += value
+
+    def count(self, **labels: Any) -> int:
+        data = self._data.get(_label_set(labels))
+        return data.count if data else 0
+
+    def quantile(self, q: float, **labels: Any) -> float | None:
+        """Upper bound of the bucket holding the q-th quantile, or None without observations."""
+        data = self._data.get(_label_set(labels))
+        if data is None or data.count == 0:
+            return None
+        return self._quantile(data, q)
+
+    def _quantile(self, data: _HistogramData, q: float) -> float:
+        rank = q * data.count
+        cumulative = 0
+        for index, count in enumerate(data.counts):
+            cumulative += count
+            if cumulative >= rank and count > 0:
+                return self.buckets[index] if index < len(self.buckets) else float("inf")
+        return float("inf")
+
+    def snapshot(self) -> dict[str, Any]:
+        values: list[dict[str, Any]] = []
+        with self._lock:
+            for key, data in self._data.items():
+                values.append({
+                    "labels": dict(key),
+                    "count": data.count,
+                    "sum": data.sum,
+                    "buckets": {
+                        str(bound): count
+                        for bound, count in zip((*self.buckets, "+Inf"), data.counts)
+                    },
+                    "p50": self._quantile(data, 0.5),
+                    "p90": self._quantile(data, 0.9),
+                    "p99": self._quantile(data, 0.99),
+                })
+        return {"type": "histogram", "description": self.description, "values": values}
+
+
+class MetricsRegistry:
+    """Get-or-create registry so modules can declare their metrics at import time."""
+
+    def __init__(self):
+        self._metrics: dict[str, Counter | Gauge | Histogram] = {}
+
+    def counter(self, name: str, description: str) -> Counter:
+        metric = self._metrics.setdefault(name, Counter(name, description))
+        assert isinstance(metric, Counter), f"{name} is already registered as {type(metric)}"
+        return metric
+
+    def gauge(
+        self, name: str, description: str, callback: Callable[[], float] | None = None
+    ) -> Gauge:
+        metric = self._metrics.setdefault(name, Gauge(name, description, callback))
+        assert isinstance(metric, Gauge), f"{name} is already registered as {type(metric)}"
+        return metric
+
+    def histogram(
+        self, name: str, description: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        metric = self._metrics.setdefault(name, Histogram(name, description, buckets))
+        assert isinstance(metric, Histogram), f"{name} is already registered as {type(metric)}"
+        return metric
+
+    def snapshot(self) -> dict[str, Any]:
+        return {name: metric.snapshot() for name, metric in sorted(self._metrics.items())}
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,145 @@
+"""
+Routing of sign-in requests to the node that owns them.
+
+With HOSTNAME set, dpage ids are prefixed with the node name (`<node>-<id>`), and the tab of a
+sign-in lives in that node's browser. NODE_ROUTES maps node names to their base URLs, so any node
+can take a request for a sign-in: `/dpage/<id>` pages and MCP tool calls naming a signin id
+(a `signin_id` argument or the x-signin-id header) are forwarded to the owning node.
+
+MCP sessions are local to the node that created them, so MCP calls are forwarded to the owner's
+stateless MCP endpoint, mounted under NODE_MCP_PREFIX.
+"""
+
+import json
+from typing import Any, cast
+
+import httpx
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+from getgather.config import settings
+from getgather.logs import logger
+from getgather.metrics import metrics
+
+NODE_MCP_PREFIX = "/node"
+# Set on forwarded requests, which are never forwarded again
+ROUTED_HEADER = "x-getgather-routed"
+
+# Not forwarded: hop-by-hop headers, and the MCP session, which only exists on this node
+_DROPPED_HEADERS = frozenset({
+    "connection",
+    "content-length",
+    "host",
+    "keep-alive",
+    "mcp-session-id",
+    "transfer-encoding",
+})
+
+routed_requests_total = metrics.counter(
+    "node_routed_requests_total", "Requests forwarded to the node owning their sign-in"
+)
+
+_client: httpx.AsyncClient | None = None
+
+
+def node_of(id: str) -> str | None:
+    """The node name an id is prefixed with, if any."""
+    node, sep, _ = id.rpartition("-")
+    return node if sep and node else None
+
+
+def owner_url(id: str) -> str | None:
+    """Base URL of the node owning `id`, when it is another known node."""
+    node = node_of(id)
+    if node is None or node == settings.HOSTNAME:
+        return None
+    return settings.NODE_ROUTES.get(node)
+
+
+def signin_id_of(request: Request, body: bytes) -> str | None:
+    """The signin id an MCP tool call is about, from its arguments or the x-signin-id header."""
+    try:
+        message: Any = json.loads(body) if body else None
+    except ValueError:
+        return None
+    if not isinstance(message, dict):
+        return None
+    message = cast(dict[str, Any], message)
+    if message.get("method") != "tools/call":
+        return None
+    params: Any = message.get("params")
+    if not isinstance(params, dict):
+        return None
+    arguments: Any = cast(dict[str, Any], params).get("arguments")
+    if isinstance(arguments, dict):
+        signin_id = cast(dict[str, Any], arguments).get("signin_id")
+        if isinstance(signin_id, str):
+            return signin_id
+    return request.headers.get("x-signin-id") or None
+
+
+def _route(request: Request, body: bytes) -> str | None:
+    """The URL to forward a request to, or None to serve it here."""
+    path = request.url.path
+    if path.startswith("/dpage/"):
+        id = path.removeprefix("/dpage/").split("/")[0]
+        base = owner_url(id)
+        return f"{base}{path}" if base else None
+    if path.startswith("/mcp") and request.method == "POST":
+        id = signin_id_of(request, body)
+        base = owner_url(id) if id else None
+        return f"{base}{NODE_MCP_PREFIX}{path.rstrip('/')}/" if base else None
+    return None
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(timeout=httpx.Timeout(30, read=None))
+    return _client
+
+
+async def forward(request: Request, url: str, body: bytes) -> Response:
+    headers = {k: v for k, v in request.headers.items() if k.lower() not in _DROPPED_HEADERS}
+    headers[ROUTED_HEADER] = settings.HOSTNAME or "1"
+    if request.url.query:
+        url = f"{url}?{request.url.query}"
+    client = _get_client()
+    upstream = await client.send(
+        client.build_request(request.method, url, headers=headers, content=body), stream=True
+    )
+    response_headers = {
+        k: v for k, v in upstream.headers.items() if k.lower() not in _DROPPED_HEADERS
+    }
+    response_headers.pop("content-encoding", None)  # aiter_bytes decodes the body
+    return StreamingResponse(
+        upstream.aiter_bytes(),
+        status_code=upstream.status_code,
+        headers=response_headers,
+        background=BackgroundTask(upstream.aclose),
+    )
+
+
+async def route_to_owner(request: Request) -> Response | None:
+    """Forward `request` to the node owning its sign-in, or None to serve it here."""
+    if not settings.NODE_ROUTES or ROUTED_HEADER in request.headers:
+        return None
+    body = await request.body()
+    url = _route(request, body)
+    if url is None:
+        return None
+    routed_requests_total.inc(path=request.url.path.split("/")[1])
+    logger.info(f"Forwarding {request.method} {request.url.path} to {url}")
+    try:
+        return await forward(request, url, body)
+    except httpx.HTTPError as e:
+        logger.error(f"Failed to forward {request.url.path} to {url}: {e}")
+        return Response(status_code=502, content=f"Owner node unreachable: {e}")
+
+
+async def close_node_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
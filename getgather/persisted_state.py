@@ -0,0 +1,107 @@
+"""
+In-memory state saved as JSON under the persistent store directory.
+
+The state is loaded on first use, and saved at most every SAVE_INTERVAL seconds while it
+changes. The JSON is serialized on the event loop, where the state is updated, and written to
+disk in a worker thread, so recording never blocks the loop on file I/O. save() writes
+synchronously, for shutdown.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, ClassVar
+
+from getgather.config import settings
+from getgather.logs import logger
+
+# How often the state is saved while it changes, in seconds
+SAVE_INTERVAL = 60
+
+
+class PersistedState:
+    """State persisted to `path`, by default `file_name` in the persistent store directory.
+
+    Subclasses implement `_restore` and `_state`, call `_load` before reading the state and
+    `_changed` after updating it.
+    """
+
+    file_name: ClassVar[str]
+    description: ClassVar[str]  # for log messages
+
+    def __init__(self, path: Path | None = None, clock: Callable[[], float] = time.monotonic):
+        self._path = path
+        self._clock = clock
+        self._loaded = False
+        self._dirty = False
+        self._saved_at = clock()
+        self._write_lock = threading.Lock()
+        # Serialized states are numbered, so an older one never overwrites a newer one
+        self._version = 0
+        self._written_version = 0
+        self._writes: set[asyncio.Task[None]] = set()
+
+    @property
+    def path(self) -> Path:
+        return self._path or settings.persistent_store_dir / self.file_name
+
+    def _restore(self, data: Any) -> None:
+        raise NotImplementedError
+
+    def _state(self) -> Any:
+        raise NotImplementedError
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            if self.path.exists():
+                self._restore(json.loads(self.path.read_text()))
+        except (OSError, ValueError, AttributeError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring saved {self.description} in {self.path}: {e}")
+
+    def _changed(self) -> None:
+        self._dirty = True
+        if self._clock() - self._saved_at < SAVE_INTERVAL:
+            return
+        serialized = self._serialize()
+        if serialized is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write(*serialized)
+            return
+        write = loop.create_task(asyncio.to_thread(self._write, *serialized))
+        self._writes.add(write)
+        write.add_done_callback(self._writes.discard)
+
+    def _serialize(self) -> tuple[int, str] | None:
+        if not self._dirty:
+            return None
+        self._dirty = False
+        self._saved_at = self._clock()
+        self._version += 1
+        return self._version, json.dumps(self._state())
+
+    def _write(self, version: int, data: str) -> None:
+        temp = self.path.with_suffix(".tmp")
+        with self._write_lock:
+            if version < self._written_version:
+                return
+            self._written_version = version
+            try:
+                temp.write_text(data)
+                os.replace(temp, self.path)
+            except OSError as e:
+                logger.warning(f"Failed to save {self.description} to {self.path}: {e}")
+
+    def save(self) -> None:
+        """Write the pending changes now. Blocking: meant for shutdown."""
+        serialized = self._serialize()
+        if serialized is not None:
+            self._write(*serialized)
@@ -0,0 +1,74 @@
+"""
+Deadline of the MCP request that browser work is done for.
+
+Each tool call runs under a deadline: TOOL_CALL_TIMEOUT seconds, or fewer with the
+x-request-timeout header. Past it, the tool call is cancelled, as when the client cancels it
+(notifications/cancelled). The CancelledError aborts the pending CDP commands, and the
+navigation, distillation and dpage helpers close the tabs they opened on the way out, so the
+browser capacity is reclaimed at once instead of when their own timeouts expire.
+
+Within the deadline, the helpers cap their own timeouts with deadline_remaining() and do not start
+new attempts past it (check_deadline()).
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncGenerator, Awaitable
+
+from getgather.metrics import metrics
+
+# Loop time by which the current request must be answered
+_deadline: ContextVar[float | None] = ContextVar("request_deadline", default=None)
+
+tool_calls_aborted_total = metrics.counter(
+    "tool_calls_aborted_total", "Tool calls cut short, by reason (deadline, cancelled)"
+)
+
+
+@asynccontextmanager
+async def request_deadline(timeout: float | None) -> AsyncGenerator[None, None]:
+    """Run the block under a deadline `timeout` seconds from now (None or 0 for none)."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout if timeout else None
+    outer = _deadline.get()
+    if deadline is None or (outer is not None and outer <= deadline):
+        deadline = outer
+    token = _deadline.set(deadline)
+    scope = asyncio.timeout_at(deadline)
+    try:
+        async with scope:
+            yield
+    except TimeoutError:
+        if scope.expired():
+            tool_calls_aborted_total.inc(reason="deadline")
+        raise
+    except asyncio.CancelledError:
+        tool_calls_aborted_total.inc(reason="cancelled")
+        raise
+    finally:
+        _deadline.reset(token)
+
+
+def deadline_remaining(default: float) -> float:
+    """`default` seconds, capped to the time left before the deadline of the request."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return default
+    return max(0.0, min(default, deadline - asyncio.get_running_loop().time()))
+
+
+def check_deadline() -> None:
+    """Raise TimeoutError once the deadline of the request has passed."""
+    deadline = _deadline.get()
+    if deadline is not None and asyncio.get_running_loop().time() >= deadline:
+        raise TimeoutError("Request deadline exceeded")
+
+
+async def cleanup_after_cancel(cleanup: Awaitable[Any]) -> None:
+    """Run `cleanup` to completion while handling a cancellation, even if cancelled again."""
+    task = asyncio.ensure_future(cleanup)
+    try:
+        await asyncio.shield(task)
+    except asyncio.CancelledError:
+        pass  # the caller re-raises the cancellation, the cleanup goes on in the background
@@ -1,9 +1,14 @@
 import asyncio
+import base64
+import math
 import os
 import random
 import re
+import time
 import urllib.parse
+from collections import OrderedDict
 from datetime import datetime
+from functools import partial
 from pathlib import Path
 from typing import Any, cast
 from urllib.parse import urlunparse
@@ -17,21 +22,41 @@ from nanoid import generate
 from zendriver.core.connection import ProtocolException
 
 from getgather.api.types import request_info
+from getgather.browser.asset_cache import AssetCache, cache_lifetime, get_asset_cache
+from getgather.browser.blocking_stats import new_tab_stats, response_sizes
+from getgather.browser.egress import egress_key, egress_validator
+from getgather.browser.profile_template import clone_profile_template
 from getgather.browser.proxy import setup_proxy
-from getgather.browser.resource_blocker import blocked_domains, load_blocklists, should_be_blocked
+from getgather.browser.proxy_pool import proxy_pool
+from getgather.browser.proxy_sessions import proxy_first_byte_seconds, proxy_sessions
+from getgather.browser.resource_blocker import (
+    block_reason,
+    get_blocklist_patterns,
+)
+from getgather.browser.resource_policy import ResourcePolicy, default_policy, policy_for_url
 from getgather.config import settings
 from getgather.distill import (
     NETWORK_ERROR_PATTERNS,
     ConversionResult,
     Match,
     Pattern,
+    asks_for_input,
     convert,
     get_selector,
     load_distillation_patterns,
+    predicted_patterns,
     terminate,
 )
+from getgather.flow_graph import distill_seconds, flow_graph, flow_predictions_total
+from getgather.latency_budgets import latency_budgets
 from getgather.logs import logger
 from getgather.mcp.browser import browser_manager, terminate_zendriver_browser
+from getgather.metrics import metrics
+from getgather.request_deadline import check_deadline, cleanup_after_cancel, deadline_remaining
+
+page_load_seconds = metrics.histogram(
+    "page_load_seconds", "Time to navigate and reach ready state, by resource policy"
+)
 
 
 def _safe_fragment(value: str) -> str:
@@ -163,30 +188,6 @@ async def zen_report_distill_error(
             sentry_sdk.capture_exception(error)
 
 
-async def install_proxy_handler(username: str, password: str, page: zd.Tab):
-    """Install proxy authentication handler for the page.
-
-    Note: This only handles authentication challenges. Request continuation
-    is handled by the resource blocker in get_new_page().
-    """
-
-    async def auth_challenge_handler(event: zd.cdp.fetch.AuthRequired):
-        logger.debug("Supplying proxy authentication...")
-        await page.send(
-            zd.cdp.fetch.continue_with_auth(
-                request_id=event.request_id,
-                auth_challenge_response=zd.cdp.fetch.AuthChallengeResponse(
-                    response="ProvideCredentials",
-                    username=username,
-                    password=password,
-                ),
-            )
-        )
-
-    page.add_handler(zd.cdp.fetch.AuthRequired, auth_challenge_handler)  # type: ignore[arg-type]
-    await page.send(zd.cdp.fetch.enable(handle_auth_requests=True))
-
-
 FRIENDLY_CHARS = "23456789abcdefghijkmnpqrstuvwxyz"
 
 
@@ -200,9 +201,11 @@ async def _create_zendriver_browser(id: str | None = None) -> zd.Browser:
         extra={"profile_id": id},
     )
 
-    browser_args = ["--start-maximized"]
+    await clone_profile_template(user_data_dir)
+    browser_args = ["--start-maximized", "--disable-component-update"]
 
-    proxy = await setup_proxy(id, request_info.get())
+    info = request_info.get()
+    proxy = await setup_proxy(id, info, launch=True)
     if proxy:
         proxy_server = proxy["server"]
         browser_args.append(f"--proxy-server={proxy_server}")
@@ -218,6 +221,7 @@ async def _create_zendriver_browser(id: str | None = None) -> zd.Browser:
                 browser_args=browser_args,
             )
             browser.id = id  # type: ignore[attr-defined]
+            browser.request_info = info  # type: ignore[attr-defined]
             return browser
         except Exception as e:
             last_error = e
@@ -240,6 +244,27 @@ async def _create_zendriver_browser(id: str | None = None) -> zd.Browser:
     raise last_error or RuntimeError("Failed to start browser")
 
 
+async def relaunch_zendriver_browser(browser: zd.Browser) -> zd.Browser:
+    """Start a fresh browser on the same profile directory (and proxy) as `browser`."""
+    token = request_info.set(getattr(browser, "request_info", None))
+    try:
+        return await _create_zendriver_browser(cast(str, browser.id))  # type: ignore[attr-defined]
+    finally:
+        request_info.reset(token)
+
+
+async def _check_egress(browser: zd.Browser) -> str | None:
+    page = await get_new_page(browser)
+    try:
+        # Skip wait_for_ready_state for IP check - it is a simple text page
+        await zen_navigate_with_retry(page, settings.IP_CHECK_URL, wait_for_ready=False)
+        body = await page.select("body")
+        return body.text.strip() if body else None
+    finally:
+        # Closed so that the tab does not hold up _drain_tabs when recycling
+        await safe_close_page(page)
+
+
 async def init_zendriver_browser(id: str | None = None) -> zd.Browser:
     if id is not None:
         if browser := browser_manager.get_incognito_browser(id):
@@ -248,22 +273,12 @@ async def init_zendriver_browser(id: str | None = None) -> zd.Browser:
             raise ValueError(f"Browser profile for signin {id} not found")
 
     MAX_ATTEMPTS = 3
-    IP_CHECK_URL = "https://ip.fly.dev/ip"
     for attempt in range(1, MAX_ATTEMPTS + 1):
         logger.info(f"Creating a new Zendriver browser (attempt {attempt}/{MAX_ATTEMPTS})...")
         browser = await _create_zendriver_browser(id)
-
         try:
-            logger.info(f"Validating browser at {IP_CHECK_URL}...")
-            page = await get_new_page(browser)
-            # Skip wait_for_ready_state for IP check - ip.fly.dev is a simple text page
-            await zen_navigate_with_retry(page, IP_CHECK_URL, wait_for_ready=False)
-            body = await page.select("body")
-            if body:
-                ip_address = body.text.strip()
-                logger.info(f"Browser validated. IP address: {ip_address}")
-            else:
-                logger.info("Browser validated (could not extract IP)")
+            route = egress_key(browser.request_info)  # type: ignore[attr-defined]
+            await egress_validator.validate(route, partial(_check_egress, browser))
             return browser
         except Exception as e:
             logger.warning(f"Browser validation failed on attempt {attempt}: {e}")
@@ -292,21 +307,49 @@ async def zen_navigate_with_retry(page: zd.Tab, url: str, wait_for_ready: bool =
     Raises:
         Exception: If navigation fails after all retries
     """
+    # Real navigations double as the egress health signal for the browser's proxy route
+    route = egress_key(getattr(page.browser, "request_info", None) or request_info.get())
+    profile_id = getattr(page.browser, "id", None)
+    proxy_key = proxy_pool.assigned(profile_id)
+    session = "reused" if proxy_sessions.reused(profile_id, proxy_key) else "new"
+
+    policy = policy_for_url(url)
+    interceptor: TabInterceptor | None = getattr(page, "interceptor", None)
+    if interceptor is not None:
+        await interceptor.set_policy(policy)
+
     MAX_RETRIES = 3
     FIRST_TIMEOUT = 45  # seconds, extended for first attempt
     NORMAL_TIMEOUT = 30  # seconds, for retry attempts
+    # Once the site has a history, every attempt gets the budget learned from it
+    hostname = urllib.parse.urlparse(url).hostname
+    budget = latency_budgets.budget("navigation", hostname, FIRST_TIMEOUT)
 
     last_error: Exception | None = None
     for attempt in range(MAX_RETRIES):
-        timeout = FIRST_TIMEOUT if attempt == 0 else NORMAL_TIMEOUT
+        if budget is not None:
+            full_timeout = budget
+        else:
+            full_timeout = FIRST_TIMEOUT if attempt == 0 else NORMAL_TIMEOUT
+        # No attempt outlives the MCP request it is made for
+        check_deadline()
+        timeout = deadline_remaining(full_timeout)
         try:
 
             async def navigate_and_wait() -> zd.Tab:
+                connect_started = time.perf_counter()
                 _frame_id, _loader_id, error_text = await page.send(zd.cdp.page.navigate(url))
 
                 # Check for navigation errors (connection refused, DNS failure, SSL errors, etc.)
                 if error_text:
                     raise ConnectionError(f"Navigation failed: {error_text}")
+                # Page.navigate returns once the response has started, through the proxy
+                connect_latency = time.perf_counter() - connect_started
+                proxy_pool.record_navigation(proxy_key, latency=connect_latency)
+                if proxy_key is not None:
+                    proxy_first_byte_seconds.observe(
+                        connect_latency, proxy=proxy_key, session=session
+                    )
 
                 if not wait_for_ready:
                     return page
@@ -319,10 +362,24 @@ async def zen_navigate_with_retry(page: zd.Tab, url: str, wait_for_ready: bool =
                     pass
                 return page
 
+            started = time.perf_counter()
             result = await asyncio.wait_for(navigate_and_wait(), timeout=timeout)
+            if wait_for_ready:
+                elapsed = time.perf_counter() - started
+                page_load_seconds.observe(elapsed, policy=policy.name)
+                latency_budgets.record("navigation", hostname, elapsed)
+            egress_validator.record_navigation(route)
             return result
+        except asyncio.CancelledError:
+            # Nobody waits for the page anymore: stop loading it
+            await cleanup_after_cancel(_stop_loading(page))
+            raise
         except Exception as error:
             last_error = error
+            proxy_pool.record_navigation(proxy_key, error=error)
+            # Attempts cut short by the request deadline say nothing about the site
+            if isinstance(error, TimeoutError) and wait_for_ready and timeout >= full_timeout:
+                latency_budgets.record_timeout("navigation", hostname)
             if attempt < MAX_RETRIES - 1:
                 logger.warning(
                     f"Navigation to {url} failed (attempt {attempt + 1}/{MAX_RETRIES}): {error}. "
@@ -331,56 +388,299 @@ async def zen_navigate_with_retry(page: zd.Tab, url: str, wait_for_ready: bool =
                 await asyncio.sleep(1)
             else:
                 logger.error(f"Failed to navigate to {url} after {MAX_RETRIES} attempts")
+                egress_validator.record_navigation(route, error)
 
     # This should never be reached, but satisfies type checker
     raise last_error or Exception(f"Failed to navigate to {url}")
 
 
-async def get_new_page(browser: zd.Browser) -> zd.Tab:
-    page = await browser.get("about:blank", new_tab=True)
+async def _stop_loading(page: zd.Tab) -> None:
+    try:
+        await page.send(zd.cdp.page.stop_loading())
+    except Exception as e:
+        logger.debug(f"Could not stop loading the page: {e}")
 
-    if blocked_domains is None:
-        await load_blocklists()
 
-    async def handle_request(event: zd.cdp.fetch.RequestPaused) -> None:
-        resource_type = event.resource_type
-        request_url = event.request.url
+def _request_patterns(patterns: list[tuple[str, str | None]]) -> list[zd.cdp.fetch.RequestPattern]:
+    return [
+        zd.cdp.fetch.RequestPattern(
+            url_pattern=glob,
+            resource_type=zd.cdp.network.ResourceType(resource_type) if resource_type else None,
+        )
+        for glob, resource_type in patterns
+    ]
 
-        deny_type = resource_type in [
-            zd.cdp.network.ResourceType.IMAGE,
-            zd.cdp.network.ResourceType.MEDIA,
-            zd.cdp.network.ResourceType.FONT,
-        ]
-        deny_url = await should_be_blocked(request_url)
-        should_deny = deny_type or deny_url
 
-        if not should_deny:
-            try:
-                await page.send(zd.cdp.fetch.continue_request(request_id=event.request_id))
-            except (ProtocolException, websockets.ConnectionClosedError) as e:
-                if isinstance(e, ProtocolException) and (
-                    "Invalid state for continueInterceptedRequest" in str(e)
-                    or "Invalid InterceptionId" in str(e)
-                ):
-                    logger.debug(
-                        f"Request already processed or invalid interception ID: {request_url}"
-                    )
-                elif isinstance(e, websockets.ConnectionClosedError):
-                    logger.debug(f"Page closed while continuing request: {request_url}")
-                else:
-                    raise
+# Static assets served from and stored in the shared asset cache
+CACHED_RESOURCE_TYPES = (
+    zd.cdp.network.ResourceType.SCRIPT,
+    zd.cdp.network.ResourceType.STYLESHEET,
+)
+CACHED_RESOURCE_PATTERNS = [
+    zd.cdp.fetch.RequestPattern(resource_type=resource_type)
+    for resource_type in CACHED_RESOURCE_TYPES
+]
+# Requests that carried cookies or credentials remembered per tab, until their response
+CREDENTIALED_REQUESTS = 1024
+
+
+class TabInterceptor:
+    """Fetch interception for one tab: resource blocking and proxy authentication.
+
+    Only requests the current resource policy, the blocklists or the filter rules may block are
+    paused and decided in Python, see `get_blocklist_patterns`. The policy follows the site the
+    tab navigates to, see `set_policy`. Scripts and stylesheets are also paused to be served
+    from, or stored in, the shared asset cache.
+
+    Auth challenges are only reported for paused requests, so every request is paused until
+    the browser has answered its first challenge. Chrome then caches the proxy credentials
+    and interception is narrowed.
+    """
+
+    def __init__(
+        self,
+        page: zd.Tab,
+        credentials: tuple[str, str] | None = None,
+        filter_patterns: list[zd.cdp.fetch.RequestPattern] | None = None,
+        blocking: bool = True,
+        asset_cache: AssetCache | None = None,
+    ):
+        self.page = page
+        self.credentials = credentials
+        self.filter_patterns = filter_patterns or []
+        self.blocking = blocking
+        self.asset_cache = asset_cache
+        self.policy: ResourcePolicy = default_policy()
+        self.stats = new_tab_stats()
+        self._fetch_enabled = False
+        # Headers sent with the latest requests that carried cookies or credentials, by request
+        # id: paused requests do not show their cookies
+        self._credentialed: OrderedDict[str, dict[str, Any]] = OrderedDict()
+
+    @property
+    def awaiting_auth(self) -> bool:
+        browser = self.page.browser
+        return self.credentials is not None and not getattr(browser, "proxy_authenticated", False)
+
+    def patterns(self) -> list[zd.cdp.fetch.RequestPattern]:
+        patterns: list[zd.cdp.fetch.RequestPattern] = []
+        if self.blocking:
+            patterns += _request_patterns(self.policy.request_patterns()) + self.filter_patterns
+        if self.asset_cache is not None:
+            patterns += CACHED_RESOURCE_PATTERNS
+        return patterns
+
+    async def start(self) -> None:
+        self.page.add_handler(zd.cdp.fetch.RequestPaused, self.handle_request)  # type: ignore[reportUnknownMemberType]
+        if self.credentials is not None:
+            self.page.add_handler(zd.cdp.fetch.AuthRequired, self.handle_auth)  # type: ignore[arg-type]
+        if self.blocking:
+            # Handlers are coroutines: zendriver runs plain functions in a thread per event
+            self.page.add_handler(zd.cdp.page.FrameNavigated, self.on_frame_navigated)  # type: ignore[arg-type]
+            if response_sizes.needs_samples():
+                # Response sizes, for the bytes saved estimate, from the first tabs only
+                await self.page.send(zd.cdp.network.enable())
+                self.page.add_handler(zd.cdp.network.ResponseReceived, self.on_response)  # type: ignore[arg-type]
+        if self.asset_cache is not None:
+            await self.page.send(zd.cdp.network.enable())
+            self.page.add_handler(zd.cdp.network.RequestWillBeSentExtraInfo, self.on_request_sent)  # type: ignore[arg-type]
+        await self.sync()
+
+    async def sync(self) -> None:
+        """Point Fetch interception at the requests that need a decision right now."""
+        if self.awaiting_auth:
+            patterns = [zd.cdp.fetch.RequestPattern(url_pattern="*")]
+        else:
+            patterns = self.patterns()
+        if patterns:
+            await self.page.send(
+                zd.cdp.fetch.enable(
+                    patterns=patterns, handle_auth_requests=self.credentials is not None
+                )
+            )
+            self._fetch_enabled = True
+        elif self._fetch_enabled:
+            await self.page.send(zd.cdp.fetch.disable())
+            self._fetch_enabled = False
+
+    async def set_policy(self, policy: ResourcePolicy) -> None:
+        if policy is self.policy:
+            return
+        logger.debug(f"Applying resource policy '{policy.name}'")
+        self.policy = policy
+        if self.blocking:
+            await self.sync()
+
+    async def handle_auth(self, event: zd.cdp.fetch.AuthRequired) -> None:
+        assert self.credentials is not None
+        username, password = self.credentials
+        logger.debug("Supplying proxy authentication...")
+        await self.page.send(
+            zd.cdp.fetch.continue_with_auth(
+                request_id=event.request_id,
+                auth_challenge_response=zd.cdp.fetch.AuthChallengeResponse(
+                    response="ProvideCredentials",
+                    username=username,
+                    password=password,
+                ),
+            )
+        )
+        setattr(self.page.browser, "proxy_authenticated", True)
+        await self.sync()
+
+    async def on_frame_navigated(self, event: zd.cdp.page.FrameNavigated) -> None:
+        # Also covers the navigations zen_navigate_with_retry does not make: redirects, links
+        # and form submissions
+        if event.frame.parent_id is None:
+            await self.set_policy(policy_for_url(event.frame.url))
+
+    async def on_response(self, event: zd.cdp.network.ResponseReceived) -> None:
+        response_sizes.observe(event.type_.value, event.response.headers)
+
+    async def on_request_sent(self, event: zd.cdp.network.RequestWillBeSentExtraInfo) -> None:
+        headers = cast(dict[str, Any], event.headers)
+        if any(name.lower() in ("authorization", "cookie") for name in headers):
+            self._credentialed[event.request_id] = headers
+            while len(self._credentialed) > CREDENTIALED_REQUESTS:
+                self._credentialed.popitem(last=False)
+
+    async def handle_request(self, event: zd.cdp.fetch.RequestPaused) -> None:
+        if event.response_status_code is not None or event.response_error_reason is not None:
+            await self._store_response(event)
+            return
+
+        # Timed until the request is continued, failed or served from the cache
+        started = time.perf_counter()
+        try:
+            await self._decide(event)
+        finally:
+            if self.blocking:
+                self.stats.record_intercepted(time.perf_counter() - started)
+
+    async def _decide(self, event: zd.cdp.fetch.RequestPaused) -> None:
+        page = self.page
+        request_url = event.request.url
+        resource_type = event.resource_type.value
+        # Requests paused only while waiting for the first proxy auth challenge are continued
+        reason: str | None = None
+        if self.blocking:
+            headers = cast(dict[str, str], event.request.headers)
+            reason = block_reason(
+                request_url,
+                resource_type,
+                headers.get("Referer") or (page.target and page.target.url),
+                self.policy,
+            )
+
+        if reason is None:
+            cacheable = (
+                self.asset_cache is not None
+                and event.resource_type in CACHED_RESOURCE_TYPES
+                and event.request.method == "GET"
+            )
+            if cacheable and await self._fulfill_from_cache(event):
+                return
+            # Cache misses are paused again with their response, to be stored
+            await self._send(
+                zd.cdp.fetch.continue_request(
+                    request_id=event.request_id, intercept_response=True if cacheable else None
+                ),
+                request_url,
+                "continuing request",
+            )
             return
 
-        kind = "URL" if deny_url else "resource"
-        logger.debug(f" DENY {kind}: {request_url}")
+        logger.debug(f" DENY {resource_type} ({reason}): {request_url}")
+        self.stats.record_blocked(request_url, resource_type, reason)
+        await self._send(
+            zd.cdp.fetch.fail_request(
+                request_id=event.request_id,
+                error_reason=zd.cdp.network.ErrorReason.BLOCKED_BY_CLIENT,
+            ),
+            request_url,
+            "blocking request",
+        )
+
+    async def _fulfill_from_cache(self, event: zd.cdp.fetch.RequestPaused) -> bool:
+        assert self.asset_cache is not None
+        asset = await asyncio.to_thread(self.asset_cache.get, event.request.url)
+        if asset is None:
+            return False
+        await self._send(
+            zd.cdp.fetch.fulfill_request(
+                request_id=event.request_id,
+                response_code=asset.status,
+                response_headers=[
+                    zd.cdp.fetch.HeaderEntry(name=name, value=value)
+                    for name, value in asset.headers.items()
+                ],
+                body=base64.b64encode(asset.body).decode(),
+            ),
+            event.request.url,
+            "serving cached asset",
+        )
+        return True
 
+    async def _store_response(self, event: zd.cdp.fetch.RequestPaused) -> None:
+        request_url = event.request.url
+        headers = {entry.name: entry.value for entry in event.response_headers or []}
+        lifetime = None
+        if self.asset_cache is not None and event.response_status_code is not None:
+            sent_headers = event.request.headers
+            if event.network_id is not None:
+                sent_headers = self._credentialed.pop(event.network_id, sent_headers)
+            lifetime = cache_lifetime(
+                event.request.method, event.response_status_code, sent_headers, headers
+            )
+        if lifetime is None:
+            await self._send(
+                zd.cdp.fetch.continue_request(request_id=event.request_id),
+                request_url,
+                "continuing response",
+            )
+            return
+
+        assert self.asset_cache is not None and event.response_status_code is not None
         try:
-            await page.send(
-                zd.cdp.fetch.fail_request(
-                    request_id=event.request_id,
-                    error_reason=zd.cdp.network.ErrorReason.BLOCKED_BY_CLIENT,
-                )
+            body, base64_encoded = await self.page.send(
+                zd.cdp.fetch.get_response_body(request_id=event.request_id)
+            )
+        except (ProtocolException, websockets.ConnectionClosedError) as e:
+            logger.debug(f"Could not read response body of {request_url}: {e}")
+            await self._send(
+                zd.cdp.fetch.continue_request(request_id=event.request_id),
+                request_url,
+                "continuing response",
             )
+            return
+        data = base64.b64decode(body) if base64_encoded else body.encode()
+        # The body is decoded, so its encoding and length headers no longer apply
+        headers = {
+            name: value
+            for name, value in headers.items()
+            if name.lower() not in {"content-encoding", "content-length", "transfer-encoding"}
+        }
+        await self._send(
+            zd.cdp.fetch.fulfill_request(
+                request_id=event.request_id,
+                response_code=event.response_status_code,
+                response_headers=[
+                    zd.cdp.fetch.HeaderEntry(name=name, value=value)
+                    for name, value in headers.items()
+                ],
+                body=base64.b64encode(data).decode(),
+            ),
+            request_url,
+            "fulfilling response",
+        )
+        await asyncio.to_thread(
+            self.asset_cache.put, request_url, event.response_status_code, headers, data, lifetime
+        )
+
+    async def _send(self, command: Any, request_url: str, action: str) -> None:
+        """Send a Fetch command for a paused request, ignoring requests that are already gone."""
+        try:
+            await self.page.send(command)
         except (ProtocolException, websockets.ConnectionClosedError) as e:
             if isinstance(e, ProtocolException) and (
                 "Invalid state for continueInterceptedRequest" in str(e)
@@ -388,22 +688,36 @@ async def get_new_page(browser: zd.Browser) -> zd.Tab:
             ):
                 logger.debug(f"Request already processed or invalid interception ID: {request_url}")
             elif isinstance(e, websockets.ConnectionClosedError):
-                logger.debug(f"Page closed while blocking request: {request_url}")
+                logger.debug(f"Page closed while {action}: {request_url}")
             else:
                 raise
 
-    page.add_handler(zd.cdp.fetch.RequestPaused, handle_request)  # type: ignore[reportUnknownMemberType]
+
+async def get_new_page(browser: zd.Browser) -> zd.Tab:
+    browser = await browser_manager.wait_for_recycle(browser)
+    page = await browser.get("about:blank", new_tab=True)
+
+    blocking = settings.SHOULD_BLOCK_UNWANTED_RESOURCES
+    filter_patterns: list[zd.cdp.fetch.RequestPattern] = []
+    if blocking:
+        blocked_urls, python_patterns = await get_blocklist_patterns()
+        filter_patterns = _request_patterns(python_patterns)
+        if blocked_urls:
+            # Small blocklists are blocked by the browser itself
+            await page.send(zd.cdp.network.enable())
+            await page.send(zd.cdp.network.set_blocked_ur_ls(urls=blocked_urls))
 
     id = cast(str, browser.id)  # type: ignore[attr-defined]
     proxy = await setup_proxy(id, request_info.get())
-    proxy_username = None
-    proxy_password = None
-    if proxy:
-        proxy_username = proxy["username"]
-        proxy_password = proxy["password"]
-        if proxy_username or proxy_password:
-            logger.debug("Setting up proxy authentication...")
-            await install_proxy_handler(proxy_username or "", proxy_password or "", page)
+    credentials: tuple[str, str] | None = None
+    if proxy and (proxy.get("username") or proxy.get("password")):
+        logger.debug("Setting up proxy authentication...")
+        credentials = (proxy.get("username") or "", proxy.get("password") or "")
+
+    asset_cache = await asyncio.to_thread(get_asset_cache)
+    interceptor = TabInterceptor(page, credentials, filter_patterns, blocking, asset_cache)
+    await interceptor.start()
+    page.interceptor = interceptor  # type: ignore[attr-defined]
 
     return page
 
@@ -415,6 +729,10 @@ async def safe_close_page(page: zd.Tab) -> None:
     orphaned tasks waiting for CDP responses that will never arrive. This function
     disables the fetch domain first to clean up handlers before closing.
     """
+    interceptor: TabInterceptor | None = getattr(page, "interceptor", None)
+    if interceptor is not None:
+        logger.debug(f"Tab blocking stats: {interceptor.stats.summary()}")
+
     try:
         # Disable fetch domain to cancel pending request handlers
         await page.send(zd.cdp.fetch.disable())
@@ -666,8 +984,57 @@ async def page_query_selector(page: zd.Tab, selector: str, timeout: float = 0) -
 
 
 async def distill(
-    hostname: str | None, page: zd.Tab, patterns: list[Pattern], reload_on_error: bool = True
+    hostname: str | None,
+    page: zd.Tab,
+    patterns: list[Pattern],
+    reload_on_error: bool = True,
+    previous: str | None = None,
 ) -> Match | None:
+    """The best matching pattern for the page, probing the likely successors of `previous` first.
+
+    See predicted_patterns.
+    """
+    started = time.perf_counter()
+    predicted = predicted_patterns(hostname, previous, patterns)
+    result: list[Match] = []
+    if predicted:
+        result = await _distill_matches(hostname, page, predicted)
+        flow_predictions_total.inc(result="hit" if result else "miss")
+    if result:
+        distill_seconds.observe(time.perf_counter() - started, mode="predicted")
+    else:
+        probed = {id(item) for item in predicted}
+        rest = [item for item in patterns if id(item) not in probed]
+        result = await _distill_matches(hostname, page, rest)
+        distill_seconds.observe(time.perf_counter() - started, mode="full")
+
+    result = sorted(result, key=lambda x: x.priority)
+
+    if len(result) == 0:
+        logger.debug("No matches found")
+        return None
+    else:
+        logger.debug(f"Number of matches: {len(result)}")
+        for item in result:
+            logger.debug(f" - {item.name} with priority {item.priority}")
+        match = result[0]
+        logger.info(f"✓ Best match: {match.name}")
+
+        if reload_on_error and any(pattern in match.name for pattern in NETWORK_ERROR_PATTERNS):
+            logger.info(f"Error pattern detected: {match.name}")
+            try:
+                await page.send(zd.cdp.page.reload())
+                await wait_for_ready_state(page)
+            except Exception as e:
+                logger.warning(f"Failed to reload page: {e}")
+            logger.info("Retrying distillation after error...")
+            return await distill(hostname, page, patterns, reload_on_error=False, previous=previous)
+        return match
+
+
+async def _distill_matches(
+    hostname: str | None, page: zd.Tab, patterns: list[Pattern]
+) -> list[Match]:
     result: list[Match] = []
 
     for item in patterns:
@@ -745,28 +1112,7 @@ async def distill(
                 )
             )
 
-    result = sorted(result, key=lambda x: x.priority)
-
-    if len(result) == 0:
-        logger.debug("No matches found")
-        return None
-    else:
-        logger.debug(f"Number of matches: {len(result)}")
-        for item in result:
-            logger.debug(f" - {item.name} with priority {item.priority}")
-        match = result[0]
-        logger.info(f"✓ Best match: {match.name}")
-
-        if reload_on_error and any(pattern in match.name for pattern in NETWORK_ERROR_PATTERNS):
-            logger.info(f"Error pattern detected: {match.name}")
-            try:
-                await page.send(zd.cdp.page.reload())
-                await wait_for_ready_state(page)
-            except Exception as e:
-                logger.warning(f"Failed to reload page: {e}")
-            logger.info("Retrying distillation after error...")
-            return await distill(hostname, page, patterns, reload_on_error=False)
-        return match
+    return result
 
 
 async def autoclick(page: zd.Tab, distilled: str, expr: str):
@@ -791,9 +1137,13 @@ async def run_distillation_loop(
     interactive: bool = True,
     close_page: bool = True,
     page: zd.Tab | None = None,
+    handoff: bool = False,
 ) -> tuple[bool, str, ConversionResult | None]:
     """Run the distillation loop with zendriver.
 
+    With `handoff`, the loop stops as soon as the page asks for input and leaves it open, so the
+    caller can hand it over to an interactive dpage without loading it again.
+
     Returns:
         terminated: bool indicating successful termination
         distilled: the raw distilled HTML
@@ -807,64 +1157,81 @@ async def run_distillation_loop(
 
     if page is None:
         page = await get_new_page(browser)
-    logger.info(f"Navigating to {location}")
     try:
-        await zen_navigate_with_retry(page, location)
-    except Exception as error:
-        # Error already logged by retry wrapper, just report and re-raise
-        await zen_report_distill_error(
-            error=error,
-            page=page,
-            profile_id=browser.id,  # type: ignore[attr-defined]
-            location=location,
-            hostname=hostname,
-            iteration=0,
-        )
-        raise ValueError(f"Failed to navigate to {location}: {error}")
-
-    TICK = 1  # seconds
-    max = timeout // TICK
-
-    current = Match(name="", priority=-1, distilled="")
+        logger.info(f"Navigating to {location}")
+        try:
+            await zen_navigate_with_retry(page, location)
+        except Exception as error:
+            # Error already logged by retry wrapper, just report and re-raise
+            await zen_report_distill_error(
+                error=error,
+                page=page,
+                profile_id=browser.id,  # type: ignore[attr-defined]
+                location=location,
+                hostname=hostname,
+                iteration=0,
+            )
+            raise ValueError(f"Failed to navigate to {location}: {error}")
+
+        TICK = 1  # seconds
+        max = math.ceil(latency_budgets.timeout("distillation", hostname, timeout) / TICK)
+
+        current = Match(name="", priority=-1, distilled="")
+        started = time.monotonic()
+        seen: set[str] = set()
+
+        for iteration in range(max):
+            logger.info("")
+            logger.info(f"Iteration {iteration + 1} of {max}")
+            await asyncio.sleep(TICK)
+
+            match = await distill(hostname, page, patterns, previous=current.name or None)
+            if match:
+                if match.name not in seen:
+                    seen.add(match.name)
+                    latency_budgets.record("pattern", match.name, time.monotonic() - started)
+                if match.distilled == current.distilled:
+                    logger.debug(f"Still the same: {match.name}")
+                else:
+                    distilled = match.distilled
+                    flow_graph.record(hostname, current.name, match.name)
+                    current = match
 
-    for iteration in range(max):
-        logger.info("")
-        logger.info(f"Iteration {iteration + 1} of {max}")
-        await asyncio.sleep(TICK)
+                    if await terminate(distilled):
+                        latency_budgets.record("distillation", hostname, time.monotonic() - started)
+                        converted = await convert(distilled)
+                        if close_page:
+                            await safe_close_page(page)
+                        return (True, distilled, converted)
 
-        match = await distill(hostname, page, patterns)
-        if match:
-            if match.distilled == current.distilled:
-                logger.debug(f"Still the same: {match.name}")
-            else:
-                distilled = match.distilled
-                current = match
+                    if handoff and asks_for_input(distilled):
+                        logger.info(f"{match.name} asks for input, handing the page over")
+                        return (False, distilled, None)
 
-                if await terminate(distilled):
-                    converted = await convert(distilled)
-                    if close_page:
-                        await safe_close_page(page)
-                    return (True, distilled, converted)
+                    if interactive:
+                        await autoclick(page, distilled, "[gg-autoclick]")
+                        await autoclick(page, distilled, "button[type=submit]")
 
-                if interactive:
-                    await autoclick(page, distilled, "[gg-autoclick]")
-                    await autoclick(page, distilled, "button[type=submit]")
+                    current.distilled = distilled
 
-                current.distilled = distilled
+            else:
+                logger.debug(f"No matched pattern found")
 
-        else:
-            logger.debug(f"No matched pattern found")
-
-    await zen_report_distill_error(
-        error=ValueError("No matched pattern found"),
-        page=page,
-        profile_id=browser.id,  # type: ignore[attr-defined]
-        location=location,
-        hostname=hostname,
-        iteration=max,
-    )
-    await safe_close_page(page)
-    return (False, current.distilled, None)
+        latency_budgets.record_timeout("distillation", hostname)
+        await zen_report_distill_error(
+            error=ValueError("No matched pattern found"),
+            page=page,
+            profile_id=browser.id,  # type: ignore[attr-defined]
+            location=location,
+            hostname=hostname,
+            iteration=max,
+        )
+        await safe_close_page(page)
+        return (False, current.distilled, None)
+    except asyncio.CancelledError:
+        # The request is gone: release the tab at once
+        await cleanup_after_cancel(safe_close_page(page))
+        raise
 
 
 async def short_lived_mcp_tool(
@@ -877,7 +1244,11 @@ async def short_lived_mcp_tool(
     patterns = load_distillation_patterns(path)
 
     browser = await init_zendriver_browser()
-    terminated, distilled, converted = await run_distillation_loop(location, patterns, browser)
+    try:
+        terminated, distilled, converted = await run_distillation_loop(location, patterns, browser)
+    except asyncio.CancelledError:
+        await cleanup_after_cancel(terminate_zendriver_browser(browser))
+        raise
     await terminate_zendriver_browser(browser)
 
     result: dict[str, Any] = {result_key: converted if converted else distilled}
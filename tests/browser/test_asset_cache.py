@@ -0,0 +1,200 @@
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Generator, cast
+
+import pytest
+from patchright.async_api import Route
+
+from getgather.browser import resource_blocker
+from getgather.browser.asset_cache import AssetCache, cache_lifetime
+
+_ROUTES: dict[str, dict[str, str]] = {
+    "/app.js": {"Cache-Control": "public, max-age=3600", "Content-Type": "text/javascript"},
+    "/aged.js": {"Cache-Control": "max-age=60", "Age": "60"},
+    "/private.js": {"Cache-Control": "private, max-age=3600"},
+    "/no-store.css": {"Cache-Control": "no-store"},
+    "/tracked.js": {"Cache-Control": "max-age=3600", "Set-Cookie": "id=1"},
+    "/per-origin.js": {"Cache-Control": "max-age=3600", "Vary": "Origin"},
+    "/heuristic.css": {},
+}
+
+
+class _OriginHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = f"/* {self.path} */".encode()
+        self.send_response(200)
+        for name, value in _ROUTES[self.path].items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def origin() -> Generator[str, None, None]:
+    server = HTTPServer(("127.0.0.1", 0), _OriginHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def _fetch_into(cache: AssetCache, url: str) -> bool:
+    with urllib.request.urlopen(url) as response:
+        headers = dict(response.headers.items())
+        lifetime = cache_lifetime("GET", response.status, {}, headers)
+        if lifetime is None:
+            return False
+        cache.put(url, response.status, headers, response.read(), lifetime)
+        return True
+
+
+def test_only_shareable_responses_are_cached(origin: str, tmp_path: Path):
+    """Test that only shareable responses with a freshness lifetime are stored."""
+    cache = AssetCache(tmp_path, max_bytes=1 << 20)
+
+    stored = {path for path in _ROUTES if _fetch_into(cache, origin + path)}
+
+    assert stored == {"/app.js"}
+    asset = cache.get(origin + "/app.js")
+    assert asset is not None
+    assert asset.body == b"/* /app.js */"
+    assert asset.headers["Content-Type"] == "text/javascript"
+    assert "Content-Length" not in asset.headers
+    assert cache.get(origin + "/private.js") is None
+
+
+class _FakeResponse:
+    status = 200
+    headers = {
+        "cache-control": "max-age=3600",
+        "content-encoding": "gzip",
+        "content-type": "text/javascript",
+    }
+
+    async def body(self) -> bytes:
+        return b"app()"
+
+
+class _FakeContext:
+    def __init__(self, cookies: list[dict[str, str]]):
+        self._cookies = cookies
+
+    async def cookies(self, url: str) -> list[dict[str, str]]:
+        return self._cookies
+
+
+class _FakeRequest:
+    method = "GET"
+    resource_type = "script"
+    headers: dict[str, str] = {}
+
+    def __init__(self, url: str, cookies: list[dict[str, str]]):
+        self.url = url
+        self.frame = SimpleNamespace(page=SimpleNamespace(context=_FakeContext(cookies)))
+
+
+class _FakeRoute:
+    def __init__(self, url: str, cookies: list[dict[str, str]] | None = None, fails: bool = False):
+        self.request = _FakeRequest(url, cookies or [])
+        self.fails = fails
+        self.fetches: list[str] = []
+        self.fulfilled: list[dict[str, Any]] = []
+        self.fell_back = False
+
+    async def fetch(self) -> _FakeResponse:
+        if self.fails:
+            raise OSError("connection reset")
+        self.fetches.append(self.request.url)
+        return _FakeResponse()
+
+    async def fulfill(self, **kwargs: Any) -> None:
+        self.fulfilled.append(kwargs)
+
+    async def fallback(self) -> None:
+        self.fell_back = True
+
+
+@pytest.mark.asyncio
+async def test_patchright_routes_use_the_cache(tmp_path: Path):
+    """Test that patchright pages fetch and store cacheable assets, then serve them from disk."""
+    cache = AssetCache(tmp_path, max_bytes=1 << 20)
+    url = "https://shop.com/app.js"
+
+    routes = [_FakeRoute(url) for _ in range(2)]
+    for route in routes:
+        await resource_blocker._handle_asset_route(cast(Route, route), cache)  # type: ignore[reportPrivateUsage]
+
+    assert [route.fetches for route in routes] == [[url], []]
+    assert [route.fulfilled[0]["body"] for route in routes] == [b"app()", b"app()"]
+    assert "content-encoding" not in routes[0].fulfilled[0]["headers"]
+    assert routes[1].fulfilled[0]["headers"]["content-type"] == "text/javascript"
+
+
+@pytest.mark.asyncio
+async def test_patchright_routes_skip_the_cache_for_cookies_and_failures(tmp_path: Path):
+    """Test that requests sent with cookies are not stored, and failed fetches fall back."""
+    cache = AssetCache(tmp_path, max_bytes=1 << 20)
+    url = "https://shop.com/app.js"
+
+    route = _FakeRoute(url, cookies=[{"name": "session", "value": "1"}])
+    await resource_blocker._handle_asset_route(cast(Route, route), cache)  # type: ignore[reportPrivateUsage]
+    assert route.fulfilled and len(cache) == 0
+
+    route = _FakeRoute(url, fails=True)
+    await resource_blocker._handle_asset_route(cast(Route, route), cache)  # type: ignore[reportPrivateUsage]
+    assert route.fell_back and not route.fulfilled
+
+
+def test_cache_lifetime():
+    """Test freshness from max-age, Expires and Age, and rejection of uncacheable requests."""
+    expires = {
+        "Date": "Mon, 06 Jan 2025 10:00:00 GMT",
+        "Expires": "Mon, 06 Jan 2025 11:00:00 GMT",
+    }
+    public = {"Cache-Control": "max-age=600"}
+
+    assert cache_lifetime("GET", 200, {}, {"cache-control": "s-maxage=60, max-age=10"}) == 60
+    assert cache_lifetime("GET", 200, {}, expires) == 3600
+    assert cache_lifetime("GET", 200, {}, {**public, "Age": "100"}) == 500
+    assert cache_lifetime("GET", 200, {"Authorization": "Bearer x"}, public) is None
+    assert cache_lifetime("GET", 200, {"Cookie": "session=1"}, public) is None
+    assert cache_lifetime("POST", 200, {}, public) is None
+    assert cache_lifetime("GET", 206, {}, public) is None
+    assert cache_lifetime("GET", 200, {}, {**public, "Vary": "Accept-Encoding"}) == 600
+
+
+def test_lru_eviction_and_reload(tmp_path: Path):
+    """Test that the least recently used assets are evicted and the index survives restarts."""
+    cache = AssetCache(tmp_path, max_bytes=600)
+    for name in ("a", "b", "c"):
+        cache.put(f"https://cdn.test/{name}.js", 200, {}, b"x" * 100, 60)
+    assert len(cache) == 3
+    assert cache.get("https://cdn.test/a.js") is not None
+
+    cache.put("https://cdn.test/d.js", 200, {}, b"x" * 100, 60)
+
+    assert cache.size <= 600
+    assert cache.get("https://cdn.test/b.js") is None
+    assert cache.get("https://cdn.test/a.js") is not None
+    reloaded = AssetCache(tmp_path, max_bytes=600)
+    assert len(reloaded) == len(cache)
+    assert reloaded.get("https://cdn.test/d.js") is not None
+
+
+def test_expired_assets_are_dropped(tmp_path: Path):
+    """Test that stale assets are not served and are removed from disk."""
+    cache = AssetCache(tmp_path, max_bytes=1 << 20)
+    cache.put("https://cdn.test/app.js", 200, {}, b"app", 0.05)
+
+    time.sleep(0.1)
+
+    assert cache.get("https://cdn.test/app.js") is None
+    assert len(cache) == 0
+    assert not list(tmp_path.glob("*.asset"))
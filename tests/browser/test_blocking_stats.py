@@ -0,0 +1,85 @@
+import pytest
+
+from getgather.browser import blocking_stats
+from getgather.browser.blocking_stats import (
+    BlockingStats,
+    ResponseSizes,
+    new_tab_stats,
+    tool_call_stats,
+)
+
+
+def test_response_sizes_estimate_by_type():
+    """Test that blocked bytes are estimated from allowed responses of the same type."""
+    sizes = ResponseSizes()
+    sizes.observe("Image", {"Content-Length": "1000"})
+    sizes.observe("image", {"content-length": "3000"})
+    sizes.observe("Image", {"content-length": "chunked"})
+    sizes.observe("Script", {})
+
+    assert sizes.estimate("Image") == 2000
+    assert sizes.estimate("Script") == 0
+    assert sizes.estimate("Font") == 0
+
+
+def test_tab_stats_add_to_tool_call(monkeypatch: pytest.MonkeyPatch):
+    """Test that a tab's blocked requests count for the tab, its tool call and the metrics."""
+    sizes = ResponseSizes()
+    sizes.observe("Image", {"content-length": "500"})
+    monkeypatch.setattr(blocking_stats, "response_sizes", sizes)
+    blocked_before = blocking_stats.blocked_total.value(reason="type", resource_type="image")
+    domain_before = blocking_stats.blocked_by_domain_total.value(domain="doubleclick.net")
+
+    call = BlockingStats()
+    token = tool_call_stats.set(call)
+    try:
+        tab = new_tab_stats()
+    finally:
+        tool_call_stats.reset(token)
+    other_tab = new_tab_stats()
+
+    tab.record_intercepted(0.002)
+    tab.record_blocked("https://img.shop.com/a.png", "Image", "type")
+    tab.record_blocked("https://ad.doubleclick.net/x", "Script", "domain")
+    other_tab.record_blocked("https://ad.doubleclick.net/y", "Script", "domain")
+
+    assert tab.blocked == 2
+    assert call.summary() == {
+        "intercepted": 1,
+        "blocked": 2,
+        "blocked_by_reason": {"type": 1, "domain": 1},
+        "blocked_by_type": {"image": 1, "script": 1},
+        "top_blocked_domains": {"shop.com": 1, "doubleclick.net": 1},
+        "callback_ms": 2.0,
+        "bytes_saved_estimate": 500,
+    }
+    blocked_after = blocking_stats.blocked_total.value(reason="type", resource_type="image")
+    assert blocked_after == blocked_before + 1
+    domain_after = blocking_stats.blocked_by_domain_total.value(domain="doubleclick.net")
+    assert domain_after == domain_before + 2
+
+
+def test_domain_labels_are_capped(monkeypatch: pytest.MonkeyPatch):
+    """Test that blocked domains beyond the label cap count as 'other' in the metrics only."""
+    monkeypatch.setattr(blocking_stats, "MAX_DOMAIN_LABELS", 1)
+    monkeypatch.setattr(blocking_stats, "_domain_labels", set[str]())
+    other_before = blocking_stats.blocked_by_domain_total.value(domain="other")
+
+    tab = BlockingStats()
+    tab.record_blocked("https://ad.doubleclick.net/x", "Script", "domain")
+    tab.record_blocked("https://ib.adnxs.com/x", "Script", "domain")
+    tab.record_blocked("https://ad.doubleclick.net/y", "Script", "domain")
+
+    assert blocking_stats.blocked_by_domain_total.value(domain="other") == other_before + 1
+    assert tab.blocked_by_domain == {"doubleclick.net": 2, "adnxs.com": 1}
+
+
+def test_response_sizes_are_sampled():
+    """Test that responses are only observed until there are enough samples."""
+    sizes = ResponseSizes()
+    for _ in range(blocking_stats.RESPONSE_SIZE_SAMPLES - 1):
+        sizes.observe("Script", {"content-length": "100"})
+    assert sizes.needs_samples()
+
+    sizes.observe("Script", {"content-length": "100"})
+    assert not sizes.needs_samples()
@@ -0,0 +1,74 @@
+import pytest
+
+from getgather.api.types import RequestInfo
+from getgather.browser.egress import EgressValidator, egress_key
+
+
+class _Check:
+    def __init__(self, fail: bool = False):
+        self.calls = 0
+        self.fail = fail
+
+    async def __call__(self) -> str | None:
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("Navigation failed: net::ERR_TUNNEL_CONNECTION_FAILED")
+        return "203.0.113.7"
+
+
+def test_egress_key_uses_proxy_type_and_location(monkeypatch: pytest.MonkeyPatch):
+    """Test that routes are keyed by proxy type and location."""
+    monkeypatch.setattr("getgather.config.settings.DEFAULT_PROXY_TYPE", "proxy-1")
+
+    assert egress_key(None) == ("proxy-1", "any")
+    info = RequestInfo(country="US", state="CA", city="San Francisco", proxy_type="proxy-2")
+    assert egress_key(info) == ("proxy-2", "us/ca/san francisco")
+
+
+@pytest.mark.asyncio
+async def test_fresh_result_skips_check(monkeypatch: pytest.MonkeyPatch):
+    """Test that a recently validated route is not checked again."""
+    monkeypatch.setattr("getgather.config.settings.EGRESS_CHECK_TTL", 600)
+    validator = EgressValidator()
+    check = _Check()
+
+    await validator.validate(("proxy-1", "any"), check)
+    await validator.validate(("proxy-1", "any"), check)
+    await validator.validate(("proxy-2", "any"), check)
+
+    assert check.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_stale_result_is_trusted_once(monkeypatch: pytest.MonkeyPatch):
+    """Test that a stale route gets one lazy pass until a navigation confirms it."""
+    monkeypatch.setattr("getgather.config.settings.EGRESS_CHECK_TTL", 600)
+    validator = EgressValidator()
+    check = _Check()
+    key = ("proxy-1", "any")
+    await validator.validate(key, check)
+
+    monkeypatch.setattr("getgather.config.settings.EGRESS_CHECK_TTL", 1e-9)
+    await validator.validate(key, check)
+    assert check.calls == 1
+    await validator.validate(key, check)
+    assert check.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_failures_invalidate_route(monkeypatch: pytest.MonkeyPatch):
+    """Test that failed checks and proxy errors on real navigations invalidate the route."""
+    monkeypatch.setattr("getgather.config.settings.EGRESS_CHECK_TTL", 600)
+    validator = EgressValidator()
+    key = ("proxy-1", "any")
+
+    with pytest.raises(ConnectionError):
+        await validator.validate(key, _Check(fail=True))
+    assert not validator.is_healthy(key)
+
+    validator.record_navigation(key)
+    assert validator.is_healthy(key)
+    validator.record_navigation(key, ValueError("net::ERR_NAME_NOT_RESOLVED"))
+    assert validator.is_healthy(key)
+    validator.record_navigation(key, ConnectionError("net::ERR_PROXY_CONNECTION_FAILED"))
+    assert not validator.is_healthy(key)
@@ -0,0 +1,71 @@
+from getgather.browser.filter_rules import FilterEngine, parse_rule
+
+SHOP = "https://www.shop.com/cart"
+
+
+def test_domain_anchor_and_separator():
+    """Test that ||domain^ matches the domain and its subdomains only."""
+    engine = FilterEngine.from_lines(["||tracker.io^"])
+
+    assert engine.match("https://tracker.io/x.js", "script", SHOP)
+    assert engine.match("https://cdn.tracker.io", "xhr", SHOP)
+    assert not engine.match("https://nottracker.io/", "script", SHOP)
+    assert not engine.match("https://tracker.iox.com/", "script", SHOP)
+    assert not engine.match("https://shop.com/?u=tracker.io", "script", SHOP)
+
+
+def test_path_patterns_and_resource_types():
+    """Test path patterns restricted to resource types, including negated types."""
+    engine = FilterEngine.from_lines(["/ads/banner*$script", "/beacon/*$~image"])
+
+    assert engine.match("https://www.shop.com/ads/banner-1.js", "script", SHOP)
+    assert not engine.match("https://www.shop.com/ads/banner-1.js", "xhr", SHOP)
+    assert engine.match("https://www.shop.com/beacon/1", "fetch", SHOP)
+    assert not engine.match("https://www.shop.com/beacon/1", "image", SHOP)
+
+
+def test_party_and_domain_options():
+    """Test third-party and domain= options, which depend on the requesting page."""
+    engine = FilterEngine.from_lines([
+        "||widgets.example^$script,third-party",
+        "/track.js$domain=shop.com|~help.shop.com",
+    ])
+
+    assert engine.match("https://widgets.example/w.js", "Script", SHOP)
+    assert not engine.match("https://widgets.example/w.js", "Script", "https://widgets.example/")
+    assert not engine.match("https://widgets.example/w.js", "Script", None)
+    assert engine.match("https://cdn.net/track.js", "script", SHOP)
+    assert not engine.match("https://cdn.net/track.js", "script", "https://help.shop.com/")
+    assert not engine.match("https://cdn.net/track.js", "script", "https://other.com/")
+
+
+def test_exceptions_and_documents():
+    """Test that @@ rules override blocks and that documents are never blocked."""
+    engine = FilterEngine.from_lines(["||metrics.shop.com^", "@@||metrics.shop.com/consent^"])
+
+    assert engine.match("https://metrics.shop.com/v1/event", "xhr", SHOP)
+    assert not engine.match("https://metrics.shop.com/consent?x=1", "xhr", SHOP)
+    assert not engine.match("https://metrics.shop.com/v1/event", "Document", SHOP)
+
+
+def test_unsupported_rules_are_skipped():
+    """Test that comments, cosmetic, regex and unknown-option rules are ignored."""
+    for line in ["! comment", "[Adblock Plus 2.0]", "shop.com##.ad", "/ad[0-9]/", "||x.com^$csp=a"]:
+        assert parse_rule(line) is None
+    assert len(FilterEngine.from_lines(["! comment", "||x.com^"])) == 1
+
+
+def test_request_patterns_only_cover_candidates():
+    """Test the browser-side patterns and the token chosen for the index."""
+    rule = parse_rule("||tracker.io^$script,xhr")
+    assert rule is not None
+    assert rule.token == "tracker"
+    assert rule.glob == "*://*tracker.io*"
+
+    engine = FilterEngine.from_lines(["||tracker.io^$script,xhr", "@@||tracker.io/ok", "/a?b="])
+    assert engine.request_patterns() == [
+        ("*://*tracker.io*", "Script"),
+        ("*://*tracker.io*", "XHR"),
+        ("*://*tracker.io*", "Fetch"),
+        ("*/a\\?b=*", None),
+    ]
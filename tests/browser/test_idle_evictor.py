@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from getgather.browser.idle_evictor import IdleEvictor, evictions_total
+
+
+@pytest.mark.asyncio
+async def test_evicts_at_deadline():
+    """Test that an idle entry is evicted once its deadline passes."""
+    evictor = IdleEvictor(max_idle=0.05)
+    evicted: list[str] = []
+
+    async def evict():
+        evicted.append("a")
+
+    before = evictions_total.value(kind="test")
+    evictor.touch("a", "test", evict)
+    evictor.start()
+    try:
+        await asyncio.sleep(0.02)
+        assert evicted == []
+        await asyncio.sleep(0.1)
+        assert evicted == ["a"]
+        assert "a" not in evictor
+        assert evictions_total.value(kind="test") == before + 1
+    finally:
+        await evictor.stop()
+
+
+@pytest.mark.asyncio
+async def test_touch_pushes_deadline_back():
+    """Test that activity postpones eviction and superseded deadlines are ignored."""
+    evictor = IdleEvictor(max_idle=0.08)
+    evicted: list[str] = []
+
+    async def evict():
+        evicted.append("a")
+
+    evictor.touch("a", "test", evict)
+    evictor.start()
+    try:
+        for _ in range(4):
+            await asyncio.sleep(0.04)
+            evictor.touch("a", "test", evict)
+        assert evicted == []
+        await asyncio.sleep(0.15)
+        assert evicted == ["a"]
+    finally:
+        await evictor.stop()
+
+
+@pytest.mark.asyncio
+async def test_discard_cancels_eviction():
+    """Test that discarded entries are never evicted."""
+    evictor = IdleEvictor(max_idle=0)
+    evicted: list[str] = []
+
+    async def evict():
+        evicted.append("a")
+
+    evictor.touch("a", "test", evict)
+    evictor.discard("a")
+    assert await evictor.evict_due() == 0
+    assert evicted == []
+    assert len(evictor) == 0
+
+
+@pytest.mark.asyncio
+async def test_eviction_errors_do_not_stop_other_evictions():
+    """Test that a failing callback does not prevent evicting the remaining entries."""
+    evictor = IdleEvictor(max_idle=0)
+    evicted: list[str] = []
+
+    async def fail():
+        raise RuntimeError("boom")
+
+    async def evict():
+        evicted.append("b")
+
+    evictor.touch("a", "test", fail)
+    evictor.touch("b", "test", evict)
+    assert await evictor.evict_due() == 2
+    assert evicted == ["b"]
@@ -0,0 +1,68 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from getgather.browser.memory_governor import (
+    PROC_DIR,
+    BrowserUsage,
+    find_browser_pid,
+    process_tree_rss,
+    sample_usage,
+)
+
+pytestmark = pytest.mark.skipif(not PROC_DIR.exists(), reason="requires /proc")
+
+
+def test_process_tree_rss_includes_children():
+    """Test that the RSS of a process tree includes its children."""
+    own = process_tree_rss(os.getpid(), children={})
+    assert own > 0
+
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        time.sleep(0.2)
+        assert process_tree_rss(os.getpid()) > own
+    finally:
+        child.kill()
+        child.wait()
+
+
+def test_find_browser_pid_matches_user_data_dir(tmp_path: Path):
+    """Test that the main browser process is found by its user data directory."""
+    args = ["-c", "import time; time.sleep(30)", f"--user-data-dir={tmp_path}"]
+    main = subprocess.Popen([sys.executable, *args])
+    helper = subprocess.Popen([sys.executable, *args, "--type=renderer"])
+    try:
+        time.sleep(0.2)
+        assert find_browser_pid(tmp_path) == main.pid
+        assert find_browser_pid(tmp_path / "other") is None
+    finally:
+        for process in (main, helper):
+            process.kill()
+            process.wait()
+
+
+def test_sample_usage_without_browser_process(tmp_path: Path):
+    """Test sampling a browser whose process cannot be found."""
+    usage = sample_usage("abc123", None, tmp_path, tab_count=3)
+    assert usage.pid is None
+    assert usage.rss_bytes == 0
+    assert usage.tab_count == 3
+
+
+def test_exceeds_limits(monkeypatch: pytest.MonkeyPatch):
+    """Test the memory and tab thresholds, where 0 disables a limit."""
+    monkeypatch.setattr("getgather.config.settings.BROWSER_MAX_RSS_MB", 100)
+    monkeypatch.setattr("getgather.config.settings.BROWSER_MAX_TABS", 10)
+
+    assert not BrowserUsage("a", 1, 50 * 1024 * 1024, 5).exceeds_limits()
+    assert BrowserUsage("a", 1, 200 * 1024 * 1024, 5).exceeds_limits()
+    assert BrowserUsage("a", 1, 50 * 1024 * 1024, 11).exceeds_limits()
+
+    monkeypatch.setattr("getgather.config.settings.BROWSER_MAX_RSS_MB", 0)
+    monkeypatch.setattr("getgather.config.settings.BROWSER_MAX_TABS", 0)
+    assert not BrowserUsage("a", 1, 200 * 1024 * 1024, 50).exceeds_limits()
@@ -0,0 +1,60 @@
+from pathlib import Path
+
+import pytest
+
+from getgather.browser.profile_cleanup import ProfileCleaner
+from getgather.config import settings
+
+
+def test_cleanup_moves_caches_to_trash_and_deletes_them(temp_project_dir: Path):
+    """Test that cache directories leave the profile immediately and are deleted later."""
+    user_data_dir = settings.profiles_dir / "abc123"
+    cache = user_data_dir / "Default" / "Cache"
+    cache.mkdir(parents=True)
+    (cache / "data_0").write_bytes(b"x" * 1024)
+    cookies = user_data_dir / "Default" / "Cookies"
+    cookies.write_text("keep me")
+
+    cleaner = ProfileCleaner()
+    cleaner.cleanup(user_data_dir)
+
+    assert not cache.exists()
+    assert cookies.read_text() == "keep me"
+
+    cleaner.join()
+    assert list(settings.trash_dir.iterdir()) == []
+
+
+def test_purge_trash_removes_leftovers(temp_project_dir: Path):
+    """Test that leftovers from a previous run are deleted on startup."""
+    leftover = settings.trash_dir / "old-cache"
+    leftover.mkdir()
+    (leftover / "data_1").write_text("stale")
+    (settings.trash_dir / "stray-file").write_text("stale")
+
+    cleaner = ProfileCleaner()
+    cleaner.purge_trash()
+    cleaner.join()
+
+    assert list(settings.trash_dir.iterdir()) == []
+
+
+def test_cleanup_deletes_in_place_when_the_move_fails(
+    temp_project_dir: Path, monkeypatch: pytest.MonkeyPatch
+):
+    """Test that a cache that cannot be moved to the trash is still deleted."""
+    user_data_dir = settings.profiles_dir / "abc123"
+    cache = user_data_dir / "Default" / "Cache"
+    cache.mkdir(parents=True)
+    (cache / "data_0").write_bytes(b"x" * 1024)
+
+    def rename(self: Path, target: Path) -> Path:
+        raise OSError(18, "Invalid cross-device link")
+
+    monkeypatch.setattr(Path, "rename", rename)
+    cleaner = ProfileCleaner()
+    cleaner.cleanup(user_data_dir)
+    cleaner.join()
+
+    assert not cache.exists()
+    assert (user_data_dir / "Default").exists()
@@ -0,0 +1,69 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from getgather.browser import profile_template
+from getgather.browser.profile_template import clone_profile_template
+from getgather.config import settings
+
+
+@pytest.fixture
+def fake_chrome(monkeypatch: pytest.MonkeyPatch) -> list[Path]:
+    """Initialize profiles the way Chrome does, without launching it."""
+    launches: list[Path] = []
+
+    async def initialize_profile(user_data_dir: Path) -> None:
+        launches.append(user_data_dir)
+        (user_data_dir / "Default" / "Cache").mkdir(parents=True)
+        (user_data_dir / "Default" / "Preferences").write_text(
+            json.dumps({"profile": {"exit_type": "Crashed"}})
+        )
+        (user_data_dir / "Local State").write_text("{}")
+        (user_data_dir / "SingletonLock").write_text("host-1234")
+
+    monkeypatch.setattr(profile_template, "_initialize_profile", initialize_profile)
+    return launches
+
+
+@pytest.mark.asyncio
+async def test_clone_seeds_new_profile(temp_project_dir: Path, fake_chrome: list[Path]):
+    """Test that new profile directories are seeded from a template built by Chrome once."""
+    user_data_dir = settings.profiles_dir / "abc123"
+
+    assert await clone_profile_template(user_data_dir)
+    assert await clone_profile_template(settings.profiles_dir / "def456")
+
+    assert len(fake_chrome) == 1
+    assert (user_data_dir / "First Run").exists()
+    assert (user_data_dir / "Local State").exists()
+    preferences = json.loads((user_data_dir / "Default" / "Preferences").read_text())
+    assert preferences["profile"]["exit_type"] == "Normal"
+    assert not (user_data_dir / "Default" / "Cache").exists()
+    assert not (user_data_dir / "SingletonLock").exists()
+    assert not (user_data_dir / ".template-version").exists()
+
+
+@pytest.mark.asyncio
+async def test_clone_keeps_existing_profile(temp_project_dir: Path, fake_chrome: list[Path]):
+    """Test that an existing profile is not overwritten by the template."""
+    user_data_dir = settings.profiles_dir / "abc123"
+    (user_data_dir / "Default").mkdir(parents=True)
+    (user_data_dir / "Default" / "Preferences").write_text("{}")
+
+    assert not await clone_profile_template(user_data_dir)
+    assert (user_data_dir / "Default" / "Preferences").read_text() == "{}"
+    assert not (user_data_dir / "First Run").exists()
+
+
+@pytest.mark.asyncio
+async def test_clone_disabled(
+    temp_project_dir: Path, fake_chrome: list[Path], monkeypatch: pytest.MonkeyPatch
+):
+    """Test that the template can be turned off."""
+    monkeypatch.setattr("getgather.config.settings.USE_PROFILE_TEMPLATE", False)
+    user_data_dir = settings.profiles_dir / "abc123"
+
+    assert not await clone_profile_template(user_data_dir)
+    assert not user_data_dir.exists()
+    assert fake_chrome == []
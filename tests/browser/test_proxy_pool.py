@@ -0,0 +1,132 @@
+import socket
+import socketserver
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Generator
+
+import pytest
+
+from getgather.browser.proxy_pool import ProxyPool, proxy_candidates
+from getgather.browser.proxy_types import ProxyConfig
+
+
+class _OriginHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+def _stand_in_proxy(
+    origin_port: int, latency: float, stopped: threading.Event
+) -> socketserver.ThreadingTCPServer:
+    """A forward proxy that answers after `latency` seconds by relaying to the local origin."""
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            headers = b""
+            while not headers.endswith(b"\r\n\r\n"):
+                chunk = self.rfile.readline()
+                if not chunk:
+                    return
+                headers += chunk
+            if stopped.wait(latency):
+                return
+            path = headers.split(b" ", 2)[1].split(b"/", 3)[-1]
+            with socket.create_connection(("127.0.0.1", origin_port)) as upstream:
+                upstream.sendall(b"GET /" + path + b" HTTP/1.0\r\nHost: origin\r\n\r\n")
+                while data := upstream.recv(65536):
+                    self.wfile.write(data)
+
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def proxies() -> Generator[dict[str, str], None, None]:
+    origin = HTTPServer(("127.0.0.1", 0), _OriginHandler)
+    threading.Thread(target=origin.serve_forever, daemon=True).start()
+    stopped = threading.Event()
+    servers = {
+        "fast": _stand_in_proxy(origin.server_port, 0.01, stopped),
+        "slow": _stand_in_proxy(origin.server_port, 0.2, stopped),
+        "dead": _stand_in_proxy(origin.server_port, 5, stopped),
+    }
+    yield {key: f"http://127.0.0.1:{server.server_address[1]}" for key, server in servers.items()}
+    # Release the handlers still waiting, so none relays to the origin after its shutdown
+    stopped.set()
+    for server in servers.values():
+        server.shutdown()
+    origin.shutdown()
+
+
+def _navigate(pool: ProxyPool, proxy_key: str, server: str) -> None:
+    """Load a page through a proxy and report it to the pool, like a browser navigation."""
+    opener = urllib.request.build_opener(urllib.request.ProxyHandler({"http": server}))
+    started = time.perf_counter()
+    try:
+        opener.open("http://origin.test/page", timeout=0.5).read()
+    except TimeoutError as error:
+        pool.record_navigation(proxy_key, error=error)
+        return
+    pool.record_navigation(proxy_key, latency=time.perf_counter() - started)
+
+
+def test_routes_to_fastest_proxy_and_backs_off_failing_ones(proxies: dict[str, str]):
+    """Test that measured latency and timeouts from navigations drive proxy choice."""
+    now = [1000.0]
+    pool = ProxyPool(clock=lambda: now[0])
+    for _ in range(2):
+        for key, server in proxies.items():
+            _navigate(pool, key, server)
+
+    assert pool.choose(["slow", "fast", "dead"]) == "fast"
+    assert pool.choose(["slow", "dead"]) == "slow"
+    assert pool.health("dead").backoff_until > now[0]
+
+    # A profile keeps its proxy; a relaunch fails over from a backed off one
+    assert pool.assign("profile-1", ["dead"]) == "dead"
+    assert pool.assign("profile-1", ["dead", "slow"]) == "dead"
+    assert pool.assign("profile-1", ["dead", "slow"], failover=True) == "slow"
+    assert pool.assigned("profile-1") == "slow"
+
+    # Once the backoff expires, a recovered proxy gets traffic again
+    now[0] += 3600
+    pool.record_navigation("dead", latency=0.005)
+    assert pool.choose(["slow", "fast", "dead"]) == "dead"
+
+
+def test_non_proxy_errors_are_ignored():
+    """Test that site errors do not count against the proxy."""
+    pool = ProxyPool()
+    site_error = ConnectionError("Navigation failed: net::ERR_NAME_NOT_RESOLVED")
+    for _ in range(5):
+        pool.record_navigation("p1", error=site_error)
+    pool.record_navigation("p2", error=ConnectionError("net::ERR_PROXY_CONNECTION_FAILED"))
+
+    assert pool.health("p1").error_rate == 0
+    assert pool.health("p2").error_rate > 0
+    assert pool.choose(["p2", "p1"]) == "p1"
+
+
+def test_proxy_candidates():
+    """Test that a proxy type resolves to its group, itself, or the group it names."""
+    configs = {
+        "proxy-0": ProxyConfig(proxy_type="none"),
+        "proxy-1": ProxyConfig(url="http://a.test:1", group="residential"),
+        "proxy-2": ProxyConfig(url="http://b.test:1", group="residential"),
+    }
+
+    assert proxy_candidates("proxy-1", configs) == ["proxy-1", "proxy-2"]
+    assert proxy_candidates("proxy-0", configs) == ["proxy-0"]
+    assert proxy_candidates("residential", configs) == ["proxy-1", "proxy-2"]
+    assert proxy_candidates("missing", configs) == []
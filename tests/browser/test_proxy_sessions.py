@@ -0,0 +1,86 @@
+import pytest
+
+from getgather.api.types import RequestInfo
+from getgather.browser.proxy_builder import build_proxy_config
+from getgather.browser.proxy_sessions import ProxySessionStore
+from getgather.browser.proxy_types import ProxyConfig
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> _Clock:
+    return _Clock()
+
+
+@pytest.fixture
+def store(clock: _Clock) -> ProxySessionStore:
+    return ProxySessionStore(clock=clock)
+
+
+def test_reuses_session_of_same_user_and_location_within_ttl(
+    store: ProxySessionStore, clock: _Clock
+):
+    """A new profile of the same user and location reuses the first profile's session."""
+    info = RequestInfo(country="us", city="Boston", user_id="user-1")
+
+    assert store.session_id("proxy-1", "profile-a", info, ttl=600) == "profile-a"
+    clock.now += 300
+    assert store.session_id("proxy-1", "profile-b", info, ttl=600) == "profile-a"
+    assert store.reused("profile-a", "proxy-1") is False
+    assert store.reused("profile-b", "proxy-1") is True
+
+    clock.now += 301
+    assert store.session_id("proxy-1", "profile-c", info, ttl=600) == "profile-c"
+    assert store.reused("profile-c", "proxy-1") is False
+
+
+def test_sessions_are_separate_per_user_location_and_proxy(store: ProxySessionStore):
+    """Sessions are never shared across users, locations or proxies."""
+    boston = RequestInfo(country="us", city="Boston", user_id="user-1")
+    store.session_id("proxy-1", "profile-a", boston, ttl=600)
+
+    other_user = boston.model_copy(update={"user_id": "user-2"})
+    other_city = boston.model_copy(update={"city": "Denver"})
+    assert store.session_id("proxy-1", "profile-b", other_user, ttl=600) == "profile-b"
+    assert store.session_id("proxy-1", "profile-c", other_city, ttl=600) == "profile-c"
+    assert store.session_id("proxy-2", "profile-d", boston, ttl=600) == "profile-d"
+
+
+def test_profile_keeps_its_session_and_anonymous_requests_are_not_sticky(
+    store: ProxySessionStore, clock: _Clock
+):
+    """Every page of a browser gets the session it launched with, even past the TTL."""
+    info = RequestInfo(country="us", user_id="user-1")
+    store.session_id("proxy-1", "profile-a", info, ttl=600)
+    store.session_id("proxy-1", "profile-b", info, ttl=600)
+    clock.now += 3600
+    assert store.session_id("proxy-1", "profile-b", info, ttl=600) == "profile-a"
+
+    anonymous = RequestInfo(country="us")
+    assert store.session_id("proxy-1", "profile-x", anonymous, ttl=600) == "profile-x"
+    assert store.session_id("proxy-1", "profile-y", anonymous, ttl=600) == "profile-y"
+    assert store.session_id("proxy-1", "profile-z", info, ttl=0) == "profile-z"
+
+
+def test_build_proxy_config_uses_session_id():
+    """The session id replaces the profile id in the proxy username."""
+    config = ProxyConfig(
+        url="http://proxy.example.com:8080",
+        username_template="customer-session-{session_id}",
+        password="secret",
+    )
+
+    result = build_proxy_config(config, "profile-b", session_id="profile-a")
+    assert result is not None
+    assert result["username"] == "customer-session-profile-a"
+
+    result = build_proxy_config(config, "profile-b")
+    assert result is not None
+    assert result["username"] == "customer-session-profile-b"
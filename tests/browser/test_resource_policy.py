@@ -0,0 +1,90 @@
+from pathlib import Path
+from typing import Generator
+
+import pytest
+
+from getgather.browser import resource_policy
+from getgather.browser.resource_policy import ALLOW, ResourcePolicy, load_policies
+
+
+@pytest.fixture
+def policy_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Generator[Path, None, None]:
+    path = tmp_path / "policies.yaml"
+    path.write_text(
+        "default:\n"
+        "  block_types: [image]\n"
+        "shop:\n"
+        "  hosts: [shop.com]\n"
+        "  block_types: [image, font, stylesheet]\n"
+        "  block_scripts: [third-party]\n"
+        "  block_domains: [reviews.io]\n"
+        "  allow_domains: [shopcdn.net]\n"
+    )
+    monkeypatch.setattr("getgather.config.settings.RESOURCE_POLICY_FILE", str(path))
+    load_policies.cache_clear()
+    yield path
+    load_policies.cache_clear()
+
+
+def test_policy_is_picked_by_host(policy_file: Path):
+    """Test that a brand's policy applies to its hosts and subdomains only."""
+    assert resource_policy.policy_for_url("https://www.shop.com/cart").name == "shop"
+    assert resource_policy.policy_for_url("https://shop.com").name == "shop"
+    assert resource_policy.policy_for_url("https://notshop.com/").name == "default"
+    assert resource_policy.policy_for_url("about:blank").name == "default"
+    assert resource_policy.allowed_domains() == {"shopcdn.net"}
+
+
+def test_policy_decisions(policy_file: Path):
+    """Test that a policy blocks its resource types, third-party scripts and domains."""
+    policy = resource_policy.policy_for_url("https://www.shop.com/")
+    page = "https://www.shop.com/cart"
+
+    assert policy.decide("https://www.shop.com/site.css", "Stylesheet", page) == "type"
+    assert policy.decide("https://shopcdn.net/logo.png", "image", page) == "type"
+    assert policy.decide("https://cdn.other.net/lib.js", "Script", page) == "third-party"
+    assert policy.decide("https://static.shop.com/app.js", "Script", page) is None
+    assert policy.decide("https://widget.reviews.io/data", "XHR", page) == "domain"
+    assert policy.decide("https://shopcdn.net/app.js", "Script", "https://shopcdn.net/") == ALLOW
+    # Like the blocklists, allowed domains do not cover their subdomains
+    assert policy.decide("https://ads.shopcdn.net/x", "XHR", "https://shopcdn.net/") is None
+    assert policy.decide("https://www.shop.com/", "Document", None) is None
+
+    default = resource_policy.default_policy()
+    assert default.decide("https://www.shop.com/site.css", "Stylesheet", page) is None
+
+
+def test_policy_request_patterns():
+    """Test that only the requests a policy decides on are intercepted."""
+    policy = ResourcePolicy(
+        name="test",
+        block_types=frozenset({"font", "xmlhttprequest"}),
+        block_scripts=frozenset({"third-party"}),
+        block_domains=frozenset({"reviews.io"}),
+    )
+
+    assert policy.request_patterns() == [
+        ("*", "Font"),
+        ("*", "XHR"),
+        ("*", "Fetch"),
+        ("*", "Script"),
+        ("*://reviews.io/*", None),
+        ("*://*.reviews.io/*", None),
+    ]
+
+
+def test_invalid_policy_is_rejected(tmp_path: Path):
+    """Test that unknown resource types fail loudly instead of silently blocking nothing."""
+    path = tmp_path / "policies.yaml"
+    path.write_text("shop:\n  hosts: [shop.com]\n  block_types: [images]\n")
+
+    with pytest.raises(ValueError, match="unknown block_types"):
+        load_policies(path)
+
+
+def test_packaged_policies_load():
+    """Test that the packaged policy file is valid."""
+    policies = load_policies(resource_policy.PACKAGED_POLICY_FILE)
+
+    assert policies["default"].block_types == {"image", "media", "font"}
+    assert policies["amazon"].applies_to("www.amazon.ca")
@@ -14,7 +14,12 @@ from pytest import MonkeyPatch
 from getgather.browser.profile import BrowserProfile
 from getgather.browser.session import browser_session
 from getgather.config import settings
-from getgather.distill import distill, load_distillation_patterns, run_distillation_loop
+from getgather.distill import (
+    asks_for_input,
+    distill,
+    load_distillation_patterns,
+    run_distillation_loop,
+)
 
 DISTILL_PATTERN_LOCATIONS = {
     "http://localhost:5001": "acme_home_page.html",
@@ -113,3 +118,30 @@ async def test_distillation_captures_screenshot_without_pattern(
     new_files = [item for item in after if item not in before]
     assert new_files, "Expected a distillation screenshot to be captured."
     assert all(file.stat().st_size > 0 for file in new_files)
+
+
+@pytest.mark.asyncio
+@pytest.mark.distill
+async def test_distillation_loop_hands_over_signin_page():
+    """With handoff, a non-interactive loop stops on the sign-in form and leaves the page open."""
+    profile = BrowserProfile()
+    path = os.path.join(os.path.dirname(__file__), "patterns", "**/*.html")
+    patterns = load_distillation_patterns(path)
+    location = "http://localhost:5001/auth/email-and-password"
+
+    async with browser_session(profile) as session:
+        page = await session.new_page()
+        terminated, distilled, converted = await run_distillation_loop(
+            location=location,
+            patterns=patterns,
+            browser_profile=profile,
+            timeout=10,
+            interactive=False,
+            page=page,
+            handoff=True,
+        )
+
+        assert not terminated and converted is None
+        assert asks_for_input(distilled), "Expected to stop on the sign-in form."
+        assert not page.is_closed(), "Expected the page to be left open for the dpage."
+        assert page.url == location
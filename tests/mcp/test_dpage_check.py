@@ -0,0 +1,57 @@
+"""Tests for check_signin waiting on dpage results."""
+
+import asyncio
+import time
+
+import pytest
+
+from getgather.mcp import dpage
+
+
+@pytest.mark.asyncio
+async def test_dpage_check_wakes_up_when_result_is_stored():
+    """check_signin returns as soon as the signin result is stored, not on the next tick."""
+    dpage.signin_timeouts["signin-1"] = 10
+
+    async def complete():
+        await asyncio.sleep(0.05)
+        dpage.set_distillation_result("signin-1", {"orders": []})
+
+    started = time.perf_counter()
+    result, _ = await asyncio.gather(dpage.dpage_check("signin-1"), complete())
+
+    assert result == {"orders": []}
+    assert time.perf_counter() - started < 0.5
+    assert await dpage.dpage_check("signin-1") == {"orders": []}
+
+
+@pytest.mark.asyncio
+async def test_dpage_check_times_out_per_signin():
+    """check_signin gives up after the timeout recorded for the signin."""
+    dpage.signin_timeouts["signin-2"] = 0.05
+
+    assert await dpage.dpage_check("signin-2") is None
+    assert "signin-2" not in dpage.signin_completed
+    assert "signin-2" not in dpage.signin_waiters
+
+
+@pytest.mark.asyncio
+async def test_dpage_check_keeps_the_event_for_other_waiters():
+    """A check_signin that times out leaves the event to the calls still waiting on it."""
+    dpage.signin_timeouts["signin-3"] = 10
+
+    async def check_briefly():
+        dpage.signin_timeouts["signin-3"] = 0.05
+        return await dpage.dpage_check("signin-3")
+
+    async def complete():
+        await asyncio.sleep(0.1)
+        assert "signin-3" in dpage.signin_completed
+        dpage.set_distillation_result("signin-3", {"orders": []})
+
+    waiting = asyncio.create_task(dpage.dpage_check("signin-3"))
+    await asyncio.sleep(0)
+    results = await asyncio.gather(check_briefly(), waiting, complete())
+
+    assert results[:2] == [None, {"orders": []}]
+    assert "signin-3" not in dpage.signin_waiters
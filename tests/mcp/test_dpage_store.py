@@ -0,0 +1,117 @@
+"""Tests for the bounded dpage state stores."""
+
+import asyncio
+import multiprocessing
+import time
+from pathlib import Path
+
+import pytest
+
+from getgather.mcp.dpage_store import DpageStore, SqliteDpageStore
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_after_last_access_and_are_cleaned_up():
+    """Entries not accessed within the TTL are swept, running the eviction callback."""
+    clock = _Clock()
+    closed: list[str] = []
+
+    async def close(key: str, value: str) -> None:
+        closed.append(value)
+
+    store: DpageStore[str] = DpageStore("pages", close, ttl=60, max_entries=10, clock=clock)
+    store["a"] = "tab-a"
+    store["b"] = "tab-b"
+
+    clock.now += 50
+    assert store["a"] == "tab-a"  # access extends the lifetime of a
+    clock.now += 20
+    assert "b" not in store
+    assert await store.evict_expired() == 1
+    assert closed == ["tab-b"]
+    assert dict(store) == {"a": "tab-a"}
+
+    del store["a"]
+    assert await store.evict_expired() == 0
+    assert closed == ["tab-b"]  # explicit removal does not run the callback
+
+
+@pytest.mark.asyncio
+async def test_expired_entries_are_not_counted():
+    """The length of a store leaves out expired entries, which are evicted on the way."""
+    clock = _Clock()
+    closed: list[str] = []
+
+    async def close(key: str, value: str) -> None:
+        closed.append(key)
+
+    store: DpageStore[str] = DpageStore("pages", close, ttl=60, max_entries=10, clock=clock)
+    store["a"] = "tab-a"
+    clock.now += 30
+    store["b"] = "tab-b"
+    clock.now += 40
+
+    assert len(store) == 1
+    await asyncio.sleep(0)
+    assert closed == ["a"]
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_entries_are_evicted_beyond_capacity():
+    """Beyond max_entries, the least recently used entry is evicted and cleaned up."""
+    closed: list[str] = []
+
+    async def close(key: str, value: str) -> None:
+        closed.append(key)
+
+    store: DpageStore[str] = DpageStore("pages", close, ttl=60, max_entries=2)
+    store["a"] = "tab-a"
+    store["b"] = "tab-b"
+    assert store["a"] == "tab-a"
+    store["c"] = "tab-c"
+    await asyncio.sleep(0)
+
+    assert sorted(store) == ["a", "c"]
+    assert closed == ["b"]
+
+
+def _store_result(path: str) -> None:
+    store: SqliteDpageStore[dict[str, str]] = SqliteDpageStore("results", Path(path), ttl=60)
+    store["signin-1"] = {"status": "done"}
+
+
+def test_sqlite_store_is_shared_between_workers(tmp_path: Path):
+    """A result stored by another worker process is visible, and expires like in memory."""
+    clock = _Clock()
+    clock.now = time.time()
+    path = tmp_path / "dpage.db"
+    store: SqliteDpageStore[dict[str, str]] = SqliteDpageStore(
+        "results", path, ttl=60, max_entries=2, clock=clock
+    )
+    assert "signin-1" not in store
+
+    worker = multiprocessing.get_context("fork").Process(target=_store_result, args=(str(path),))
+    worker.start()
+    worker.join(timeout=30)
+    assert worker.exitcode == 0
+
+    assert store["signin-1"] == {"status": "done"}
+    clock.now += 1
+    store["signin-2"] = {"status": "done"}
+    clock.now += 1
+    store["signin-3"] = {"status": "done"}
+    assert sorted(store) == ["signin-2", "signin-3"]
+
+    clock.now += 120
+    assert "signin-3" not in store
+    assert len(store) == 0
+    assert asyncio.run(store.evict_expired()) == 2
+    assert len(store) == 0
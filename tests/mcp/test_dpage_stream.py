@@ -0,0 +1,50 @@
+"""Tests for pushing dpage screens to sign-in pages."""
+
+import asyncio
+import json
+
+import pytest
+
+from getgather.mcp.dpage_stream import DpageUpdates
+
+
+def _parse(event: str) -> tuple[str, dict[str, str]]:
+    name, data = event.strip().split("\n")
+    return name.removeprefix("event: "), json.loads(data.removeprefix("data: "))
+
+
+@pytest.mark.asyncio
+async def test_subscribers_get_the_latest_screen_then_each_new_one():
+    """A new subscriber sees the current screen at once, then every screen as it is published."""
+    updates = DpageUpdates()
+    updates.publish("form", {"title": "Sign In", "content": "<input name='email'/>"})
+
+    queue = updates.subscribe()
+    stream = updates.stream(queue)
+    assert _parse(await anext(stream)) == (
+        "form",
+        {"title": "Sign In", "content": "<input name='email'/>"},
+    )
+
+    updates.publish("form", {"title": "Sign In", "content": "<input name='password'/>"})
+    updates.publish("finished", {"title": "Sign In", "content": "Finished!"})
+    events = [_parse(event) async for event in stream]
+
+    assert [name for name, _ in events] == ["form", "finished"]
+    assert events[0][1]["content"] == "<input name='password'/>"
+    assert updates.subscribers == 0
+
+
+@pytest.mark.asyncio
+async def test_disconnected_subscriber_is_dropped():
+    """Closing a stream unsubscribes it, so the page watcher can stop."""
+    updates = DpageUpdates()
+    stream = updates.stream(updates.subscribe())
+    reader = asyncio.ensure_future(anext(stream))
+    await asyncio.sleep(0)
+    assert updates.subscribers == 1
+
+    reader.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await reader
+    assert updates.subscribers == 0
@@ -0,0 +1,94 @@
+"""Tests for serializing the interactions with a dpage."""
+
+import asyncio
+
+import pytest
+
+from getgather.mcp.page_actor import PageActor, page_actor
+
+
+@pytest.mark.asyncio
+async def test_interactions_with_a_page_run_one_at_a_time_in_order():
+    """A page runs its interactions in arrival order, while other pages run alongside."""
+    log: list[str] = []
+
+    def interaction(name: str):
+        async def work() -> str:
+            log.append(f"start {name}")
+            await asyncio.sleep(0.01)
+            log.append(f"end {name}")
+            return name
+
+        return work
+
+    first, second = PageActor("a"), PageActor("b")
+    results = await asyncio.gather(
+        first.run(interaction("a1")),
+        first.run(interaction("a2")),
+        second.run(interaction("b1")),
+    )
+
+    assert results == ["a1", "a2", "b1"]
+    assert log.index("end a1") < log.index("start a2")
+    assert log.index("start b1") < log.index("end a1")
+
+
+@pytest.mark.asyncio
+async def test_retried_submission_joins_the_pending_one():
+    """The same submission sent again while it is queued or running runs only once."""
+    actor = PageActor("a")
+    calls = 0
+
+    async def submit() -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    key = ("submit", frozenset({("email", "me@example.com")}))
+    assert await asyncio.gather(actor.run(submit, key=key), actor.run(submit, key=key)) == [1, 1]
+    assert await actor.run(submit, key=key) == 2
+
+
+@pytest.mark.asyncio
+async def test_nested_interaction_runs_inline_and_errors_reach_the_caller():
+    """Work reaching its own actor again does not deadlock, and failures are raised to callers."""
+    actor = page_actor("nested")
+
+    async def resume() -> str:
+        return "resumed"
+
+    async def submit() -> str:
+        return await page_actor("nested").run(resume, kind="resume")
+
+    assert await asyncio.wait_for(actor.run(submit), 1) == "resumed"
+
+    async def fail() -> None:
+        raise ValueError("tab closed")
+
+    with pytest.raises(ValueError, match="tab closed"):
+        await actor.run(fail)
+    assert await actor.run(resume) == "resumed"
+
+
+@pytest.mark.asyncio
+async def test_stopped_actor_cancels_its_interactions():
+    """Callers of a cancelled actor are cancelled instead of waiting forever."""
+    actor = PageActor("a")
+    started = asyncio.Event()
+
+    async def stuck() -> None:
+        started.set()
+        await asyncio.Event().wait()
+
+    running = asyncio.ensure_future(actor.run(stuck, key="stuck"))
+    queued = asyncio.ensure_future(actor.run(stuck))
+    await started.wait()
+    task = actor._task  # type: ignore[reportPrivateUsage]
+    assert task is not None
+    task.cancel()
+
+    for caller in (running, queued):
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+    assert actor._pending == {}  # type: ignore[reportPrivateUsage]
@@ -0,0 +1,72 @@
+"""Tests for predicting the next sign-in screen from learned flows."""
+
+from pathlib import Path
+
+import pytest
+from bs4 import BeautifulSoup
+
+from getgather.distill import Pattern, predicted_patterns
+from getgather.flow_graph import MIN_TRANSITIONS, FlowGraph
+
+
+def test_frequent_successors_are_predicted_and_saved(tmp_path: Path):
+    """Successors seen often enough are predicted, most frequent first, also after a restart."""
+    path = tmp_path / "flow_graph.json"
+    graph = FlowGraph(path)
+    for _ in range(MIN_TRANSITIONS):
+        graph.record("www.example.com", "example-email", "example-password")
+        graph.record("www.example.com", "example-password", "example-orders")
+        graph.record("www.example.com", "example-password", "example-mfa")
+    graph.record("www.example.com", "example-password", "example-mfa")
+    graph.record("www.example.com", "example-password", "example-captcha")
+
+    assert graph.successors("www.example.com", "example-email") == ["example-password"]
+    assert graph.successors("www.example.com", "example-password") == [
+        "example-mfa",
+        "example-orders",
+    ]
+    assert graph.successors("shop.example.org", "example-email") == []
+
+    graph.save()
+    assert FlowGraph(path).successors("www.example.com", "example-email") == ["example-password"]
+
+
+def test_only_moves_to_another_screen_are_recorded(tmp_path: Path):
+    """Transitions are counted by pattern file name, and staying on a screen is not one."""
+    graph = FlowGraph(tmp_path / "flow_graph.json")
+    for _ in range(MIN_TRANSITIONS):
+        graph.record("www.example.com", None, "/patterns/example-email.html")
+        graph.record("www.example.com", "/patterns/example-email.html", "/a/example-email.html")
+        graph.record("www.example.com", "/patterns/example-email.html", "/a/example-password.html")
+
+    assert graph.successors("www.example.com", "example-email") == ["example-password"]
+
+
+def test_predicted_patterns_are_successors_and_generic_errors(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    """The successors of the current screen and error pages are probed first, not the screen."""
+    graph = FlowGraph(tmp_path / "flow_graph.json")
+    for _ in range(MIN_TRANSITIONS):
+        graph.record("www.example.com", "example-email", "example-password")
+    monkeypatch.setattr("getgather.distill.flow_graph", graph)
+
+    def pattern(name: str, domain: str | None) -> Pattern:
+        attribute = f' gg-domain="{domain}"' if domain else ""
+        html = f"<html{attribute}><body><input gg-match='#x'/></body></html>"
+        return Pattern(name=f"/patterns/{name}.html", pattern=BeautifulSoup(html, "html.parser"))
+
+    patterns = [
+        pattern("example-email", "example.com"),
+        pattern("example-password", "example.com"),
+        pattern("example-orders", "example.com"),
+        pattern("err-timed-out", None),
+    ]
+
+    predicted = predicted_patterns("www.example.com", "/patterns/example-email.html", patterns)
+    assert [item.name for item in predicted] == [
+        "/patterns/example-password.html",
+        "/patterns/err-timed-out.html",
+    ]
+    assert predicted_patterns("www.example.com", None, patterns) == []
+    assert predicted_patterns("www.example.com", "/patterns/example-orders.html", patterns) == []
@@ -0,0 +1,88 @@
+"""Tests for timeouts learned from observed latencies."""
+
+from pathlib import Path
+
+import pytest
+
+from getgather.latency_budgets import HALF_LIFE, MIN_SAMPLES, TIMEOUT_STREAK, LatencyBudgets
+from getgather.metrics import Histogram
+
+
+def _budgets(path: Path, now: float = 0) -> LatencyBudgets:
+    histogram = Histogram("latency", "test", (1, 2, 5, 10, 30, 60))
+    return LatencyBudgets(histogram, path, now=lambda: now)
+
+
+def test_budget_follows_the_p99_of_each_brand_within_caps(tmp_path: Path):
+    """Hardcoded timeouts hold until a brand has enough samples, then p99 × factor, capped."""
+    budgets = _budgets(tmp_path / "latencies.json")
+    for _ in range(MIN_SAMPLES - 1):
+        budgets.record("navigation", "fast.example", 1.5)
+        budgets.record("navigation", "slow.example", 50)
+    assert budgets.timeout("navigation", "fast.example", 45) == 45
+
+    budgets.record("navigation", "fast.example", 1.5)
+    budgets.record("navigation", "slow.example", 50)
+    budgets.record("navigation", "stuck.example", 500)
+    assert budgets.timeout("navigation", "fast.example", 45) == 5  # 2 × 1.5, raised to the floor
+    assert budgets.timeout("navigation", "slow.example", 45) == 90  # 60 × 1.5
+    assert budgets.timeout("navigation", "stuck.example", 45) == 45
+    assert budgets.timeout("distillation", "fast.example", 15) == 15
+
+
+def test_latencies_are_saved_and_loaded_back(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """A restarted server keeps the budgets learned before, unless adaptive timeouts are off."""
+    path = tmp_path / "latencies.json"
+    budgets = _budgets(path)
+    for _ in range(MIN_SAMPLES):
+        budgets.record("dpage", "www.wayfair.com", 8)
+    budgets.save()
+
+    restarted = _budgets(path)
+    assert restarted.timeout("dpage", "www.wayfair.com", 30) == 15  # 10 × 1.5
+
+    monkeypatch.setattr("getgather.config.settings.ADAPTIVE_TIMEOUTS", False)
+    assert restarted.timeout("dpage", "www.wayfair.com", 30) == 30
+
+
+def test_budget_growth_is_bounded_by_the_default(tmp_path: Path):
+    """A brand that keeps running into its timeouts cannot ratchet its budget up to the max."""
+    budgets = _budgets(tmp_path / "latencies.json")
+    for _ in range(MIN_SAMPLES):
+        budgets.record("distillation", "stuck.example", 60)
+
+    assert budgets.timeout("distillation", "stuck.example", 15) == 30  # 2 × 15, not 60 × 1.5
+    assert budgets.budget("distillation", "stuck.example", 60) == 90
+
+
+def test_timeouts_in_a_row_restore_the_default(tmp_path: Path):
+    """A budget learned while a brand was fast stops failing it once it keeps timing out."""
+    budgets = _budgets(tmp_path / "latencies.json")
+    for _ in range(MIN_SAMPLES):
+        budgets.record("dpage", "shop.example", 1.5)
+    assert budgets.timeout("dpage", "shop.example", 15) == 5
+
+    for _ in range(TIMEOUT_STREAK):
+        budgets.record_timeout("dpage", "shop.example")
+    assert budgets.timeout("dpage", "shop.example", 15) == 15
+
+    budgets.record("dpage", "shop.example", 1.5)
+    assert budgets.timeout("dpage", "shop.example", 15) == 5
+
+
+def test_old_latencies_age_out(tmp_path: Path):
+    """Observations lose half their weight every half-life, also across restarts."""
+    path = tmp_path / "latencies.json"
+    budgets = _budgets(path)
+    for _ in range(2 * MIN_SAMPLES):
+        budgets.record("navigation", "shop.example", 50)
+    budgets.save()
+
+    later = _budgets(path, now=HALF_LIFE)
+    assert later.timeout("navigation", "shop.example", 45) == 90  # 60 × 1.5
+    for _ in range(2 * MIN_SAMPLES):
+        later.record("navigation", "shop.example", 1.5)
+    assert later.timeout("navigation", "shop.example", 45) == 90  # 20 slow ones still count
+
+    much_later = _budgets(path, now=20 * HALF_LIFE)
+    assert much_later.timeout("navigation", "shop.example", 45) == 45
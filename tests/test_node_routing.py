@@ -0,0 +1,110 @@
+"""Tests for forwarding sign-in requests to the node that owns them."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Awaitable, Callable, Generator
+
+import httpx
+import pytest
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import PlainTextResponse
+
+from getgather.node_routing import ROUTED_HEADER, close_node_client, route_to_owner
+
+
+class _OwnerNode(BaseHTTPRequestHandler):
+    """Stands in for node-b, recording what it receives."""
+
+    received: list[dict[str, Any]] = []
+
+    def _answer(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length) if length else b""
+        self.received.append({"path": self.path, "headers": dict(self.headers), "body": body})
+        answer = b"served by node-b"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(answer)))
+        self.end_headers()
+        self.wfile.write(answer)
+
+    do_GET = _answer
+    do_POST = _answer
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def owner_node() -> Generator[str, None, None]:
+    _OwnerNode.received = []
+    server = HTTPServer(("127.0.0.1", 0), _OwnerNode)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+@pytest.fixture
+def node_a(owner_node: str, monkeypatch: pytest.MonkeyPatch) -> FastAPI:
+    monkeypatch.setattr("getgather.config.settings.HOSTNAME", "node-a")
+    monkeypatch.setattr("getgather.config.settings.NODE_ROUTES", {"node-b": owner_node})
+    app = FastAPI()
+
+    @app.middleware("http")
+    async def node_routing(  # pyright: ignore[reportUnusedFunction]
+        request: Request, call_next: Callable[[Request], Awaitable[Response]]
+    ):
+        if response := await route_to_owner(request):
+            return response
+        return await call_next(request)
+
+    @app.api_route("/{path:path}", methods=["GET", "POST"])
+    async def local(path: str) -> PlainTextResponse:  # pyright: ignore[reportUnusedFunction]
+        return PlainTextResponse("served by node-a")
+
+    return app
+
+
+@pytest.mark.asyncio
+async def test_dpage_of_another_node_is_forwarded(node_a: FastAPI):
+    """Pages of sign-ins owned by another node are served by it, others locally."""
+    transport = httpx.ASGITransport(app=node_a)
+    async with httpx.AsyncClient(transport=transport, base_url="http://node-a") as client:
+        response = await client.get("/dpage/node-b-k3m9x2pq")
+        assert response.text == "served by node-b"
+        assert (await client.get("/dpage/node-a-k3m9x2pq")).text == "served by node-a"
+        assert (await client.get("/dpage/node-c-k3m9x2pq")).text == "served by node-a"
+    await close_node_client()
+
+    [request] = _OwnerNode.received
+    assert request["path"] == "/dpage/node-b-k3m9x2pq"
+    assert request["headers"][ROUTED_HEADER] == "node-a"
+
+
+@pytest.mark.asyncio
+async def test_mcp_call_naming_a_signin_is_forwarded_without_its_session(node_a: FastAPI):
+    """Tool calls about a sign-in go to the owner's stateless MCP endpoint."""
+    call: dict[str, Any] = {
+        "jsonrpc": "2.0",
+        "id": 7,
+        "method": "tools/call",
+        "params": {"name": "check_signin", "arguments": {"signin_id": "node-b-k3m9x2pq"}},
+    }
+    transport = httpx.ASGITransport(app=node_a)
+    async with httpx.AsyncClient(transport=transport, base_url="http://node-a") as client:
+        response = await client.post("/mcp", json=call, headers={"mcp-session-id": "abc"})
+        assert response.text == "served by node-b"
+
+        other: dict[str, Any] = {
+            **call,
+            "params": {"name": "bbc_get_saved_articles", "arguments": {}},
+        }
+        response = await client.post("/mcp", json=other, headers={"x-signin-id": "node-a-q2"})
+        assert response.text == "served by node-a"
+    await close_node_client()
+
+    [request] = _OwnerNode.received
+    assert request["path"] == "/node/mcp/"
+    assert "mcp-session-id" not in {name.lower() for name in request["headers"]}
+    assert json.loads(request["body"]) == call
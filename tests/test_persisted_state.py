@@ -0,0 +1,52 @@
+"""Tests for state saved under the persistent store directory."""
+
+import asyncio
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from getgather.persisted_state import SAVE_INTERVAL, PersistedState
+
+
+class Counts(PersistedState):
+    file_name = "counts.json"
+    description = "counts"
+
+    def __init__(self, path: Path, clock: Any):
+        super().__init__(path, clock)
+        self.counts: dict[str, int] = {}
+
+    def _restore(self, data: Any) -> None:
+        self.counts.update(data)
+
+    def _state(self) -> Any:
+        return self.counts
+
+    def add(self, key: str) -> None:
+        self._load()
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self._changed()
+
+
+@pytest.mark.asyncio
+async def test_changes_are_written_off_the_event_loop(tmp_path: Path):
+    """Changes are saved in a worker thread once the interval passed, and loaded back."""
+    path = tmp_path / "counts.json"
+    now = 0.0
+    counts = Counts(path, lambda: now)
+
+    counts.add("a")
+    assert not path.exists()
+
+    now += SAVE_INTERVAL
+    counts.add("b")
+    await asyncio.gather(*counts._writes)  # type: ignore[reportPrivateUsage]
+    assert json.loads(path.read_text()) == {"a": 1, "b": 1}
+
+    counts.add("b")
+    counts.save()
+    restored = Counts(path, lambda: now)
+    restored.add("c")
+    assert restored.counts == {"a": 1, "b": 2, "c": 1}
@@ -0,0 +1,60 @@
+"""Tests for the deadline of MCP requests."""
+
+import asyncio
+
+import pytest
+
+from getgather.request_deadline import (
+    check_deadline,
+    cleanup_after_cancel,
+    deadline_remaining,
+    request_deadline,
+    tool_calls_aborted_total,
+)
+
+
+@pytest.mark.asyncio
+async def test_work_past_the_deadline_is_cancelled():
+    """Timeouts are capped to the time left, and work still running at the deadline is cut."""
+    assert deadline_remaining(45) == 45
+    before = tool_calls_aborted_total.value(reason="deadline")
+
+    with pytest.raises(TimeoutError):
+        async with request_deadline(0.05):
+            assert deadline_remaining(45) <= 0.05
+            check_deadline()
+            await asyncio.sleep(10)
+
+    assert tool_calls_aborted_total.value(reason="deadline") == before + 1
+    assert deadline_remaining(45) == 45
+
+    async with request_deadline(10):
+        async with request_deadline(60):  # cannot extend the outer deadline
+            assert deadline_remaining(45) <= 10
+
+
+@pytest.mark.asyncio
+async def test_tab_is_released_even_when_cancelled_again():
+    """Cleanup started on cancellation completes, however often the request is cancelled."""
+    released = asyncio.Event()
+
+    async def close_tab() -> None:
+        await asyncio.sleep(0.05)
+        released.set()
+
+    async def tool_call() -> None:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            await cleanup_after_cancel(close_tab())
+            raise
+
+    task = asyncio.create_task(tool_call())
+    await asyncio.sleep(0)
+    task.cancel()
+    await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    await asyncio.wait_for(released.wait(), 1)